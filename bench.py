@@ -0,0 +1,474 @@
+"""Benchmarks for the browser's hot paths on synthetic databases.
+
+    python bench.py                                     # 10k and 100k rows, every shape
+    python bench.py --rows 10000 1000000 --shape narrow blob -o before.json
+    python bench.py --compare before.json after.json
+
+Databases are generated once per shape and size and reused from --data-dir.
+Everything runs headless through engine.py; the Tk grid is timed too when
+there is a display, or when Xvfb is installed to provide one. Results are
+written as JSON so runs on different commits can be compared.
+"""
+import argparse
+import datetime
+import fnmatch
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from engine import (
+    KeysetPager, PendingEdits, SchemaCatalog, UndoBuffer, delete_rows, format_row, profile_table, run_script,
+    search_database, stream_csv, stream_excel, stream_jsonl,
+)
+
+TABLE = "data"
+# A screenful of grid rows plus the prefetch margin on both sides
+PAGE_ROWS = 100
+QUERY_ROWS = 10000
+DELETE_ROWS = 1000
+EDIT_CELLS = 1000
+SCROLL_PAGES = 50
+
+
+def _wide_columns(count=32):
+    kinds = ("INTEGER", "REAL", "TEXT")
+    columns = ["id INTEGER PRIMARY KEY"] + [f"c{i} {kinds[i % 3]}" for i in range(1, count)]
+    values = ["n"] + [("(n * %d) %% 100003" if i % 3 == 0 else "((n * %d) %% 100003) / 7.0" if i % 3 == 1
+                       else "'value ' || ((n * %d) %% 1009)") % (i + 7919) for i in range(1, count)]
+    return ", ".join(columns), ", ".join(values), None
+
+
+# Table definition, the value expressions over n = 1, 2, ... and an indexed column
+SHAPES = {
+    # A typical fact table: integer key, short text, numbers and a timestamp
+    "narrow": ("id INTEGER PRIMARY KEY, name TEXT, category TEXT, amount REAL, created INTEGER",
+               "n, 'customer ' || n, 'category ' || (n % 50), ((n * 7919) % 100003) / 100.0, 1600000000 + n * 60",
+               "category"),
+    "wide": _wide_columns(),
+    # 1-2 KB of text per row, trimmed for display by format_row
+    "text": ("id INTEGER PRIMARY KEY, title TEXT, body TEXT",
+             "n, 'title ' || n, substr(replace(hex(zeroblob(1000)), '00', 'lorem ipsum '), 1, 1000 + n % 1000)",
+             None),
+    # 2-4 KB BLOBs, summarised for display by format_row
+    "blob": ("id INTEGER PRIMARY KEY, name TEXT, data BLOB", "n, 'file ' || n || '.bin', randomblob(2048 + n % 2048)",
+             None),
+}
+
+
+def generate_database(path, shape, rows):
+    """Write a `shape` table of `rows` rows to `path` with one INSERT ... SELECT."""
+    columns, values, indexed = SHAPES[shape]
+    partial = path + ".partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(f"CREATE TABLE {TABLE} ({columns})")
+        with conn:
+            conn.execute(f"WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?) "
+                         f"INSERT INTO {TABLE} SELECT {values} FROM seq", (rows,))
+        if indexed:
+            conn.execute(f"CREATE INDEX {TABLE}_{indexed} ON {TABLE} ({indexed})")
+    finally:
+        conn.close()
+    os.replace(partial, path)
+
+
+def database_path(data_dir, shape, rows):
+    path = os.path.join(data_dir, f"bench-{shape}-{rows}.db")
+    if not os.path.exists(path):
+        print(f"Generating {shape} table with {rows:,} rows…", file=sys.stderr)
+        generate_database(path, shape, rows)
+    return path
+
+
+# --- Benchmarks ---
+
+class Stopwatch:
+    """Accumulates the time spent inside `with watch:` blocks; setup stays outside."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self.started
+
+
+class Context:
+    """What a benchmark runs against: one database, a connection and scratch space."""
+
+    def __init__(self, path, shape, rows, conn, scratch, excel_rows, root=None):
+        self.path = path
+        self.shape = shape
+        self.rows = rows
+        self.conn = conn
+        self.scratch = scratch
+        self.excel_rows = excel_rows
+        self.root = root
+        self.catalog = SchemaCatalog()
+        self.catalog.refresh(conn)
+        self.info = self.catalog.table(TABLE)
+        self.columns = self.info.column_names
+        # The first text column, for filters and searches
+        self.text_column = next(col[1] for col in self.info.columns if col[2] == "TEXT")
+
+    def every_nth_rowid(self, count):
+        step = max(self.rows // count, 1)
+        return list(range(1, self.rows + 1, step))[:count]
+
+
+def bench_page_first(ctx, watch):
+    with watch:
+        pager = KeysetPager(TABLE).open(ctx.conn)
+        rows = pager.fetch_first(ctx.conn, PAGE_ROWS)
+    return len(rows)
+
+
+def bench_page_middle(ctx, watch):
+    with watch:
+        pager = KeysetPager(TABLE).open(ctx.conn)
+        key = pager.key_at(ctx.conn, 0.5)
+        rows = pager.fetch_before(ctx.conn, key, PAGE_ROWS // 2) + pager.fetch_from(ctx.conn, key, PAGE_ROWS // 2)
+    return len(rows)
+
+
+def bench_page_preview(ctx, watch):
+    # The Browse grid's select list, which cuts long TEXT and BLOB values short
+    with watch:
+        pager = KeysetPager(TABLE, preview=True).open(ctx.conn)
+        key = pager.key_at(ctx.conn, 0.5)
+        rows = pager.fetch_before(ctx.conn, key, PAGE_ROWS // 2) + pager.fetch_from(ctx.conn, key, PAGE_ROWS // 2)
+    return len(rows)
+
+
+def bench_page_last(ctx, watch):
+    with watch:
+        pager = KeysetPager(TABLE).open(ctx.conn)
+        rows = pager.fetch_last(ctx.conn, PAGE_ROWS)
+    return len(rows)
+
+
+def bench_sort_unindexed(ctx, watch):
+    with watch:
+        pager = KeysetPager(TABLE, sort=ctx.columns[1], descending=True).open(ctx.conn)
+        key = pager.key_at(ctx.conn, 0.5)
+        rows = pager.fetch_from(ctx.conn, key, PAGE_ROWS)
+    return len(rows)
+
+
+def bench_filter_contains(ctx, watch):
+    with watch:
+        pager = KeysetPager(TABLE, filters=[(ctx.text_column, "contains", "99")]).open(ctx.conn)
+        rows = pager.fetch_first(ctx.conn, PAGE_ROWS)
+    return len(rows)
+
+
+def bench_count_rows(ctx, watch):
+    with watch:
+        count = ctx.conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+    return count
+
+
+def bench_run_query(ctx, watch):
+    """Fetch and format a result the way the Execute SQL tab does."""
+    rows = 0
+
+    def on_rows(batch):
+        nonlocal rows
+        formatted = [format_row(row) for row in batch]
+        rows += len(formatted)
+
+    with watch:
+        run_script(ctx.conn, [(1, f"SELECT * FROM {TABLE} LIMIT {QUERY_ROWS}")], on_rows=on_rows)
+    return rows
+
+
+def bench_query_aggregate(ctx, watch):
+    with watch:
+        groups = ctx.conn.execute(f"SELECT id % 100, COUNT(*), MAX({ctx.columns[1]}) FROM {TABLE} GROUP BY 1").fetchall()
+    return len(groups)
+
+
+def bench_format_rows(ctx, watch):
+    rows = ctx.conn.execute(f"SELECT rowid AS rowid, * FROM {TABLE} LIMIT {QUERY_ROWS}").fetchall()
+    with watch:
+        formatted = [format_row(row) for row in rows]
+    return len(formatted)
+
+
+def _export(writer, suffix, limit=None):
+    def bench(ctx, watch):
+        path = os.path.join(ctx.scratch, f"export.{suffix}")
+        sql = f"SELECT rowid AS rowid, * FROM {TABLE}" + (f" LIMIT {limit(ctx)}" if limit else "")
+        with watch:
+            written = writer(ctx.conn, sql, path)
+        os.remove(path)
+        return written
+    return bench
+
+
+def bench_delete_rows(ctx, watch):
+    undo = UndoBuffer(TABLE, 1 << 30)
+    with watch:
+        deleted = delete_rows(ctx.conn, TABLE, ctx.every_nth_rowid(DELETE_ROWS), undo=undo)
+    undo.restore(ctx.conn)
+    return deleted
+
+
+def bench_undo_delete(ctx, watch):
+    undo = UndoBuffer(TABLE, 1 << 30)
+    delete_rows(ctx.conn, TABLE, ctx.every_nth_rowid(DELETE_ROWS), undo=undo)
+    with watch:
+        restored = undo.restore(ctx.conn)
+    return restored
+
+
+def bench_save_edits(ctx, watch):
+    column = ctx.text_column
+    rowids = ctx.every_nth_rowid(EDIT_CELLS)
+    originals = dict(ctx.conn.execute(f"SELECT rowid, {column} FROM {TABLE} WHERE rowid IN ({', '.join('?' * len(rowids))})",
+                                      rowids))
+    edits = PendingEdits(TABLE)
+    for rowid, value in originals.items():
+        edits.set(rowid, column, value, f"edited {rowid}")
+    with watch:
+        updated = edits.apply(ctx.conn)
+    for rowid, value in originals.items():
+        edits.set(rowid, column, f"edited {rowid}", value)
+    edits.apply(ctx.conn)
+    return updated
+
+
+def bench_search_scan(ctx, watch):
+    with watch:
+        hits = search_database(ctx.path, "99", workers=1, limit=PAGE_ROWS)
+    return len(hits)
+
+
+def bench_profile_table(ctx, watch):
+    with watch:
+        profile = profile_table(ctx.conn, ctx.info)
+    return profile.rows
+
+
+def bench_tk_grid(ctx, watch):
+    """Load the Browse grid, page down SCROLL_PAGES screens and jump to the middle."""
+    from tkinter import ttk
+    from main import VirtualGrid
+
+    frame = ttk.Frame(ctx.root)
+    frame.pack(fill="both", expand=True)
+    tree = ttk.Treeview(frame, show="headings", height=25)
+    scrollbar = ttk.Scrollbar(frame, orient="vertical")
+    tree.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+    ctx.root.update()
+    # Jobs run inline instead of on a worker, so only the grid's own cost is measured
+    grid = VirtualGrid(tree, scrollbar, lambda job, callback, errback: callback(job(ctx.conn)))
+    shown = 0
+    try:
+        with watch:
+            grid.load(KeysetPager(TABLE, preview=True))
+            ctx.root.update()
+            for _ in range(SCROLL_PAGES):
+                grid.scroll(grid.visible)
+                ctx.root.update()
+                shown += grid.attached
+            grid.jump(0.5)
+            ctx.root.update()
+    finally:
+        frame.destroy()
+    return shown
+
+
+BENCHMARKS = {
+    "page_first": bench_page_first,
+    "page_middle": bench_page_middle,
+    "page_preview": bench_page_preview,
+    "page_last": bench_page_last,
+    "sort_unindexed": bench_sort_unindexed,
+    "filter_contains": bench_filter_contains,
+    "count_rows": bench_count_rows,
+    "run_query": bench_run_query,
+    "query_aggregate": bench_query_aggregate,
+    "format_rows": bench_format_rows,
+    "export_csv": _export(stream_csv, "csv"),
+    "export_csv_gz": _export(stream_csv, "csv.gz"),
+    "export_jsonl": _export(stream_jsonl, "jsonl"),
+    "export_excel": _export(stream_excel, "xlsx", limit=lambda ctx: ctx.excel_rows),
+    "delete_rows": bench_delete_rows,
+    "undo_delete": bench_undo_delete,
+    "save_edits": bench_save_edits,
+    "search_scan": bench_search_scan,
+    "profile_table": bench_profile_table,
+    "tk_grid": bench_tk_grid,
+}
+# Benchmarks that need a Tk root
+GUI_BENCHMARKS = {"tk_grid"}
+
+
+def open_display():
+    """A Tk root and the Xvfb process started for it, or (None, None) without a display."""
+    xvfb = None
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        binary = shutil.which("Xvfb")
+        if not binary:
+            return None, None
+        display = f":{100 + os.getpid() % 400}"
+        xvfb = subprocess.Popen([binary, display, "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.environ["DISPLAY"] = display
+    import tkinter
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            root = tkinter.Tk()
+            root.geometry("1400x900")
+            return root, xvfb
+        except tkinter.TclError:
+            # Xvfb needs a moment before it accepts connections
+            if xvfb is None or time.monotonic() > deadline:
+                if xvfb:
+                    xvfb.terminate()
+                return None, None
+            time.sleep(0.1)
+
+
+def run(shapes, sizes, names, repeat, data_dir, excel_rows, progress=None):
+    root = xvfb = None
+    if GUI_BENCHMARKS & set(names):
+        root, xvfb = open_display()
+        if root is None:
+            names = [name for name in names if name not in GUI_BENCHMARKS]
+            print("No display and no Xvfb: skipping the Tk benchmarks", file=sys.stderr)
+    if "export_excel" in names and importlib.util.find_spec("openpyxl") is None:
+        names = [name for name in names if name != "export_excel"]
+        print("openpyxl is not installed: skipping export_excel", file=sys.stderr)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="elsakr-bench-") as scratch:
+            for shape in shapes:
+                for rows in sizes:
+                    path = database_path(data_dir, shape, rows)
+                    conn = sqlite3.connect(path)
+                    try:
+                        ctx = Context(path, shape, rows, conn, scratch, excel_rows, root)
+                        for name in names:
+                            results.append(run_one(ctx, name, repeat))
+                            if progress:
+                                progress(results[-1])
+                    finally:
+                        conn.close()
+    finally:
+        if root:
+            root.destroy()
+        if xvfb:
+            xvfb.terminate()
+    return results
+
+
+def run_one(ctx, name, repeat):
+    """Time `name` `repeat` times after one untimed warm-up run."""
+    bench = BENCHMARKS[name]
+    bench(ctx, Stopwatch())
+    runs = []
+    handled = 0
+    for _ in range(repeat):
+        watch = Stopwatch()
+        handled = bench(ctx, watch)
+        runs.append(watch.elapsed)
+    median = statistics.median(runs)
+    return {
+        "shape": ctx.shape, "rows": ctx.rows, "benchmark": name, "runs": runs, "min": min(runs), "median": median,
+        "handled": handled, "per_second": handled / median if median else None,
+    }
+
+
+def run_metadata(repeat):
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "repeat": repeat,
+    }
+
+
+def print_result(result):
+    rate = f"{result['per_second']:>14,.0f}/s" if result["per_second"] else ""
+    print(f"{result['shape']:<8}{result['rows']:>12,}  {result['benchmark']:<18}{result['median'] * 1000:>11.2f} ms"
+          f"{result['min'] * 1000:>11.2f} ms{rate}")
+
+
+def compare(old_path, new_path):
+    """Print the change in median time of every benchmark present in both runs."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    before = {(r["shape"], r["rows"], r["benchmark"]): r["median"] for r in old["results"]}
+    print(f"{old['meta'].get('commit') or old_path} -> {new['meta'].get('commit') or new_path}")
+    print(f"{'shape':<8}{'rows':>12}  {'benchmark':<18}{'old median':>14}{'new median':>14}{'change':>9}")
+    for result in new["results"]:
+        key = (result["shape"], result["rows"], result["benchmark"])
+        if key in before and before[key]:
+            change = result["median"] / before[key] - 1
+            print(f"{key[0]:<8}{key[1]:>12,}  {key[2]:<18}{before[key] * 1000:>11.2f} ms{result['median'] * 1000:>11.2f} ms"
+                  f"{change:>+9.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the browser's hot paths on synthetic databases")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="table sizes (e.g. 10000 10000000)")
+    parser.add_argument("--shape", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--only", nargs="+", metavar="PATTERN", help="run only matching benchmarks (fnmatch patterns)")
+    parser.add_argument("--skip", nargs="+", metavar="PATTERN", default=[], help="skip matching benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, after one warm-up")
+    parser.add_argument("--excel-rows", type=int, default=100000, help="rows written by export_excel")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "elsakr-bench"),
+                        help="where generated databases are kept and reused")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two JSON result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+    names = [name for name in BENCHMARKS
+             if (not args.only or any(fnmatch.fnmatch(name, p) for p in args.only))
+             and not any(fnmatch.fnmatch(name, p) for p in args.skip)]
+    os.makedirs(args.data_dir, exist_ok=True)
+    print(f"{'shape':<8}{'rows':>12}  {'benchmark':<18}{'median':>14}{'min':>14}{'throughput':>16}")
+    results = run(args.shape, args.rows, names, args.repeat, args.data_dir, args.excel_rows, progress=print_result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": run_metadata(args.repeat), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""Command-line interface: batch exports and queries without a display.
+
+    python main.py export db.sqlite --table t --format csv -o t.csv.gz
+    python main.py export-all db.sqlite -o dump/ --format jsonl.gz --workers 8
+    python main.py query db.sqlite --sql "SELECT ..." [-o result.xlsx]
+    python main.py tables db.sqlite [--exact]
+    python main.py search db.sqlite "alice@example.com" [--index]
+    python main.py health db.sqlite
+    python main.py backup db.sqlite copy.sqlite
+    python main.py vacuum db.sqlite [--into compact.sqlite | --incremental]
+    python main.py analyze db.sqlite [--optimize]
+
+Any command takes --trace LOG to append every statement it runs, timed, to LOG.
+
+Uses the same streaming engine as the GUI and never imports tkinter.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+
+from engine import (
+    BACKUP_STEP_PAGES, CONNECTION_PRESETS, DATABASE_EXPORT_FORMATS, EXPORT_SPLIT_ROWS, SEARCH_LIMIT_PER_TABLE, KeysetPager,
+    SchemaCatalog, ScriptError, SqlTrace, TableStats, analyze, backup_database, database_health, estimate_row_counts,
+    export_database, format_bytes, format_count, incremental_vacuum, load_profile, object_sizes, open_connection,
+    run_script, search_database, split_statements, stream_csv, stream_excel, stream_jsonl, vacuum,
+)
+
+# --preset choices; without one a file opens with its saved GUI profile
+PRESETS = {"default": "Default", "fast": "Fast read-only browse", "immutable": "Immutable snapshot"}
+WRITERS = {"csv": stream_csv, "jsonl": stream_jsonl, "xlsx": stream_excel}
+
+
+def connection_profile(args):
+    return CONNECTION_PRESETS[PRESETS[args.preset]] if args.preset else load_profile(args.database)
+
+
+def connect(args):
+    profile = connection_profile(args)
+    if not os.path.exists(args.database):
+        raise OSError(f"no such database: {args.database}")
+    conn = open_connection(args.database, profile=profile)
+    profile.apply_journal_mode(conn)
+    return conn
+
+
+def output_format(args):
+    if args.format:
+        return args.format
+    if args.output and args.output.lower().endswith(".xlsx"):
+        return "xlsx"
+    return "jsonl" if args.output and args.output.lower().endswith((".jsonl", ".jsonl.gz")) else "csv"
+
+
+def progress_printer(args):
+    """Live row count on stderr when it is a terminal."""
+    if args.quiet or not sys.stderr.isatty():
+        return None
+    return lambda written, note="": print(f"\r{written:,} rows {note}", end="", file=sys.stderr, flush=True)
+
+
+def export_result(args, conn, sql, params, default_name):
+    fmt = output_format(args)
+    path = args.output or f"{default_name}.{fmt}"
+    started = time.perf_counter()
+    written = WRITERS[fmt](conn, sql, path, progress=progress_printer(args), params=params)
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        print(f"\rExported {written:,} rows to {path} in {elapsed:.2f}s ({written / max(elapsed, 1e-6):,.0f} rows/s)",
+              file=sys.stderr)
+
+
+def cmd_export(args, conn):
+    pager = KeysetPager(args.table, where=args.where).open(conn)
+    export_result(args, conn, *pager.view_sql(), args.table)
+
+
+def checked_tables(args, conn):
+    """The --table names, or None for all tables; unknown names are an error."""
+    if not args.table:
+        return None
+    catalog = SchemaCatalog()
+    catalog.refresh(conn)
+    missing = [name for name in args.table if catalog.kind(name) != "table"]
+    if missing:
+        raise ValueError(f"no such table: {', '.join(missing)}")
+    return args.table
+
+
+def cmd_export_all(args, conn):
+    tables = checked_tables(args, conn)
+    show = not args.quiet and sys.stderr.isatty()
+
+    def progress(written, total, parts_done, parts):
+        if show:
+            print(f"\r{written:,} / ~{total:,} rows, {parts_done} / {parts} files", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    results = export_database(args.database, args.output, args.format, tables, workers=args.workers,
+                              split_rows=args.split_rows or None, profile=connection_profile(args), progress=progress)
+    elapsed = time.perf_counter() - started
+    written = sum(rows for _, _, rows in results)
+    if not args.quiet:
+        print(f"\rExported {len({table for table, _, _ in results}):,} tables ({written:,} rows, {len(results):,} files) "
+              f"to {args.output} in {elapsed:.2f}s ({written / max(elapsed, 1e-6):,.0f} rows/s)", file=sys.stderr)
+
+
+def cmd_query(args, conn):
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            script = f.read()
+    else:
+        script = args.sql
+    statements = list(split_statements(script))
+    if args.output:
+        if len(statements) != 1:
+            raise ValueError("--output takes a single statement")
+        export_result(args, conn, statements[0][1], (), "query")
+        return
+
+    # Every result set goes to stdout as CSV with its own header row
+    writer = csv.writer(sys.stdout)
+    returned = 0
+
+    def on_rows(batch):
+        nonlocal returned
+        writer.writerows(batch)
+        returned += len(batch)
+
+    count, changes = run_script(conn, statements, mode=args.mode, on_columns=writer.writerow, on_rows=on_rows)
+    if not args.quiet:
+        print(f"{count:,} statement(s), {returned:,} rows returned, {changes:,} rows changed", file=sys.stderr)
+
+
+def cmd_tables(args, conn):
+    catalog = SchemaCatalog()
+    catalog.refresh(conn)
+    counts = TableStats().validate(conn)
+    estimates = estimate_row_counts(conn, catalog)
+    sizes = object_sizes(conn) or {}
+    for name in catalog.objects["table"] + catalog.objects["view"]:
+        info = catalog.table(name)
+        if info.kind == "view":
+            rows = ""
+        elif args.exact:
+            rows = format_count(counts.count(conn, name))
+        else:
+            rows = format_count(estimates[name], exact=False) if name in estimates else "?"
+        size = sizes.get(name, 0) + sum(sizes.get(index[0], 0) for index in info.indexes)
+        print(f"{name}\t{info.kind}\t{rows}\t{format_bytes(size) if name in sizes else ''}")
+
+
+def cmd_search(args, conn):
+    tables = checked_tables(args, conn)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["table", "column", "rowid", "value"])
+
+    def on_hits(table, hits, done, total):
+        writer.writerows([hit.table, hit.column, hit.key, hit.value] for hit in hits)
+        if not args.quiet and sys.stderr.isatty():
+            print(f"\r{done} / {total} tables", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    hits = search_database(args.database, args.term, tables, workers=args.workers, profile=connection_profile(args),
+                           limit=args.limit, use_index=args.index, on_hits=on_hits)
+    if not args.quiet:
+        print(f"\r{len(hits):,} matches in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+def cmd_health(args, conn):
+    health = database_health(conn)
+    print(f"{format_bytes(health.size)} in {health.page_count:,} pages of {health.page_size:,} B; "
+          f"{health.freelist:,} free pages ({health.freelist_ratio:.1%}, {format_bytes(health.free_bytes)}); "
+          f"auto_vacuum {health.auto_vacuum}; journal_mode {health.journal_mode}")
+    if health.objects is None:
+        print("per-object sizes need SQLite's dbstat virtual table", file=sys.stderr)
+        return
+    for item in health.objects:
+        print(f"{item.name}\t{item.kind}\t{item.pages:,}\t{format_bytes(item.size)}\t"
+              f"{item.unused_ratio:.1%} unused\t{item.fragmentation:.1%} fragmented")
+
+
+def page_progress(args, unit):
+    show = not args.quiet and sys.stderr.isatty()
+
+    def progress(done, total):
+        if show:
+            print(f"\r{done:,} / {total:,} {unit} ({done / max(total, 1):.0%})", end="", file=sys.stderr, flush=True)
+
+    return progress
+
+
+def cmd_backup(args, conn):
+    started = time.perf_counter()
+    written = backup_database(conn, args.destination, step_pages=args.step_pages, progress=page_progress(args, "pages"))
+    if not args.quiet:
+        print(f"\rBacked up {format_bytes(written)} to {args.destination} in {time.perf_counter() - started:.2f}s",
+              file=sys.stderr)
+
+
+def cmd_vacuum(args, conn):
+    started = time.perf_counter()
+    if args.incremental:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        freed = incremental_vacuum(conn, progress=page_progress(args, "free pages"))
+        summary = f"released {format_bytes(freed * page_size)}"
+    else:
+        progress = page_progress(args, "bytes") if args.into else None
+        before, after = vacuum(conn, into=args.into, progress=progress)
+        summary = f"{format_bytes(before)} -> {format_bytes(after)}" + (f" in {args.into}" if args.into else "")
+    if not args.quiet:
+        print(f"\rVacuumed: {summary} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+def cmd_analyze(args, conn):
+    started = time.perf_counter()
+    analyze(conn, optimize=args.optimize)
+    if not args.quiet:
+        print(f"{'PRAGMA optimize' if args.optimize else 'ANALYZE'} done in {time.perf_counter() - started:.2f}s",
+              file=sys.stderr)
+
+
+COMMANDS = {"analyze": cmd_analyze, "backup": cmd_backup, "export": cmd_export, "export-all": cmd_export_all,
+            "health": cmd_health, "query": cmd_query, "search": cmd_search, "tables": cmd_tables, "vacuum": cmd_vacuum}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Elsakr SQLite Browser command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add(name, help_text):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("database")
+        command.add_argument("--preset", choices=PRESETS, help="connection preset (default: the file's saved profile)")
+        command.add_argument("-q", "--quiet", action="store_true", help="no progress or summary on stderr")
+        command.add_argument("--trace", metavar="LOG", help="log every SQL statement with its timing to LOG (JSON Lines)")
+        return command
+
+    export = add("export", "stream a table to CSV (.csv.gz for gzip), JSON Lines or Excel")
+    export.add_argument("--table", required=True)
+    export.add_argument("--where", help="SQL filter expression")
+    export.add_argument("--format", choices=WRITERS)
+    export.add_argument("-o", "--output", help="output file (default: <table>.<format>)")
+
+    export_all = add("export-all", "export every table to its own file, in parallel")
+    export_all.add_argument("-o", "--output", required=True, help="output directory (created if missing)")
+    export_all.add_argument("--format", choices=DATABASE_EXPORT_FORMATS, default="csv")
+    export_all.add_argument("--table", action="append", help="export only this table (repeatable)")
+    export_all.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="worker processes")
+    export_all.add_argument("--split-rows", type=int, default=EXPORT_SPLIT_ROWS,
+                            help="split larger rowid tables into part files of about this many rows (0: never)")
+
+    query = add("query", "run SQL and print CSV to stdout, or export a single query's result")
+    source = query.add_mutually_exclusive_group(required=True)
+    source.add_argument("--sql")
+    source.add_argument("--file", help="read the SQL script from a file")
+    query.add_argument("--mode", choices=("transaction", "batches", "autocommit"), default="transaction",
+                       help="transaction handling for multi-statement scripts")
+    query.add_argument("--format", choices=WRITERS)
+    query.add_argument("-o", "--output", help="write the result to a file instead of stdout")
+
+    search = add("search", "find a substring in the text columns of every table; prints CSV")
+    search.add_argument("term")
+    search.add_argument("--table", action="append", help="search only this table (repeatable)")
+    search.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="parallel scans")
+    search.add_argument("--limit", type=int, default=SEARCH_LIMIT_PER_TABLE, help="matches per table")
+    search.add_argument("--index", action="store_true",
+                        help="build or update the <database>.fts full-text index and search it instead of scanning")
+
+    tables = add("tables", "list tables and views with row counts and sizes")
+    tables.add_argument("--exact", action="store_true", help="COUNT(*) every table instead of estimating")
+
+    add("health", "page counts, free space and per-table/index size and fragmentation")
+
+    backup = add("backup", "copy the database, even while it is in use, with the online backup API")
+    backup.add_argument("destination")
+    backup.add_argument("--step-pages", type=int, default=BACKUP_STEP_PAGES, help="pages copied per locked step")
+
+    vacuum_command = add("vacuum", "rebuild the database to reclaim free space")
+    mode = vacuum_command.add_mutually_exclusive_group()
+    mode.add_argument("--into", help="write the compacted copy to a new file instead")
+    mode.add_argument("--incremental", action="store_true", help="only release free pages (needs auto_vacuum = INCREMENTAL)")
+
+    analyze_command = add("analyze", "refresh the query planner's statistics")
+    analyze_command.add_argument("--optimize", action="store_true", help="run PRAGMA optimize instead of a full ANALYZE")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        conn = connect(args)
+        trace = None
+        if args.trace:
+            trace = SqlTrace()
+            trace.enable_log(args.trace)
+            trace.attach(conn, "cli")
+        try:
+            COMMANDS[args.command](args, conn)
+        finally:
+            if trace:
+                trace.finish("cli")
+                trace.disable_log()
+            conn.close()
+    except (sqlite3.Error, ScriptError, OSError, ValueError) as e:
+        print(f"\nerror: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2667 @@
+"""Database engine of Elsakr SQLite Browser.
+
+Everything here works on plain sqlite3 connections and never imports
+tkinter, so the GUI, the command line and benchmarks share one code path.
+"""
+import base64
+import collections
+import contextlib
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from itertools import islice
+from json.encoder import encode_basestring
+# openpyxl is imported where it is first needed
+
+
+# --- Cell Formatting ---
+
+FLOAT_DIGITS = 10
+MAX_CELL_CHARS = 500
+# Leading bytes of a BLOB shown in its cell
+BLOB_PREVIEW_BYTES = 8
+# Previewing grids fetch BLOBs up to this size whole, larger ones only their length and first bytes
+GRID_BLOB_BYTES = 4096
+
+
+class Truncated:
+    """The start of a TEXT or BLOB value cut short in SQL; `size` is its full length."""
+
+    __slots__ = ("value", "size")
+
+    def __init__(self, value, size):
+        self.value = value
+        self.size = size
+
+
+def _format_text(value):
+    if len(value) <= MAX_CELL_CHARS:
+        return value
+    return value[:MAX_CELL_CHARS] + "…"
+
+
+def _format_blob(value, size=None):
+    return f"<BLOB {len(value) if size is None else size:,} B> {value[:BLOB_PREVIEW_BYTES].hex(' ')}"
+
+
+def _format_truncated(cell):
+    if isinstance(cell.value, bytes):
+        return _format_blob(cell.value, cell.size)
+    return f"{cell.value[:MAX_CELL_CHARS]}… ({cell.size:,} chars)"
+
+
+# One formatter per SQLite storage class, looked up by Python type
+CELL_FORMATTERS = {
+    int: lambda value: value,
+    float: lambda value: f"{value:.{FLOAT_DIGITS}g}",
+    str: _format_text,
+    bytes: _format_blob,
+    type(None): lambda value: "NULL",
+    Truncated: _format_truncated,
+}
+
+
+def format_row(row):
+    """Display values for one result row: NULL markers, trimmed floats and BLOB summaries."""
+    formatters = CELL_FORMATTERS
+    return tuple([formatters.get(type(v), str)(v) for v in row])
+
+
+# --- Schema Catalog ---
+
+def column_affinity(declared):
+    """SQLite's affinity for a declared column type; "BLOB" is no affinity."""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "INTEGER"
+    if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+        return "TEXT"
+    if "BLOB" in declared or not declared:
+        return "BLOB"
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return "REAL"
+    return "NUMERIC"
+
+
+class TableInfo:
+    """Cached metadata for one table or view."""
+
+    def __init__(self, name, kind, sql):
+        self.name = name
+        self.kind = kind
+        self.sql = sql
+        # (cid, name, type, notnull, default, pk) as reported by PRAGMA table_info
+        self.columns = []
+        # (name, unique, origin, partial, [column, ...]); expression columns are None
+        self.indexes = []
+        # (id, seq, target table, from column, to column, on update, on delete)
+        self.foreign_keys = []
+        self.triggers = []
+
+    @property
+    def column_names(self):
+        return [col[1] for col in self.columns]
+
+    def affinities(self):
+        """Column name -> affinity; a view's expression columns have none ("BLOB")."""
+        return {col[1]: column_affinity(col[2]) for col in self.columns}
+
+    def indexed_columns(self):
+        """Columns that lead a full (non-partial) index or alias the rowid."""
+        columns = set()
+        pk = [col for col in self.columns if col[5]]
+        if self.kind == "table" and len(pk) == 1 and pk[0][2].upper() == "INTEGER":
+            columns.add(pk[0][1])
+        for name, unique, origin, partial, index_columns in self.indexes:
+            if not partial and index_columns and index_columns[0]:
+                columns.add(index_columns[0])
+        return columns
+
+
+class SchemaCatalog:
+    """In-memory copy of the schema, shared by the sidebar, Structure tab and editor.
+
+    The whole schema is read with a handful of table-valued PRAGMA queries and
+    kept until `PRAGMA schema_version` changes, which costs one header read to
+    check. It is safe to refresh from the Tk thread and from workers.
+    """
+
+    OBJECTS_SQL = "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'view', 'index', 'trigger') ORDER BY name"
+    COLUMNS_SQL = ("SELECT m.name, p.cid, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk "
+                   "FROM sqlite_master AS m, pragma_table_info(m.name) AS p "
+                   "WHERE m.type IN ('table', 'view'){where} ORDER BY m.name, p.cid")
+    INDEXES_SQL = ("SELECT m.name, l.name, l.\"unique\", l.origin, l.partial, i.name "
+                   "FROM sqlite_master AS m, pragma_index_list(m.name) AS l, pragma_index_xinfo(l.name) AS i "
+                   "WHERE m.type = 'table' AND i.key{where} ORDER BY m.name, l.name, i.seqno")
+    FOREIGN_KEYS_SQL = ("SELECT m.name, f.id, f.seq, f.\"table\", f.\"from\", f.\"to\", f.on_update, f.on_delete "
+                        "FROM sqlite_master AS m, pragma_foreign_key_list(m.name) AS f "
+                        "WHERE m.type = 'table'{where} ORDER BY m.name, f.id, f.seq")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.tables = {}
+        self.objects = {"table": [], "view": [], "index": [], "trigger": []}
+        self.sql = {}
+
+    def refresh(self, conn):
+        """Reload if the schema changed since the last call; True if it did."""
+        with self.lock:
+            version = conn.execute("PRAGMA schema_version").fetchone()[0]
+            if version == self.version:
+                return False
+            self._load(conn)
+            self.version = version
+            return True
+
+    def invalidate(self):
+        with self.lock:
+            self.version = None
+
+    def _load(self, conn):
+        tables = {}
+        objects = {"table": [], "view": [], "index": [], "trigger": []}
+        sql = {}
+        triggers = []
+        for kind, name, table_name, create_sql in conn.execute(self.OBJECTS_SQL):
+            objects[kind].append(name)
+            sql[name] = create_sql
+            if kind in ("table", "view"):
+                tables[name] = TableInfo(name, kind, create_sql)
+            elif kind == "trigger":
+                triggers.append((table_name, name))
+
+        for row in self._per_table(conn, self.COLUMNS_SQL, tables):
+            tables[row[0]].columns.append(row[1:])
+        indexes = {}
+        for table_name, index_name, unique, origin, partial, column in self._per_table(conn, self.INDEXES_SQL, tables):
+            if index_name not in indexes:
+                indexes[index_name] = (index_name, bool(unique), origin, bool(partial), [])
+                tables[table_name].indexes.append(indexes[index_name])
+            indexes[index_name][4].append(column)
+        for row in self._per_table(conn, self.FOREIGN_KEYS_SQL, tables):
+            tables[row[0]].foreign_keys.append(row[1:])
+        for table_name, name in triggers:
+            if table_name in tables:
+                tables[table_name].triggers.append(name)
+
+        self.tables, self.objects, self.sql = tables, objects, sql
+
+    @staticmethod
+    def _per_table(conn, sql, tables):
+        try:
+            return conn.execute(sql.format(where="")).fetchall()
+        except sqlite3.Error:
+            # One broken view (e.g. over a dropped table) fails the whole join;
+            # fall back to one query per object and skip the ones that fail
+            rows = []
+            for name in tables:
+                try:
+                    rows.extend(conn.execute(sql.format(where=" AND m.name = ?"), (name,)))
+                except sqlite3.Error:
+                    pass
+            return rows
+
+    def table(self, name):
+        return self.tables.get(name)
+
+    def kind(self, name):
+        for kind, names in self.objects.items():
+            if name in names:
+                return kind
+        return None
+
+    def completions(self, prefix):
+        """Table, view and column names for the query editor.
+
+        `prefix` may be qualified (`table.col`) to complete that table's columns.
+        """
+        if "." in prefix:
+            table_name, _, prefix = prefix.rpartition(".")
+            info = self.tables.get(table_name.strip('"[]`'))
+            names = info.column_names if info else []
+        else:
+            names = list(self.tables)
+            names.extend(sorted({col for info in self.tables.values() for col in info.column_names}))
+        lowered = prefix.lower()
+        return [name for name in dict.fromkeys(names) if name.lower().startswith(lowered)]
+
+
+# --- Table Statistics ---
+
+def estimate_row_counts(conn, catalog):
+    """Instant row estimates: sqlite_stat1 where ANALYZE has run, else max(rowid)."""
+    estimates = {}
+    if "sqlite_stat1" in catalog.tables:
+        for table_name, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            if table_name in catalog.tables and stat:
+                estimates.setdefault(table_name, int(stat.split()[0]))
+    for name in catalog.objects["table"]:
+        if name in estimates:
+            continue
+        try:
+            # One seek to the right edge of the table's B-tree
+            estimates[name] = conn.execute(f"SELECT max(rowid) FROM {quote_ident(name)}").fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID tables have no cheap estimate
+            pass
+    return estimates
+
+
+def object_sizes(conn):
+    """On-disk bytes per table and index from the dbstat virtual table, or None without it."""
+    try:
+        return dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    except sqlite3.OperationalError:
+        return None
+
+
+def format_count(count, exact=True):
+    if exact:
+        return f"{count:,}"
+    for limit, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if count >= limit:
+            return f"~{count / limit:.1f}{suffix}"
+    return f"~{count}"
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class TableStats:
+    """Exact row counts and sizes, kept until another connection commits.
+
+    `PRAGMA data_version` changes whenever a different connection commits,
+    so the stamp is only meaningful on a connection that never writes; the
+    app keeps a dedicated worker for these scans.
+    """
+
+    def __init__(self):
+        self.stamp = None
+        self.counts = {}
+        self.sizes = None
+
+    def validate(self, conn):
+        stamp = conn.execute("PRAGMA data_version").fetchone()[0]
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self.counts = {}
+            self.sizes = None
+        return self
+
+    def count(self, conn, table_name):
+        if table_name not in self.counts:
+            self.counts[table_name] = conn.execute(f"SELECT COUNT(*) FROM {quote_ident(table_name)}").fetchone()[0]
+        return self.counts[table_name]
+
+
+# --- Column Profiling ---
+
+PROFILE_SAMPLE_ROWS = 100000
+PROFILE_SAMPLE_RANGES = 20
+PROFILE_TOP_K = 5
+PROFILE_BINS = 10
+NUMERIC_TYPES = "('integer', 'real')"
+
+
+class ColumnProfile:
+    """Statistics of one column; the top values and histogram arrive after the scan."""
+
+    def __init__(self, name, declared):
+        self.name = name
+        self.declared = declared
+        self.values = 0
+        self.nulls = 0
+        self.distinct = None
+        self.min = None
+        self.max = None
+        self.avg_length = None
+        # (value, count) pairs, most frequent first; None until computed
+        self.top = None
+        # (low, high, count) per bin over the numeric values, or None
+        self.histogram = None
+
+    @property
+    def null_ratio(self):
+        total = self.values + self.nulls
+        return self.nulls / total if total else 0.0
+
+
+class TableProfile:
+    """Column profiles of one table, over all of it or a rowid-range sample."""
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+        self.rows = 0
+        self.sampled = False
+        self.complete = False
+
+
+def profile_source(conn, info, sample_rows=PROFILE_SAMPLE_ROWS):
+    """FROM clause and parameters covering `info`, or a sample of it when it is large.
+
+    Rowid tables whose rowid span exceeds `sample_rows` are read as
+    PROFILE_SAMPLE_RANGES evenly spaced rowid ranges, each one B-tree seek
+    and a short sequential read. Other sources are cut at `sample_rows`.
+    Returns `(sql, params, sampled)`.
+    """
+    source = quote_ident(info.name)
+    if info.kind == "table" and has_rowid(conn, info.name):
+        low, high = conn.execute(f"SELECT min(rowid), max(rowid) FROM {source}").fetchone()
+        if low is None or high - low + 1 <= sample_rows:
+            return source, [], False
+        width = max(sample_rows // PROFILE_SAMPLE_RANGES, 1)
+        step = (high - low + 1) // PROFILE_SAMPLE_RANGES
+        ranges, params = [], []
+        for number in range(PROFILE_SAMPLE_RANGES):
+            ranges.append(f"SELECT * FROM {source} WHERE rowid >= ? AND rowid < ?")
+            params.extend([low + number * step, low + number * step + width])
+        return f"({' UNION ALL '.join(ranges)})", params, True
+    return f"(SELECT * FROM {source} LIMIT ?)", [sample_rows], None
+
+
+def profile_table(conn, info, sample_rows=PROFILE_SAMPLE_ROWS, top_k=PROFILE_TOP_K, bins=PROFILE_BINS,
+                  on_update=None):
+    """Profile every column of the table or view `info`.
+
+    Counts, nulls, distinct counts, min/max and average length of all
+    columns come from one aggregate query, so the source is read once
+    for them. A second aggregate query counts the numeric values of every
+    numeric column below each edge of `bins` equal-width bins, which gives
+    all the histograms. Each column then gets a GROUP BY for its `top_k`
+    values, skipped when every value is distinct; like the scans, it reads
+    at most the `sample_rows` of the source. `on_update(profile)` is called
+    after each aggregate and after each column, so results can be shown as
+    they fill in. Returns the TableProfile.
+    """
+    columns = [ColumnProfile(col[1], col[2]) for col in info.columns]
+    profile = TableProfile(info.name, columns)
+    source, params, sampled = profile_source(conn, info, sample_rows)
+
+    aggregates = ["count(*)"]
+    for column in columns:
+        q = quote_ident(column.name)
+        numeric = f"CASE WHEN typeof({q}) IN {NUMERIC_TYPES} THEN {q} END"
+        aggregates.extend([f"count({q})", f"count(DISTINCT {q})", f"min({q})", f"max({q})", f"avg(length({q}))",
+                           f"count({numeric})", f"min({numeric})", f"max({numeric})"])
+    row = conn.execute(f"SELECT {', '.join(aggregates)} FROM {source}", params).fetchone()
+    profile.rows = row[0]
+    # A LIMITed source is a sample only when it came back full
+    profile.sampled = sampled if sampled is not None else profile.rows >= sample_rows
+    numeric_ranges = []
+    for number, column in enumerate(columns):
+        values, distinct, low, high, avg_length, numbers, num_low, num_high = row[1 + number * 8:9 + number * 8]
+        column.values, column.nulls, column.distinct = values, profile.rows - values, distinct
+        column.min, column.max, column.avg_length = low, high, avg_length
+        numeric_ranges.append((numbers, num_low, num_high))
+    if on_update:
+        on_update(profile)
+
+    histograms = [(column, numbers, low, (high - low) / bins)
+                  for column, (numbers, low, high) in zip(columns, numeric_ranges) if numbers and high > low]
+    if histograms:
+        # Numeric values below each inner bin edge: TEXT, BLOB and NULL never compare below a number
+        counts, edges = [], []
+        for column, _, low, width in histograms:
+            counts.extend([f"sum({quote_ident(column.name)} < ?)"] * (bins - 1))
+            edges.extend(low + n * width for n in range(1, bins))
+        row = conn.execute(f"SELECT {', '.join(counts)} FROM {source}", edges + params).fetchone()
+        for number, (column, numbers, low, width) in enumerate(histograms):
+            below = (0,) + row[number * (bins - 1):(number + 1) * (bins - 1)] + (numbers,)
+            column.histogram = [(low + n * width, low + (n + 1) * width, below[n + 1] - below[n]) for n in range(bins)]
+        if on_update:
+            on_update(profile)
+
+    for column in columns:
+        q = quote_ident(column.name)
+        if column.distinct and column.distinct < column.values:
+            column.top = conn.execute(f"SELECT {q}, count(*) AS n FROM {source} WHERE {q} IS NOT NULL "
+                                      f"GROUP BY {q} ORDER BY n DESC LIMIT ?", params + [top_k]).fetchall()
+        else:
+            column.top = []
+        if on_update:
+            on_update(profile)
+    profile.complete = True
+    return profile
+
+
+class ProfileCache:
+    """TableProfiles kept until another connection commits, like TableStats."""
+
+    def __init__(self):
+        self.stamp = None
+        self.profiles = {}
+
+    def validate(self, conn):
+        stamp = conn.execute("PRAGMA data_version").fetchone()[0]
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self.profiles = {}
+        return self
+
+    def get(self, table_name):
+        profile = self.profiles.get(table_name)
+        return profile if profile and profile.complete else None
+
+    def put(self, profile):
+        self.profiles[profile.table] = profile
+
+
+# --- Result Cache ---
+
+CACHEABLE_SQL = re.compile(r"^\s*(SELECT|WITH|VALUES)\b", re.IGNORECASE)
+# Results that change without any write
+VOLATILE_SQL = re.compile(r"\b(random|randomblob|changes|total_changes|last_insert_rowid|current_(time|date|timestamp))\b|'now'",
+                          re.IGNORECASE)
+
+
+class ResultCache:
+    """LRU cache of query results for one connection, capped at `max_bytes`.
+
+    Entries are keyed on the SQL text and parameters and are valid for one
+    stamp of (schema_version, data_version, total_changes). `data_version`
+    moves when another connection commits and `total_changes` when this one
+    writes, so any write clears the cache on the next lookup. Nothing is
+    cached or served while the connection has a transaction open: a rollback
+    would undo what was read without moving the stamp.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stamp = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(sql, params):
+        # Only the ends are trimmed; whitespace inside string literals is significant
+        return sql.strip().rstrip(";").rstrip(), tuple(params)
+
+    @staticmethod
+    def cacheable(sql):
+        return bool(CACHEABLE_SQL.match(sql)) and not VOLATILE_SQL.search(sql)
+
+    def validate(self, conn):
+        stamp = (id(conn), conn.execute("PRAGMA schema_version").fetchone()[0],
+                 conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+        if stamp != self.stamp:
+            self.clear()
+            self.stamp = stamp
+        return stamp
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def get(self, conn, sql, params=()):
+        """Cached (columns, rows) for the query, or None."""
+        if not self.cacheable(sql) or conn.in_transaction:
+            return None
+        self.validate(conn)
+        entry = self.entries.get(self.key(sql, params))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(self.key(sql, params))
+        return entry[0], entry[1]
+
+    def put(self, conn, sql, params, columns, rows, stamp, size=None):
+        """Store a result read under `stamp`, unless the statement wrote or it is too large."""
+        size = sum(row_size(row) for row in rows) if size is None else size
+        if (not self.cacheable(sql) or conn.in_transaction or size > self.max_bytes // 4
+                or self.validate(conn) != stamp):
+            return
+        key = self.key(sql, params)
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[2]
+        self.entries[key] = (columns, rows, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.size -= self.entries.popitem(last=False)[1][2]
+
+    def rows(self, conn, sql, params=()):
+        """`conn.execute(sql, params).fetchall()`, served from the cache when possible."""
+        cached = self.get(conn, sql, params)
+        if cached is not None:
+            return cached[1]
+        stamp = self.validate(conn)
+        cursor = conn.execute(sql, params)
+        rows = cursor.fetchall()
+        self.put(conn, sql, params, [d[0] for d in cursor.description or ()], rows, stamp)
+        return rows
+
+
+# --- Keyset Paging ---
+
+def quote_ident(name):
+    """Quote a table or column name for use in generated SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def has_rowid(conn, table_name):
+    try:
+        conn.execute(f"SELECT rowid FROM {quote_ident(table_name)} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+# Column filter operators offered from the grid headers
+FILTER_OPERATORS = {
+    "=": "{} = ?",
+    "!=": "{} != ?",
+    ">": "{} > ?",
+    ">=": "{} >= ?",
+    "<": "{} < ?",
+    "<=": "{} <= ?",
+    "contains": "{} LIKE ? ESCAPE '\\'",
+    "starts with": "{} LIKE ? ESCAPE '\\'",
+    "is null": "{} IS NULL",
+    "is not null": "{} IS NOT NULL",
+}
+
+
+def compile_filter(column, op, value, affinity=None):
+    """SQL condition and parameters for one column filter.
+
+    `affinity` is the column's (see column_affinity()); None means unknown.
+    Comparison operands typed in as text are left to the column's affinity
+    to convert, but an untyped column or a view expression has none, and
+    `v > '10'` would compare INTEGER with TEXT and match nothing. Such a
+    column may hold 10 and '10' side by side, so a decimal literal operand
+    is compared as a number with numbers and as typed with text.
+    """
+    quoted = quote_ident(column)
+    sql = FILTER_OPERATORS[op].format(quoted)
+    if op in ("is null", "is not null"):
+        return sql, []
+    if op in ("contains", "starts with"):
+        value = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        value = f"%{value}%" if op == "contains" else f"{value}%"
+        return sql, [value]
+    if isinstance(value, str) and affinity in (None, "BLOB"):
+        number = number_value(value)
+        if number is not None:
+            if op == "=":
+                return f"({quoted} = ? OR {quoted} = ?)", [number, value]
+            if op == "!=":
+                return f"({quoted} != ? AND {quoted} != ?)", [number, value]
+            # Every TEXT value sorts after every number
+            return f"CASE WHEN typeof({quoted}) = 'text' THEN {sql} ELSE {sql} END", [value, number]
+    return sql, [value]
+
+
+class KeysetPager:
+    """Pages through a table by key instead of OFFSET.
+
+    Every window is addressed by a key, so fetching rows deep inside a large
+    table costs one index seek, the same as fetching the first page. The key
+    is the rowid, or `(sort value, rowid, position)` when sorted by a column,
+    which pages with a `(sort key, rowid)` comparison. Views and WITHOUT
+    ROWID tables have no rowid and fall back to LIMIT/OFFSET, where the key is
+    the row's position.
+
+    Filtering and sorting are pushed down to SQLite: a raw `where`
+    expression, column `filters` of (column, operator, value) and `sort`.
+    Table metadata comes from a shared SchemaCatalog, and counts and windows
+    from a ResultCache, when they are given.
+
+    With `preview`, fetched windows of a table carry only the start of long
+    TEXT and BLOB values, as Truncated cells, so multi-megabyte values are
+    never read into memory. view_sql() always selects the full values.
+    """
+
+    def __init__(self, table_name, where=None, filters=(), sort=None, descending=False, catalog=None, cache=None,
+                 preview=False):
+        self.table_name = table_name
+        self.catalog = catalog
+        self.cache = cache
+        self.source = quote_ident(table_name)
+        self.where = where.strip() if where and where.strip() else None
+        self.filters = list(filters)
+        self.sort = sort
+        self.descending = descending
+        self.preview = preview
+        self.has_rowid = False
+        self.columns = []
+        self.affinities = {}
+        # Select list that cuts long values short, and the row positions it cuts
+        self.preview_sql = None
+        self.preview_indexes = []
+        self.blob_prefixes = False
+        self.min_key = None
+        self.max_key = None
+        self.total = 0
+        self.unindexed = []
+
+    @property
+    def keyed_sort(self):
+        return self.sort is not None and self.has_rowid
+
+    def open(self, conn):
+        catalog = self.catalog or SchemaCatalog()
+        catalog.refresh(conn)
+        info = catalog.table(self.table_name)
+        self.has_rowid = False
+        if info and info.kind == "table":
+            try:
+                cursor = conn.execute(f"SELECT rowid AS rowid, * FROM {self.source} LIMIT 0")
+                self.has_rowid = True
+            except sqlite3.OperationalError:
+                pass
+        if not self.has_rowid:
+            cursor = conn.execute(f"SELECT * FROM {self.source} LIMIT 0")
+        self.columns = [d[0] for d in cursor.description]
+        self.affinities = info.affinities() if info else {}
+        if self.has_rowid:
+            self.affinities.setdefault("rowid", "INTEGER")
+        self.preview_sql, self.preview_indexes = None, []
+        if self.preview and info and info.kind == "table":
+            self._build_preview(info)
+
+        # Sorting or filtering on a column without an index means a full scan
+        used = [column for column, _, _ in self.filters] + ([self.sort] if self.sort else [])
+        indexed = (info.indexed_columns() if info else set()) | ({"rowid"} if self.has_rowid else set())
+        self.unindexed = [column for column in dict.fromkeys(used) if column not in indexed]
+
+        where, params = self.where_sql()
+        if self.has_rowid and not self.sort:
+            # min()/max() on rowid are single B-tree seeks; the span is the row estimate
+            self.min_key = self._rows(conn, f"SELECT min(rowid) FROM {self.source}{where}", params)[0][0]
+            self.max_key = self._rows(conn, f"SELECT max(rowid) FROM {self.source}{where}", params)[0][0]
+            self.total = 0 if self.min_key is None else self.max_key - self.min_key + 1
+        else:
+            self.total = self._rows(conn, *self.count_sql())[0][0]
+            self.min_key, self.max_key = (0, self.total - 1) if self.total else (None, None)
+        return self
+
+    def _build_preview(self, info):
+        # The sort column stays whole: its values are the seek keys
+        first = 1 if self.has_rowid else 0
+        # An INTEGER PRIMARY KEY is the rowid itself and never long
+        key = [column for column in info.columns if column[5]]
+        rowid_alias = key[0][1] if self.has_rowid and len(key) == 1 and key[0][2].upper() == "INTEGER" else None
+        # length() of a BLOB reads only the record header but substr() reads all of it, so
+        # rowid tables leave BLOB prefixes to incremental blob I/O in _previewed()
+        blob_prefix = "x''" if self.has_rowid and hasattr(sqlite3.Connection, "blobopen") else None
+        values, sizes = [], []
+        for index, column in enumerate(self.columns[first:], first):
+            quoted = quote_ident(column)
+            if column in (self.sort, rowid_alias):
+                values.append(quoted)
+                continue
+            long_blob = f"typeof({quoted}) = 'blob' AND length({quoted}) > {GRID_BLOB_BYTES}"
+            long_text = f"typeof({quoted}) = 'text' AND length({quoted}) > {MAX_CELL_CHARS}"
+            values.append(f"CASE WHEN {long_blob} THEN {blob_prefix or f'substr({quoted}, 1, {BLOB_PREVIEW_BYTES})'} "
+                          f"WHEN {long_text} THEN substr({quoted}, 1, {MAX_CELL_CHARS}) ELSE {quoted} END")
+            sizes.append(f"CASE WHEN {long_blob} OR {long_text} THEN length({quoted}) END")
+            self.preview_indexes.append(index)
+        self.preview_sql = ", ".join(values + sizes)
+        self.blob_prefixes = blob_prefix is not None
+
+    def _previewed(self, conn, rows):
+        """Rows of the preview select list as grid rows, with Truncated cells."""
+        width = len(self.columns)
+        result = []
+        for row in rows:
+            sizes = row[width:]
+            row = row[:width]
+            if any(size is not None for size in sizes):
+                row = list(row)
+                for index, size in zip(self.preview_indexes, sizes):
+                    if size is None:
+                        continue
+                    value = row[index]
+                    if self.blob_prefixes and value == b"":
+                        value = self._blob_prefix(conn, self.columns[index], row[0])
+                    row[index] = Truncated(value, size)
+            result.append(row)
+        return result
+
+    def _blob_prefix(self, conn, column, rowid):
+        try:
+            with conn.blobopen(self.table_name, column, rowid, readonly=True) as blob:
+                return blob.read(BLOB_PREVIEW_BYTES)
+        except sqlite3.Error:
+            # Changed since the window was read
+            return b""
+
+    def _rows(self, conn, sql, params=()):
+        if self.cache:
+            return self.cache.rows(conn, sql, params)
+        return conn.execute(sql, params).fetchall()
+
+    # --- SQL ---
+
+    def where_sql(self, condition=None, condition_params=()):
+        clauses, params = [], []
+        if self.where:
+            clauses.append(f"({self.where})")
+        for column, op, value in self.filters:
+            sql, values = compile_filter(column, op, value, self.affinities.get(column))
+            clauses.append(sql)
+            params.extend(values)
+        if condition:
+            clauses.append(f"({condition})")
+            params.extend(condition_params)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def filter_sql(self):
+        """The filter as a bare expression (or None) with its parameters."""
+        where, params = self.where_sql()
+        return (where[len(" WHERE "):] or None), params
+
+    def select_sql(self, condition=None, condition_params=(), preview=False):
+        where, params = self.where_sql(condition, condition_params)
+        columns = self.preview_sql if preview and self.preview_sql else "*"
+        if self.has_rowid:
+            return f"SELECT rowid AS rowid, {columns} FROM {self.source}{where}", params
+        return f"SELECT {columns} FROM {self.source}{where}", params
+
+    def order_sql(self, reverse=False):
+        descending = self.descending != reverse
+        direction = " DESC" if descending else ""
+        if self.sort is None:
+            return f" ORDER BY rowid{direction}" if self.has_rowid else ""
+        tiebreak = f", rowid{direction}" if self.has_rowid else ""
+        return f" ORDER BY {quote_ident(self.sort)}{direction}{tiebreak}"
+
+    def view_sql(self):
+        """All rows of the current view, in display order."""
+        sql, params = self.select_sql()
+        return sql + self.order_sql(), params
+
+    def count_sql(self):
+        where, params = self.where_sql()
+        return f"SELECT COUNT(*) FROM {self.source}{where}", params
+
+    def _seek_condition(self, key, forward, inclusive):
+        """Condition for rows after (`forward`) or before `key` in display order."""
+        if not self.keyed_sort:
+            op = (">" if forward else "<") + ("=" if inclusive else "")
+            return f"rowid {op} ?", [key]
+        value, rowid = key[0], key[1]
+        column = quote_ident(self.sort)
+        # Compare in ascending terms, where NULL sorts before every value
+        greater = forward != self.descending
+        rowid_op = (">" if greater else "<") + ("=" if inclusive else "")
+        if value is None:
+            if greater:
+                return f"({column} IS NULL AND rowid {rowid_op} ?) OR {column} IS NOT NULL", [rowid]
+            return f"{column} IS NULL AND rowid {rowid_op} ?", [rowid]
+        op = ">" if greater else "<"
+        sql = f"{column} {op} ? OR ({column} = ? AND rowid {rowid_op} ?)"
+        if not greater:
+            sql += f" OR {column} IS NULL"
+        return sql, [value, value, rowid]
+
+    # --- Fetching ---
+
+    def identity(self, key):
+        """Stable row identity for a key: the rowid where there is one."""
+        return key[1] if self.keyed_sort else key
+
+    def _keyed(self, rows, position, step):
+        if self.keyed_sort:
+            index = self.columns.index(self.sort)
+            return [((row[index], row[0], position + i * step), format_row(row)) for i, row in enumerate(rows)]
+        if self.has_rowid:
+            return [(row[0], format_row(row)) for row in rows]
+        return [(position + i * step, format_row(row)) for i, row in enumerate(rows)]
+
+    def _fetch(self, conn, key, limit, forward, inclusive=False):
+        if not self.has_rowid:
+            if forward:
+                start = max(0, key if inclusive else key + 1) if key is not None else 0
+                count = limit
+            else:
+                end = self.total if key is None else key
+                start = max(0, end - limit)
+                count = end - start
+            sql, params = self.select_sql(preview=True)
+            rows = self._rows(conn, f"{sql}{self.order_sql()} LIMIT ? OFFSET ?", params + [count, start])
+            if self.preview_sql:
+                rows = self._previewed(conn, rows)
+            return self._keyed(rows, start, 1)
+
+        condition, condition_params = self._seek_condition(key, forward, inclusive) if key is not None else (None, ())
+        sql, params = self.select_sql(condition, condition_params, preview=True)
+        rows = self._rows(conn, f"{sql}{self.order_sql(reverse=not forward)} LIMIT ?", params + [limit])
+        if self.preview_sql:
+            rows = self._previewed(conn, rows)
+        # Positions only matter for sorted keys, where they drive the scrollbar
+        if forward:
+            position = 0
+            if key is not None and self.keyed_sort:
+                position = key[2] if inclusive else key[2] + 1
+            return self._keyed(rows, position, 1)
+        position = self.total - 1
+        if key is not None and self.keyed_sort:
+            position = key[2] - 1
+        keyed = self._keyed(rows, position, -1)
+        keyed.reverse()
+        return keyed
+
+    def fetch_first(self, conn, limit):
+        return self._fetch(conn, None, limit, forward=True)
+
+    def fetch_last(self, conn, limit):
+        return self._fetch(conn, None, limit, forward=False)
+
+    def fetch_from(self, conn, key, limit):
+        """Up to `limit` (key, row) pairs starting at `key`, in display order."""
+        return self._fetch(conn, key, limit, forward=True, inclusive=True)
+
+    def fetch_after(self, conn, key, limit):
+        return self._fetch(conn, key, limit, forward=True)
+
+    def fetch_before(self, conn, key, limit):
+        """Up to `limit` (key, row) pairs just before `key`, in display order."""
+        return self._fetch(conn, key, limit, forward=False)
+
+    def key_at(self, conn, fraction):
+        """Key at a relative scroll position (0.0 - 1.0), or None past the end."""
+        if not self.total:
+            return None
+        if self.keyed_sort:
+            position = min(int(fraction * self.total), self.total - 1)
+            sql, params = self.where_sql()
+            row = conn.execute(f"SELECT {quote_ident(self.sort)}, rowid FROM {self.source}{sql}{self.order_sql()} LIMIT 1 OFFSET ?",
+                               params + [position]).fetchone()
+            return (row[0], row[1], position) if row else None
+        if self.has_rowid:
+            key = self.min_key + int(fraction * self.total)
+            return key if key <= self.max_key else None
+        position = int(fraction * self.total)
+        return position if position < self.total else None
+
+    def fraction(self, key):
+        if not self.total:
+            return 0.0
+        if self.keyed_sort:
+            return min(max(key[2] / self.total, 0.0), 1.0)
+        return min(max((key - self.min_key) / self.total, 0.0), 1.0)
+
+
+# --- Connections ---
+
+class ConnectionProfile:
+    """How the UI and worker connections open a database file.
+
+    Read-only and immutable modes go through a `file:` URI. `mmap_size`,
+    `cache_kib`, `temp_store` and `busy_timeout` are applied to every
+    connection. `journal_mode` is persistent in the file, so it is switched
+    once, on the UI connection, and only when writable.
+    """
+
+    FIELDS = ("read_only", "immutable", "mmap_size", "cache_kib", "temp_store", "busy_timeout", "journal_mode")
+    TEMP_STORES = ("default", "file", "memory")
+    JOURNAL_MODES = ("unchanged", "wal", "delete")
+
+    def __init__(self, read_only=False, immutable=False, mmap_size=0, cache_kib=0, temp_store="default",
+                 busy_timeout=5000, journal_mode="unchanged"):
+        self.read_only = read_only
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self.cache_kib = cache_kib
+        self.temp_store = temp_store
+        self.busy_timeout = busy_timeout
+        self.journal_mode = journal_mode
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.FIELDS if name in data})
+
+    def connect(self, path, check_same_thread=True):
+        timeout = self.busy_timeout / 1000
+        if self.read_only or self.immutable:
+            uri = f"{pathlib.Path(path).absolute().as_uri()}?mode=ro" + ("&immutable=1" if self.immutable else "")
+            conn = sqlite3.connect(uri, uri=True, timeout=timeout, check_same_thread=check_same_thread)
+        else:
+            conn = sqlite3.connect(path, timeout=timeout, check_same_thread=check_same_thread)
+        if self.mmap_size:
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.cache_kib:
+            # Negative values are KiB rather than pages
+            conn.execute(f"PRAGMA cache_size = -{int(self.cache_kib)}")
+        if self.temp_store != "default":
+            conn.execute(f"PRAGMA temp_store = {self.temp_store.upper()}")
+        return conn
+
+    def apply_journal_mode(self, conn):
+        if self.journal_mode != "unchanged" and not (self.read_only or self.immutable):
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode.upper()}")
+
+    def describe(self):
+        parts = ["immutable" if self.immutable else "read-only" if self.read_only else "read-write"]
+        if self.mmap_size:
+            parts.append(f"mmap {format_bytes(self.mmap_size)}")
+        if self.cache_kib:
+            parts.append(f"cache {format_bytes(self.cache_kib * 1024)}")
+        return ", ".join(parts)
+
+
+CONNECTION_PRESETS = {
+    "Default": ConnectionProfile(),
+    # Memory-mapped reads and a large cache; mode=ro never takes a write lock
+    "Fast read-only browse": ConnectionProfile(read_only=True, mmap_size=1024 ** 3, cache_kib=128 * 1024, temp_store="memory"),
+    # For snapshots nobody writes to: no locking or change detection at all
+    "Immutable snapshot": ConnectionProfile(read_only=True, immutable=True, mmap_size=1024 ** 3, cache_kib=128 * 1024,
+                                            temp_store="memory"),
+}
+
+PROFILES_PATH = os.path.join(os.path.expanduser("~"), ".elsakr_sqlite_browser.json")
+
+
+def load_settings():
+    """The app's saved settings: per-file profiles and preferences."""
+    try:
+        with open(PROFILES_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_settings(settings):
+    with open(PROFILES_PATH, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2)
+
+
+def load_profile(path):
+    """The profile last used for `path`, or the default one."""
+    saved = load_settings().get("profiles", {}).get(os.path.abspath(path))
+    return ConnectionProfile.from_dict(saved) if saved else ConnectionProfile()
+
+
+def save_profile(path, profile):
+    settings = load_settings()
+    settings.setdefault("profiles", {})[os.path.abspath(path)] = profile.to_dict()
+    save_settings(settings)
+
+
+def open_connection(path, check_same_thread=True, profile=None):
+    """Open a connection to `path`; used for the UI and worker connections alike."""
+    return (profile or ConnectionProfile()).connect(path, check_same_thread=check_same_thread)
+
+
+# --- SQL Trace ---
+
+TRACE_MAX_ENTRIES = 2000
+TRACE_LOG_PATH = os.path.join(os.path.expanduser("~"), ".elsakr_sqlite_browser_trace.log")
+TRACE_LOG_BYTES = 5 * 1024 * 1024
+TRACE_LOG_BACKUPS = 3
+# Memory is sampled at most this often; a statement per row of executemany() would pay for it every time
+TRACE_MEMORY_INTERVAL = 0.25
+
+
+def process_memory():
+    """Resident memory of this process in bytes, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    if os.name == "nt":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                                                     "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                                                     "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class TraceEntry:
+    """One statement seen by SqlTrace."""
+
+    def __init__(self, source, sql, memory):
+        self.source = source
+        self.sql = sql
+        self.time = time.time()
+        self.memory = memory
+        # Filled in when the statement is finished
+        self.elapsed = None
+        self.changes = None
+        # Rows handed to the caller, where the caller reports them
+        self.rows = 0
+
+    def to_dict(self):
+        return {"type": "statement", "time": self.time, "source": self.source, "sql": self.sql,
+                "elapsed": self.elapsed, "rows": self.rows, "changes": self.changes, "memory": self.memory}
+
+
+class TraceOperation:
+    """A user-visible operation with the time spent in each phase, in seconds."""
+
+    def __init__(self, name, phases, rows=None, statements=0):
+        self.name = name
+        self.phases = phases
+        self.rows = rows
+        self.statements = statements
+        self.time = time.time()
+        self.memory = process_memory()
+
+    def to_dict(self):
+        return {"type": "operation", "time": self.time, "name": self.name, "phases": self.phases, "rows": self.rows,
+                "statements": self.statements, "memory": self.memory}
+
+    def summary(self):
+        parts = [f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.phases.items()]
+        if self.rows is not None:
+            parts.append(f"{self.rows:,} rows")
+        if self.statements:
+            parts.append(f"{self.statements} SQL")
+        if self.memory:
+            parts.append(f"RSS {format_bytes(self.memory)}")
+        return f"{self.name}: " + "  ·  ".join(parts)
+
+
+class SqlTrace:
+    """Every statement run on the attached connections, timed, in a bounded log.
+
+    `Connection.set_trace_callback` reports a statement as it starts. It is
+    taken to run, rows fetched included, until the next statement on the
+    same connection or until finish() is called for that connection, which
+    the owner does at the end of each job. Writes record the rows they
+    changed; readers can add the rows they fetched with add_rows().
+
+    Operations recorded with operation() carry a phase breakdown for the
+    status bar. With enable_log() statements and operations also go to a
+    rotating JSON Lines file.
+    """
+
+    def __init__(self, max_entries=TRACE_MAX_ENTRIES):
+        self.lock = threading.Lock()
+        self.entries = collections.deque(maxlen=max_entries)
+        self.operations = collections.deque(maxlen=max_entries)
+        # (source, thread) -> (entry, started, connection, total_changes at start);
+        # two export workers may share a source but never a thread
+        self.running = {}
+        self.logger = None
+        self.memory = None
+        self.memory_at = 0.0
+
+    def attach(self, conn, source, on_statement=None):
+        """Trace `conn` under the name `source`; `on_statement()` follows every statement."""
+        def trace(sql):
+            self.finish(source)
+            entry = TraceEntry(source, sql, self.sample_memory())
+            self.running[source, threading.get_ident()] = (entry, time.perf_counter(), conn, conn.total_changes)
+            with self.lock:
+                self.entries.append(entry)
+            if on_statement:
+                on_statement()
+
+        conn.set_trace_callback(trace)
+
+    def sample_memory(self):
+        now = time.perf_counter()
+        if now - self.memory_at >= TRACE_MEMORY_INTERVAL:
+            self.memory, self.memory_at = process_memory(), now
+        return self.memory
+
+    def finish(self, source):
+        """Close the statement running on `source`, if any; call on that connection's thread."""
+        running = self.running.pop((source, threading.get_ident()), None)
+        if running is None:
+            return
+        entry, started, conn, changes = running
+        entry.elapsed = time.perf_counter() - started
+        try:
+            entry.changes = conn.total_changes - changes
+        except sqlite3.ProgrammingError:
+            # Closed in the meantime
+            pass
+        self._log(entry.to_dict())
+
+    def add_rows(self, source, rows):
+        running = self.running.get((source, threading.get_ident()))
+        if running:
+            running[0].rows += rows
+
+    def operation(self, name, phases, rows=None, since=None):
+        """Record an operation; `since` (a time.time()) counts the statements it issued."""
+        statements = 0
+        if since is not None:
+            with self.lock:
+                statements = sum(1 for entry in self.entries if entry.time >= since)
+        operation = TraceOperation(name, phases, rows, statements)
+        with self.lock:
+            self.operations.append(operation)
+        self._log(operation.to_dict())
+        return operation
+
+    @property
+    def last_operation(self):
+        with self.lock:
+            return self.operations[-1] if self.operations else None
+
+    def snapshot(self):
+        """The traced statements, oldest first."""
+        with self.lock:
+            return list(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.operations.clear()
+
+    def enable_log(self, path=TRACE_LOG_PATH, max_bytes=TRACE_LOG_BYTES, backups=TRACE_LOG_BACKUPS):
+        import logging
+        import logging.handlers
+        self.disable_log()
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger(f"elsakr.trace.{id(self)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.logger = logger
+
+    def disable_log(self):
+        logger, self.logger = self.logger, None
+        if logger:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+    def _log(self, record):
+        logger = self.logger
+        if logger:
+            logger.info(json.dumps(record, default=str))
+
+
+# --- Query Inspection ---
+
+PLAN_FLAGS = (
+    (re.compile(r"^SCAN (?!CONSTANT ROW)"), "full scan"),
+    (re.compile(r"USE TEMP B-TREE"), "temp b-tree"),
+)
+
+
+def plan_flags(detail):
+    """Warnings for one EXPLAIN QUERY PLAN line."""
+    return [flag for pattern, flag in PLAN_FLAGS if pattern.search(detail)]
+
+
+def explain_plan(conn, sql, params=()):
+    """Return the query plan as (id, parent, detail) rows and the time it took.
+
+    Compiling EXPLAIN QUERY PLAN prepares the statement without running it,
+    so the elapsed time is a good measure of the statement's prepare cost.
+    """
+    started = time.perf_counter()
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [(row[0], row[1], row[3]) for row in rows], time.perf_counter() - started
+
+
+class QueryProfile:
+    """Plan and timings for one run of the Execute SQL tab."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.plan = []
+        self.prepare = None
+        self.first_row = 0.0
+        self.fetch = 0.0
+        self.render = 0.0
+        self.steps = 0
+        self.rows = 0
+        self.cached = False
+
+    def flags(self):
+        flags = sorted({flag for _, _, detail in self.plan for flag in plan_flags(detail)})
+        return flags + ["cache hit"] if self.cached else flags
+
+    def summary(self):
+        prepare = "n/a" if self.prepare is None else f"{self.prepare * 1000:.1f} ms"
+        return ("cache hit  ·  " if self.cached else "") + (f"prepare {prepare}  ·  first row {self.first_row * 1000:.1f} ms  ·  "
+                f"fetch {self.fetch * 1000:.1f} ms  ·  render {self.render * 1000:.1f} ms  ·  "
+                f"~{self.steps:,} VM steps  ·  {self.rows:,} rows")
+
+
+# --- Script Runner ---
+
+class QueryCancelled(Exception):
+    """Raised in place of SQLite's 'interrupted' error when a job was cancelled."""
+
+
+class ScriptError(Exception):
+    """A statement of a script failed; `number` and `line` locate it.
+
+    `committed` is the number of the last statement whose changes were
+    committed before the failure, 0 if none were.
+    """
+
+    def __init__(self, number, line, error, committed=0):
+        super().__init__(f"Statement {number} (line {line}) failed: {error}")
+        self.number = number
+        self.line = line
+        self.committed = committed
+
+
+# Statements that end or start a transaction themselves, or cannot run inside one.
+# ROLLBACK TO only rewinds a savepoint.
+TRANSACTION_CONTROL = re.compile(r"(?:\s|--[^\n]*(?:\n|$)|/\*.*?(?:\*/|$))*"
+                                 r"(BEGIN|COMMIT|END|VACUUM|ROLLBACK(?!\s+(?:TRANSACTION\s+)?TO\b))\b",
+                                 re.IGNORECASE | re.DOTALL)
+
+
+def split_statements(script):
+    """Yield (line, statement) for each statement in `script`.
+
+    Candidate ends are the semicolons; `sqlite3.complete_statement` decides
+    which of them really end a statement, so semicolons in strings, comments
+    and trigger bodies are kept.
+    """
+    start, line = 0, 1
+    end = script.find(";")
+    while end != -1:
+        candidate = script[start:end + 1]
+        if sqlite3.complete_statement(candidate):
+            text = candidate.strip()
+            if text.rstrip(";").strip():
+                yield line + candidate[:len(candidate) - len(candidate.lstrip())].count("\n"), text
+            line += candidate.count("\n")
+            start = end + 1
+        end = script.find(";", end + 1)
+    tail = script[start:]
+    if tail.strip():
+        yield line + tail[:len(tail) - len(tail.lstrip())].count("\n"), tail.strip()
+
+
+def run_script(conn, statements, mode="transaction", commit_every=1000, on_statement=None,
+               on_columns=None, on_rows=None, batch_size=500):
+    """Run (line, sql) `statements` in order and return (statements run, rows changed).
+
+    `mode` is "transaction" (all or nothing), "batches" (commit every
+    `commit_every` statements) or "autocommit". A script's own BEGIN,
+    COMMIT, END, ROLLBACK and VACUUM run as written: BEGIN and VACUUM first
+    commit the statements before them, and the mode's transaction resumes
+    with the next statement run outside the script's. Row-returning statements
+    stream through `on_columns(names)` and `on_rows(batch)`, so a caller that
+    resets its view on `on_columns` ends up showing the last one.
+    `on_statement(number, line, sql, elapsed, changes, rows)` reports each
+    statement. On failure the open transaction is rolled back and a
+    ScriptError is raised.
+    """
+    isolation = conn.isolation_level
+    # Transactions are managed here rather than by the sqlite3 module
+    conn.isolation_level = None
+    number = total_changes = committed = 0
+    # Whether the open transaction is the one begun here rather than by the script
+    own = False
+    try:
+        for number, (line, sql) in enumerate(statements, 1):
+            control = TRANSACTION_CONTROL.match(sql)
+            keyword = control.group(1).upper() if control else None
+            # A script's COMMIT or ROLLBACK may end the transaction begun here, but
+            # BEGIN and VACUUM need it ended first
+            if keyword in ("BEGIN", "VACUUM") and own and conn.in_transaction:
+                conn.execute("COMMIT")
+                committed = number - 1
+            own = own and not control
+            if mode != "autocommit" and not control and not conn.in_transaction:
+                conn.execute("BEGIN")
+                own = True
+            started = time.perf_counter()
+            rows = 0
+            try:
+                cursor = conn.execute(sql)
+                if cursor.description is not None:
+                    if on_columns:
+                        on_columns([d[0] for d in cursor.description])
+                    while True:
+                        batch = cursor.fetchmany(batch_size)
+                        if not batch:
+                            break
+                        rows += len(batch)
+                        if on_rows:
+                            on_rows(batch)
+            except sqlite3.Error as e:
+                raise ScriptError(number, line, e, committed) from e
+            # rowcount is sqlite3_changes() for DML and -1 for everything else
+            changes = max(cursor.rowcount, 0) if cursor.description is None else 0
+            total_changes += changes
+            if on_statement:
+                on_statement(number, line, sql, time.perf_counter() - started, changes, rows)
+            if mode == "batches" and number % commit_every == 0 and own and conn.in_transaction:
+                conn.execute("COMMIT")
+            if not conn.in_transaction and keyword != "ROLLBACK":
+                committed = number
+        if conn.in_transaction:
+            conn.execute("COMMIT")
+        return number, total_changes
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.isolation_level = isolation
+
+
+# --- Export ---
+
+EXPORT_CHUNK_ROWS = 5000
+
+
+def stream_csv(conn, sql, path, progress=None, chunk_size=EXPORT_CHUNK_ROWS, params=()):
+    """Write the result of `sql` to `path` as CSV, one fetchmany() chunk at a time.
+
+    Only one chunk is held in memory, whatever the result size. A `.gz` suffix
+    writes gzip-compressed output. `progress(rows_written)` is called after each
+    chunk. BLOBs are written as base64 strings, as in stream_jsonl. Returns
+    the number of rows written; a failed export removes the partial file.
+    """
+    cursor = conn.execute(sql, params)
+    try:
+        with open_text_output(path) as f:
+            return write_csv(cursor, f, progress, chunk_size)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def open_text_output(path):
+    """Open `path` for UTF-8 text, gzip-compressed when it ends in `.gz`."""
+    if path.lower().endswith(".gz"):
+        # zlib's default level: level 9 is ~4x slower for about 1% smaller output
+        return gzip.open(path, "wt", compresslevel=6, newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def _csv_field(value):
+    # The csv module's default dialect, field by field
+    kind = value.__class__
+    if kind is str:
+        if '"' in value or "," in value or "\n" in value or "\r" in value:
+            return '"' + value.replace('"', '""') + '"'
+        return value
+    if kind is bytes:
+        return base64.b64encode(value).decode("ascii")
+    return "" if value is None else str(value)
+
+
+def _csv_lines(rows):
+    # A row of one empty field is written as "" so it does not read back as a blank line
+    return "".join([(",".join(map(_csv_field, row)) or '""') + "\r\n" for row in rows])
+
+
+def write_csv(cursor, f, progress=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """Write an executed cursor's header and rows to the text file `f`."""
+    writer = csv.writer(f)
+    writer.writerow([d[0] for d in cursor.description])
+    written = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        # csv writes the repr() of bytes, and checks long fields a character at a time,
+        # so chunks holding a BLOB are encoded here as base64 (as in stream_jsonl)
+        if any(bytes in map(type, row) for row in rows):
+            f.write(_csv_lines(rows))
+        else:
+            writer.writerows(rows)
+        written += len(rows)
+        if progress:
+            progress(written)
+    return written
+
+
+def _json_float(value):
+    # JSON has no inf or nan
+    return repr(value) if math.isfinite(value) else "null"
+
+
+# Each SQLite value type straight to JSON text, skipping json.dumps' per-call setup
+JSON_ENCODERS = {
+    int: int.__repr__,
+    float: _json_float,
+    str: encode_basestring,
+    bytes: lambda value: '"' + base64.b64encode(value).decode("ascii") + '"',
+    type(None): lambda value: "null",
+}
+
+
+def stream_jsonl(conn, sql, path, progress=None, chunk_size=EXPORT_CHUNK_ROWS, params=()):
+    """Write the result of `sql` to `path` as JSON Lines, one object per row.
+
+    Streams like stream_csv, including `.gz` output and removal of a partial
+    file. BLOBs are written as base64 strings. Returns the number of rows
+    written.
+    """
+    cursor = conn.execute(sql, params)
+    keys = [encode_basestring(d[0]) + ":" for d in cursor.description]
+
+    def encode(row):
+        return "{" + ",".join([key + JSON_ENCODERS[type(value)](value) for key, value in zip(keys, row)]) + "}\n"
+
+    written = 0
+    try:
+        with open_text_output(path) as f:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                f.write("".join(map(encode, rows)))
+                written += len(rows)
+                if progress:
+                    progress(written)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_CELL_CHARS = 32767
+# Control characters that openpyxl refuses to write (same set as its ILLEGAL_CHARACTERS_RE)
+EXCEL_ILLEGAL_CHARS = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+
+def excel_value(value):
+    """Make a SQLite value storable in an Excel cell."""
+    if isinstance(value, bytes):
+        value = value.hex()
+    if isinstance(value, str):
+        value = EXCEL_ILLEGAL_CHARS.sub("", value[:EXCEL_MAX_CELL_CHARS])
+    return value
+
+
+def stream_excel(conn, sql, path, progress=None, chunk_size=EXPORT_CHUNK_ROWS, params=()):
+    """Write the result of `sql` to an .xlsx file through a write-only workbook.
+
+    Rows go straight from fetchmany() chunks to openpyxl's streaming writer, so
+    memory does not grow with the row count. A new sheet is started whenever
+    one reaches Excel's 1,048,576-row limit (header included). Returns the
+    number of rows written.
+    """
+    from openpyxl import Workbook
+
+    cursor = conn.execute(sql, params)
+    header = [d[0] for d in cursor.description]
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_count = 0
+    sheet_rows = 0
+    written = 0
+
+    def new_sheet():
+        nonlocal sheet, sheet_count, sheet_rows
+        sheet_count += 1
+        sheet = workbook.create_sheet(title=f"Sheet{sheet_count}")
+        sheet.append(header)
+        sheet_rows = 1
+
+    try:
+        new_sheet()
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                if sheet_rows == EXCEL_MAX_ROWS:
+                    new_sheet()
+                sheet.append([excel_value(v) for v in row])
+                sheet_rows += 1
+            written += len(rows)
+            if progress:
+                progress(written, f"sheet {sheet_count}")
+        workbook.save(path)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+# --- Database Export ---
+
+DATABASE_EXPORT_FORMATS = ("csv", "csv.gz", "jsonl", "jsonl.gz")
+EXPORT_SPLIT_ROWS = 1000000
+EXPORT_POLL_SECONDS = 0.2
+
+
+class ExportPart:
+    """One output file of a database export: a table or a rowid range of one."""
+
+    def __init__(self, table, path, sql, params, rows):
+        self.table = table
+        self.path = path
+        self.sql = sql
+        self.params = params
+        self.rows = rows
+
+
+def export_file_name(name, used):
+    """A file-system-safe stem for table `name` that is not already in `used`."""
+    stem = re.sub(r"[^\w.-]+", "_", name).strip(".") or "table"
+    candidate, n = stem, 1
+    while candidate.lower() in used:
+        n += 1
+        candidate = f"{stem}_{n}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def plan_export(conn, out_dir, fmt="csv", tables=None, split_rows=None):
+    """List the ExportParts for `tables` (default: every table), largest first.
+
+    Rowid tables larger than `split_rows` are cut into rowid ranges written
+    to `<table>.partNNN.<fmt>`, so one huge table can use several workers.
+    Sizes are estimates (sqlite_stat1 or the rowid span), used for ordering
+    and progress only.
+    """
+    catalog = SchemaCatalog()
+    catalog.refresh(conn)
+    estimates = estimate_row_counts(conn, catalog)
+    if tables is None:
+        tables = [name for name in catalog.objects["table"] if not name.lower().startswith("sqlite_")]
+    used = set()
+    parts = []
+    for name in tables:
+        pager = KeysetPager(name, catalog=catalog).open(conn)
+        stem = os.path.join(out_dir, export_file_name(name, used))
+        estimate = estimates.get(name, pager.total)
+        if split_rows and pager.has_rowid and min(estimate, pager.total) > split_rows:
+            # Equal slices of the rowid span; sparse rowids make them uneven, never more numerous
+            count = -(-min(estimate, pager.total) // split_rows)
+            step = -(-pager.total // count)
+            for number in range(count):
+                start = pager.min_key + number * step
+                sql, params = pager.select_sql("rowid >= ? AND rowid < ?", [start, start + step])
+                parts.append(ExportPart(name, f"{stem}.part{number + 1:03d}.{fmt}", sql + pager.order_sql(), params,
+                                        estimate // count))
+        else:
+            sql, params = pager.view_sql()
+            parts.append(ExportPart(name, f"{stem}.{fmt}", sql, params, estimate))
+    # Largest first, so the long parts start early and small ones fill the gaps
+    parts.sort(key=lambda part: -part.rows)
+    return parts
+
+
+# State of an export worker process, set up once by _init_export_worker
+_export_worker = {}
+
+
+def _init_export_worker(path, profile, written, stop):
+    _export_worker.update(path=path, profile=ConnectionProfile.from_dict(profile), written=written, stop=stop, conn=None)
+
+
+def _export_part(part):
+    """Write one ExportPart on this worker's own read-only connection."""
+    state = _export_worker
+    if state["conn"] is None:
+        state["conn"] = open_connection(state["path"], profile=state["profile"])
+    reported = 0
+
+    def progress(written, note=""):
+        nonlocal reported
+        if state["stop"].is_set():
+            raise QueryCancelled()
+        with state["written"].get_lock():
+            state["written"].value += written - reported
+        reported = written
+
+    writer = stream_jsonl if part.path.lower().endswith((".jsonl", ".jsonl.gz")) else stream_csv
+    return part.table, part.path, writer(state["conn"], part.sql, part.path, progress, params=part.params)
+
+
+def export_database(path, out_dir, fmt="csv", tables=None, workers=4, split_rows=None, profile=None,
+                    progress=None, should_stop=None):
+    """Export tables of the database at `path` to one file each, in parallel.
+
+    Parts from plan_export() are spread over a pool of `workers` processes;
+    CSV and JSON encoding is Python code, so threads would share one core.
+    Each process reads through its own read-only connection opened with
+    `profile`. Those connections each see their own snapshot: the export is
+    consistent across tables only when nothing writes to the file meanwhile,
+    which an immutable profile asserts.
+
+    `progress(rows_written, rows_estimated, parts_done, parts_total)` is
+    called from this thread every EXPORT_POLL_SECONDS; `should_stop()` is
+    checked as often and cancels the pool with QueryCancelled. Returns
+    `(table, file, rows)` for every part written.
+    """
+    profile = ConnectionProfile.from_dict({**(profile or ConnectionProfile()).to_dict(), "read_only": True})
+    os.makedirs(out_dir, exist_ok=True)
+    conn = open_connection(path, profile=profile)
+    try:
+        parts = plan_export(conn, out_dir, fmt, tables, split_rows)
+    finally:
+        conn.close()
+    if not parts:
+        return []
+
+    import multiprocessing
+    # Not fork: the GUI calls this from a worker thread while other threads hold sqlite
+    # and Tk locks, and a forked child would inherit them held
+    context = multiprocessing.get_context("spawn")
+    written, stop = context.Value("q", 0), context.Event()
+    total = sum(part.rows for part in parts)
+    results = []
+    with ProcessPoolExecutor(max(1, min(workers, len(parts))), mp_context=context, initializer=_init_export_worker,
+                             initargs=(os.path.abspath(path), profile.to_dict(), written, stop)) as pool:
+        pending = {pool.submit(_export_part, part) for part in parts}
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=EXPORT_POLL_SECONDS, return_when=FIRST_EXCEPTION)
+                results.extend(future.result() for future in done)
+                if progress:
+                    progress(written.value, total, len(results), len(parts))
+                if should_stop and should_stop():
+                    raise QueryCancelled()
+        except BaseException:
+            # Queued parts never start; running ones stop at their next chunk
+            stop.set()
+            for future in pending:
+                future.cancel()
+            raise
+    return results
+
+
+# --- Global Search ---
+
+SEARCH_LIMIT_PER_TABLE = 100
+SEARCH_PROGRESS_STEPS = 1000
+# LIKE folds ASCII letters only; hits are located in Python with the same rule
+ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+class SearchHit:
+    """One cell that contains the search term."""
+
+    def __init__(self, table, column, key, value):
+        self.table = table
+        self.column = column
+        # rowid of the row, or None in a WITHOUT ROWID table
+        self.key = key
+        self.value = value
+
+
+def text_columns(info):
+    """Columns with TEXT affinity or no declared type, the ones a search scans."""
+    columns = []
+    for _, name, declared, *_ in info.columns:
+        declared = (declared or "").upper()
+        if "INT" not in declared and (not declared or any(word in declared for word in ("CHAR", "CLOB", "TEXT"))):
+            columns.append(name)
+    return columns
+
+
+def search_table(conn, info, term, limit=SEARCH_LIMIT_PER_TABLE):
+    """Up to `limit` SearchHits for `term` in one table, from a single scan.
+
+    All text columns are tested in one `LIKE '%term%' OR ...` query, so the
+    table is read once however many columns it has.
+    """
+    columns = text_columns(info)
+    if not columns or not term:
+        return []
+    conditions, params = [], []
+    for column in columns:
+        sql, values = compile_filter(column, "contains", term)
+        conditions.append(sql)
+        params.extend(values)
+    keyed = info.kind == "table" and has_rowid(conn, info.name)
+    selected = ", ".join(["rowid"] * keyed + [quote_ident(column) for column in columns])
+    cursor = conn.execute(f"SELECT {selected} FROM {quote_ident(info.name)} WHERE {' OR '.join(conditions)} LIMIT ?",
+                          params + [limit])
+    needle = term.translate(ASCII_LOWER)
+    hits = []
+    for row in cursor:
+        key, values = (row[0], row[1:]) if keyed else (None, row)
+        for column, value in zip(columns, values):
+            if value is not None and not isinstance(value, bytes) and needle in str(value).translate(ASCII_LOWER):
+                hits.append(SearchHit(info.name, column, key, value))
+        if len(hits) >= limit:
+            return hits[:limit]
+    return hits
+
+
+class SearchIndex:
+    """An FTS5 trigram index of every table's text columns, for repeat searches.
+
+    The index is a separate file, `<database>.fts`, so building it never
+    writes to the database and works under read-only profiles. It records
+    the size and modification time of the database and its WAL; while they
+    are unchanged, sync() costs two stat calls. After a write, a table is
+    re-indexed when its schema, row count or max(rowid) changed. An UPDATE
+    that leaves all three alone goes unnoticed until sync(rebuild=True).
+
+    Trigrams match any substring of three or more characters, ignoring
+    case like the scan's LIKE does; shorter terms scan the index instead.
+    WITHOUT ROWID tables have no key to index by and are left to scans.
+    """
+
+    SUFFIX = ".fts"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS indexed (id INTEGER PRIMARY KEY, name TEXT UNIQUE, columns TEXT, signature TEXT)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS cells USING fts5(value, tbl UNINDEXED, col UNINDEXED, key UNINDEXED, "
+        "tokenize = 'trigram')",
+    )
+
+    def __init__(self, path, profile=None):
+        self.path = path
+        self.index_path = path + self.SUFFIX
+        self.profile = ConnectionProfile.from_dict({**(profile or ConnectionProfile()).to_dict(), "read_only": True})
+        # Tables the index cannot cover, as of the last sync()
+        self.unindexed = []
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def stamp(self):
+        stats = []
+        for name in (self.path, self.path + "-wal"):
+            try:
+                stat = os.stat(name)
+                stats.append([stat.st_size, stat.st_mtime_ns])
+            except OSError:
+                stats.append(None)
+        return json.dumps(stats)
+
+    def connect(self, check_same_thread=True):
+        conn = sqlite3.connect(pathlib.Path(self.index_path).absolute().as_uri(), uri=True,
+                               check_same_thread=check_same_thread)
+        try:
+            for sql in self.SCHEMA:
+                conn.execute(sql)
+        except sqlite3.OperationalError as e:
+            conn.close()
+            raise sqlite3.NotSupportedError(f"full-text index needs SQLite 3.34+ with FTS5: {e}") from None
+        return conn
+
+    def sync(self, rebuild=False, progress=None, should_stop=None):
+        """Bring the index up to date; returns the names of the tables re-indexed.
+
+        `progress(tables_done, tables_total)` follows the re-indexing and
+        `should_stop()` cancels it with QueryCancelled between tables. Each
+        table is replaced in its own transaction, so a cancelled sync keeps
+        what it finished.
+        """
+        conn = self.connect()
+        source = open_connection(self.path, profile=self.profile)
+        try:
+            stamp = self.stamp()
+            saved = conn.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+            catalog = SchemaCatalog()
+            catalog.refresh(source)
+            tables = [name for name in catalog.objects["table"] if not name.lower().startswith("sqlite_")]
+            keyed = [name for name in tables if has_rowid(source, name)]
+            self.unindexed = [name for name in tables if name not in keyed]
+            if not rebuild and saved and saved[0] == stamp:
+                return []
+
+            indexed = {name: (table_id, signature) for table_id, name, signature
+                       in conn.execute("SELECT id, name, signature FROM indexed")}
+            with conn:
+                for name in set(indexed) - set(keyed):
+                    conn.execute("DELETE FROM cells WHERE tbl = ?", (indexed[name][0],))
+                    conn.execute("DELETE FROM indexed WHERE id = ?", (indexed[name][0],))
+            changed = []
+            for name in keyed:
+                count, max_key = source.execute(f"SELECT count(*), max(rowid) FROM {quote_ident(name)}").fetchone()
+                signature = json.dumps([catalog.sql.get(name), count, max_key])
+                if rebuild or name not in indexed or indexed[name][1] != signature:
+                    changed.append((name, signature))
+
+            conn.execute("ATTACH DATABASE ? AS src", (pathlib.Path(self.path).absolute().as_uri() + "?mode=ro",))
+            if should_stop:
+                conn.set_progress_handler(lambda: 1 if should_stop() else 0, SEARCH_PROGRESS_STEPS)
+            for number, (name, signature) in enumerate(changed):
+                if progress:
+                    progress(number, len(changed))
+                try:
+                    self._index_table(conn, catalog.table(name), indexed.get(name, (None,))[0], signature)
+                except sqlite3.OperationalError:
+                    if should_stop and should_stop():
+                        raise QueryCancelled() from None
+                    raise
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('stamp', ?)", (stamp,))
+            if progress:
+                progress(len(changed), len(changed))
+            return [name for name, _ in changed]
+        finally:
+            source.close()
+            conn.close()
+
+    @staticmethod
+    def _index_table(conn, info, table_id, signature):
+        columns = text_columns(info)
+        source = f"src.{quote_ident(info.name)}"
+        with conn:
+            if table_id is None:
+                table_id = conn.execute("INSERT INTO indexed (name) VALUES (?)", (info.name,)).lastrowid
+            else:
+                conn.execute("DELETE FROM cells WHERE tbl = ?", (table_id,))
+            for number, column in enumerate(columns):
+                quoted = quote_ident(column)
+                conn.execute(f"INSERT INTO cells (value, tbl, col, key) SELECT {quoted}, ?, ?, rowid FROM {source} "
+                             f"WHERE {quoted} IS NOT NULL AND typeof({quoted}) != 'blob'", (table_id, number))
+            conn.execute("UPDATE indexed SET columns = ?, signature = ? WHERE id = ?",
+                         (json.dumps(columns), signature, table_id))
+
+    def search(self, term, limit=SEARCH_LIMIT_PER_TABLE):
+        """SearchHits for `term` from the index, up to `limit` per table."""
+        if not term:
+            return []
+        conn = self.connect()
+        try:
+            tables = {table_id: (name, json.loads(columns or "[]")) for table_id, name, columns
+                      in conn.execute("SELECT id, name, columns FROM indexed")}
+            if len(term) >= 3:
+                where, params = "cells MATCH ?", ['"' + term.replace('"', '""') + '"']
+            else:
+                where, params = compile_filter("value", "contains", term)
+            sql = (f"SELECT tbl, col, key, value FROM (SELECT tbl, col, key, value, "
+                   f"row_number() OVER (PARTITION BY tbl ORDER BY key) AS n FROM cells WHERE {where}) "
+                   f"WHERE n <= ? ORDER BY tbl, key")
+            return [SearchHit(tables[table_id][0], tables[table_id][1][column], key, value)
+                    for table_id, column, key, value in conn.execute(sql, params + [limit])]
+        finally:
+            conn.close()
+
+
+def search_database(path, term, tables=None, workers=4, profile=None, limit=SEARCH_LIMIT_PER_TABLE,
+                    use_index=False, on_hits=None, should_stop=None):
+    """Search the text columns of every table of the database at `path`.
+
+    Tables are scanned largest first on a pool of `workers` threads, each
+    with its own read-only connection; SQLite releases the GIL while it
+    scans, so unlike export_database threads do run in parallel. With
+    `use_index` the SearchIndex is synced and queried instead, and only the
+    tables it cannot cover are scanned.
+
+    `on_hits(table, hits, tables_done, tables_total)` is called on this
+    thread as each table finishes, so results can be shown as they arrive.
+    `should_stop()` is polled by a progress handler on every connection and
+    cancels with QueryCancelled. Returns the SearchHits of all tables.
+    """
+    profile = ConnectionProfile.from_dict({**(profile or ConnectionProfile()).to_dict(), "read_only": True})
+    conn = open_connection(path, profile=profile)
+    try:
+        catalog = SchemaCatalog()
+        catalog.refresh(conn)
+        estimates = estimate_row_counts(conn, catalog)
+    finally:
+        conn.close()
+    if tables is None:
+        tables = [name for name in catalog.objects["table"] if not name.lower().startswith("sqlite_")]
+    infos = sorted((catalog.table(name) for name in tables if catalog.table(name)),
+                   key=lambda info: -estimates.get(info.name, 0))
+    results = []
+    done = 0
+
+    def report(table, hits):
+        nonlocal done
+        done += 1
+        results.extend(hits)
+        if on_hits:
+            on_hits(table, hits, done, len(infos))
+
+    if use_index:
+        index = SearchIndex(path, profile)
+        index.sync(should_stop=should_stop)
+        by_table = {}
+        for hit in index.search(term, limit):
+            by_table.setdefault(hit.table, []).append(hit)
+        unindexed = set(index.unindexed)
+        for info in [info for info in infos if info.name not in unindexed]:
+            report(info.name, by_table.get(info.name, []))
+        infos = [info for info in infos if info.name in unindexed]
+
+    stop = threading.Event()
+    local = threading.local()
+    connections = []
+
+    def abort():
+        return 1 if stop.is_set() or (should_stop and should_stop()) else 0
+
+    def scan(info):
+        if getattr(local, "conn", None) is None:
+            local.conn = open_connection(path, check_same_thread=False, profile=profile)
+            local.conn.set_progress_handler(abort, SEARCH_PROGRESS_STEPS)
+            connections.append(local.conn)
+        try:
+            return info.name, search_table(local.conn, info, term, limit)
+        except sqlite3.OperationalError:
+            if abort():
+                raise QueryCancelled() from None
+            raise
+
+    try:
+        with ThreadPoolExecutor(max(1, min(workers, len(infos)))) as pool:
+            futures = [pool.submit(scan, info) for info in infos]
+            try:
+                for future in as_completed(futures):
+                    report(*future.result())
+            except BaseException:
+                # Queued tables never start; running scans stop at the next progress check
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        for conn in connections:
+            conn.close()
+    return results
+
+
+# --- Import ---
+
+IMPORT_CHUNK_ROWS = 10000
+IMPORT_SAMPLE_ROWS = 1000
+IMPORT_CACHE_KIB = 262144
+# Declared types in widening order; a column takes the widest type seen in the sample
+TYPE_ORDER = ("INTEGER", "REAL", "TEXT", "BLOB")
+
+
+class ImportSource:
+    """Rows of a CSV or Excel file, read lazily and padded to the header width."""
+
+    def __init__(self, path):
+        self.path = path
+        self.closers = []
+        if path.lower().endswith((".xlsx", ".xlsm")):
+            self._open_excel()
+        else:
+            self._open_csv()
+        self.header = self._clean_header(self.header)
+
+    def _open_csv(self):
+        raw = open(self.path, "rb")
+        self.closers.append(raw.close)
+        size = os.fstat(raw.fileno()).st_size
+        stream = gzip.open(raw) if self.path.lower().endswith(".gz") else raw
+        # Closing the wrapper closes the raw file, so it is kept until close()
+        text = self.text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        self.closers.append(text.close)
+        try:
+            dialect = csv.Sniffer().sniff(text.read(64 * 1024), delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        text.seek(0)
+        reader = csv.reader(text, dialect)
+        self.header = next(reader, [])
+        width = len(self.header)
+        # Rows are passed through untouched (empty fields become NULL in the INSERT);
+        # only short and long rows are fitted to the header
+        self.rows = (row if len(row) == width else (row + [""] * width)[:width] for row in reader)
+        self.fraction = lambda: raw.tell() / size if size else None
+
+    def _open_excel(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.path, read_only=True, data_only=True)
+        self.closers.append(workbook.close)
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        self.header = [str(v) if v is not None else "" for v in next(rows, ())]
+        width = len(self.header)
+        total = sheet.max_row or 0
+        done = 0
+
+        def fitted():
+            nonlocal done
+            for row in rows:
+                done += 1
+                row = list(row[:width]) + [None] * (width - len(row))
+                yield [v.isoformat() if hasattr(v, "isoformat") else v for v in row]
+
+        self.rows = fitted()
+        self.fraction = lambda: done / total if total else None
+
+    def _clean_header(self, header):
+        names = []
+        for i, name in enumerate(header):
+            name = (name or "").strip() or f"column{i + 1}"
+            base, n = name, 2
+            while name in names:
+                name, n = f"{base}_{n}", n + 1
+            names.append(name)
+        return names
+
+    def close(self):
+        for close in reversed(self.closers):
+            close()
+
+
+# A decimal literal as SQLite reads one; int() and float() also take '1_000', 'nan' and non-ASCII digits
+NUMBER_LITERAL = re.compile(r"[+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+
+
+def number_value(text):
+    """`text` as an int or float if it is a decimal literal, else None."""
+    text = text.strip()
+    if not NUMBER_LITERAL.fullmatch(text):
+        return None
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    number = int(text)
+    # Past 64 bits SQLite reads the literal as REAL
+    return number if -2 ** 63 <= number < 2 ** 63 else float(number)
+
+
+def value_type(value):
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if isinstance(value, bytes):
+        return "BLOB"
+    text = str(value).strip()
+    number = number_value(text)
+    if number is None:
+        return "TEXT"
+    if isinstance(number, float):
+        return "REAL"
+    # Leading zeros (ZIP codes, IDs) must survive as text
+    return "TEXT" if len(text) > 1 and text.lstrip("+-").startswith("0") else "INTEGER"
+
+
+def infer_column_types(rows, width):
+    """Declared type per column from a sample of rows."""
+    types = []
+    for i in range(width):
+        seen = {value_type(row[i]) for row in rows if row[i] not in (None, "")}
+        types.append(max(seen, key=TYPE_ORDER.index) if seen else "TEXT")
+    return types
+
+
+def bulk_import(conn, path, table_name, rebuild_indexes=False, progress=None, chunk_size=IMPORT_CHUNK_ROWS):
+    """Load a CSV or Excel file into `table_name` and return the number of rows.
+
+    The file is read in chunks, each inserted with executemany(), all inside a
+    single transaction so a failed or cancelled import leaves nothing behind.
+    A missing table is created with column types inferred from a sample;
+    an existing one is appended to by column name. While loading, the
+    connection runs with synchronous=OFF, an in-memory journal and a large
+    page cache. With `rebuild_indexes`, the table's indexes are dropped first
+    and recreated once after the load. `progress(rows, fraction)` reports
+    after each chunk.
+    """
+    source = ImportSource(path)
+    try:
+        header = source.header
+        if not header:
+            raise ValueError("The file has no header row")
+        sample = list(islice(source.rows, IMPORT_SAMPLE_ROWS))
+        target = quote_ident(table_name)
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+        if exists:
+            table_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({target})")}
+            missing = [name for name in header if name not in table_columns]
+            if missing:
+                raise ValueError(f"Columns not in {table_name}: {', '.join(missing)}")
+        # NULLIF maps empty CSV fields to NULL inside SQLite, cheaper than doing it per value in Python
+        placeholders = ", ".join(["NULLIF(?, '')"] * len(header))
+        insert_sql = f"INSERT INTO {target} ({', '.join(quote_ident(h) for h in header)}) VALUES ({placeholders})"
+
+        saved = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in ("synchronous", "journal_mode", "cache_size")}
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(f"PRAGMA cache_size = -{IMPORT_CACHE_KIB}")
+        if saved["journal_mode"] != "wal":
+            conn.execute("PRAGMA journal_mode = MEMORY")
+        try:
+            conn.execute("BEGIN")
+            indexes = []
+            if not exists:
+                types = infer_column_types(sample, len(header))
+                columns = ", ".join(f"{quote_ident(h)} {t}" for h, t in zip(header, types))
+                conn.execute(f"CREATE TABLE {target} ({columns})")
+            elif rebuild_indexes:
+                indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                                       (table_name,)).fetchall()
+                for name, _ in indexes:
+                    conn.execute(f"DROP INDEX {quote_ident(name)}")
+
+            rows = 0
+            chunk = sample
+            while chunk:
+                conn.executemany(insert_sql, chunk)
+                rows += len(chunk)
+                if progress:
+                    progress(rows, source.fraction())
+                chunk = list(islice(source.rows, chunk_size))
+
+            for _, sql in indexes:
+                conn.execute(sql)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(f"PRAGMA journal_mode = {saved['journal_mode']}")
+            conn.execute(f"PRAGMA synchronous = {saved['synchronous']}")
+            conn.execute(f"PRAGMA cache_size = {saved['cache_size']}")
+        return rows
+    finally:
+        source.close()
+
+
+# --- Bulk Delete ---
+
+DELETE_BATCH_ROWS = 500
+
+
+def row_size(row):
+    """Rough in-memory size of a fetched row, for capping undo buffers and caches."""
+    return 64 + sum(len(v) if isinstance(v, (str, bytes)) else 16 for v in row)
+
+
+def stored_columns(conn, table_name):
+    """Columns of `table_name` that an INSERT can set.
+
+    table_xinfo's `hidden` is 2 or 3 for generated columns, which cannot be
+    inserted, and 1 for the hidden columns of a virtual table.
+    """
+    return [row[1] for row in conn.execute(f"PRAGMA table_xinfo({quote_ident(table_name)})") if not row[6]]
+
+
+@contextlib.contextmanager
+def write_transaction(conn, name="elsakr_write"):
+    """Make the enclosed writes atomic.
+
+    They get their own transaction, committed at the end, or a savepoint
+    when the caller already has one open (an earlier uncommitted statement),
+    which is left for the caller to commit. Either way an error undoes only
+    the enclosed writes.
+    """
+    if conn.in_transaction:
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        conn.execute(f"RELEASE {name}")
+        return
+    conn.execute("BEGIN")
+    try:
+        yield
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+class UndoBuffer:
+    """Rows removed by one delete, kept so the delete can be rolled back.
+
+    Holds at most `max_bytes` of row data; a delete larger than that marks
+    the buffer as overflowed and keeps nothing.
+    """
+
+    def __init__(self, table_name, max_bytes):
+        self.table_name = table_name
+        self.max_bytes = max_bytes
+        self.columns = []
+        self.rows = []
+        self.size = 0
+        self.overflowed = False
+
+    def add(self, cursor_description, rows):
+        if self.overflowed:
+            return
+        self.columns = [d[0] for d in cursor_description]
+        self.size += sum(row_size(row) for row in rows)
+        if self.size > self.max_bytes:
+            self.overflowed = True
+            self.rows = []
+            return
+        self.rows.extend(rows)
+
+    def restore(self, conn):
+        """Re-insert the saved rows with their original rowids; returns the count.
+
+        Generated columns are left for SQLite to compute again.
+        """
+        stored = set(stored_columns(conn, self.table_name)) | {"rowid"}
+        keep = [i for i, column in enumerate(self.columns) if column in stored]
+        rows = self.rows
+        if len(keep) < len(self.columns):
+            rows = [[row[i] for i in keep] for row in rows]
+        columns = ", ".join(quote_ident(self.columns[i]) for i in keep)
+        placeholders = ", ".join("?" * len(keep))
+        with write_transaction(conn):
+            conn.executemany(f"INSERT INTO {quote_ident(self.table_name)} ({columns}) VALUES ({placeholders})", rows)
+        return len(self.rows)
+
+
+def delete_rows(conn, table_name, rowids=None, where=None, undo=None, params=()):
+    """Delete rows by rowid or by a WHERE expression (with `params`) in one transaction.
+
+    Rowid lists go through a single executemany(); a WHERE expression is a
+    single set-based DELETE. The doomed rows are read into `undo` first, in
+    rowid IN (...) batches or one streaming scan. Returns the deleted count.
+    """
+    source = quote_ident(table_name)
+    if undo is not None:
+        # Generated columns are recomputed on restore, so they are not saved
+        selected = ", ".join(["rowid AS rowid"] + [quote_ident(column) for column in stored_columns(conn, table_name)])
+    with write_transaction(conn):
+        if rowids is not None:
+            rowids = list(rowids)
+            if undo is not None:
+                for i in range(0, len(rowids), DELETE_BATCH_ROWS):
+                    batch = rowids[i:i + DELETE_BATCH_ROWS]
+                    cursor = conn.execute(f"SELECT {selected} FROM {source} WHERE rowid IN ({', '.join('?' * len(batch))})", batch)
+                    undo.add(cursor.description, cursor.fetchall())
+            cursor = conn.executemany(f"DELETE FROM {source} WHERE rowid = ?", [(rowid,) for rowid in rowids])
+        else:
+            condition = f" WHERE ({where})" if where else ""
+            if undo is not None:
+                cursor = conn.execute(f"SELECT {selected} FROM {source}{condition}", params)
+                while not undo.overflowed:
+                    batch = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+                    if not batch:
+                        break
+                    undo.add(cursor.description, batch)
+            cursor = conn.execute(f"DELETE FROM {source}{condition}", params)
+        deleted = cursor.rowcount
+    return deleted
+
+
+# --- Cell Editing ---
+
+class PendingEdits:
+    """Cell edits to one rowid table, held until they are saved or reverted.
+
+    Edits are keyed by rowid and column: editing a cell again replaces the
+    pending value, and editing it back to its original drops the edit.
+    """
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        # rowid -> {column: (original value, new value)}
+        self.rows = {}
+
+    def __len__(self):
+        return sum(len(columns) for columns in self.rows.values())
+
+    def set(self, rowid, column, original, value):
+        columns = self.rows.setdefault(rowid, {})
+        if column in columns:
+            original = columns[column][0]
+        if type(value) is type(original) and value == original:
+            columns.pop(column, None)
+            if not columns:
+                del self.rows[rowid]
+        else:
+            columns[column] = (original, value)
+
+    def get(self, rowid, column, default=None):
+        edit = self.rows.get(rowid, {}).get(column)
+        return edit[1] if edit else default
+
+    def columns_of(self, rowid):
+        """Columns with a pending edit in the row `rowid`, mapped to their new values."""
+        return {column: value for column, (_, value) in self.rows.get(rowid, {}).items()}
+
+    def clear(self):
+        self.rows.clear()
+
+    def apply(self, conn):
+        """Write every edit in one transaction; returns the number of cells updated.
+
+        Edits are grouped by column so each column is one executemany() of
+        `UPDATE ... SET column = ? WHERE rowid = ?`.
+        """
+        by_column = {}
+        for rowid, columns in self.rows.items():
+            for column, (_, value) in columns.items():
+                by_column.setdefault(column, []).append((value, rowid))
+        source = quote_ident(self.table_name)
+        with write_transaction(conn):
+            for column, params in by_column.items():
+                conn.executemany(f"UPDATE {source} SET {quote_ident(column)} = ? WHERE rowid = ?", params)
+        updated = len(self)
+        self.rows.clear()
+        return updated
+
+
+# --- Large Values ---
+
+VALUE_CHUNK_BYTES = 1024 * 1024
+# How much of a value the viewer reads for its text and hex views
+VALUE_PREVIEW_BYTES = 64 * 1024
+HEX_DUMP_WIDTH = 16
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"), (b"\xff\xd8\xff", "jpeg"), (b"GIF87a", "gif"), (b"GIF89a", "gif"),
+    (b"BM", "bmp"), (b"II*\x00", "tiff"), (b"MM\x00*", "tiff"), (b"\x00\x00\x01\x00", "ico"),
+)
+# PRAGMA encoding -> Python codec for TEXT read as bytes
+TEXT_CODECS = {"UTF-8": "utf-8", "UTF-16le": "utf-16-le", "UTF-16be": "utf-16-be"}
+
+
+def sniff_image(data):
+    """The image format `data` starts with ("png", "jpeg", ...), or None."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, fmt in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return fmt
+    return None
+
+
+def hex_dump(data, offset=0, width=HEX_DUMP_WIDTH):
+    """Offset, hex and printable-ASCII columns, one line per `width` bytes."""
+    lines = []
+    for start in range(0, len(data), width):
+        piece = data[start:start + width]
+        text = "".join(chr(b) if 32 <= b < 127 else "." for b in piece)
+        lines.append(f"{offset + start:08x}  {piece.hex(' '):<{width * 3 - 1}}  {text}")
+    return "\n".join(lines)
+
+
+class ValueReader:
+    """Reads one stored TEXT or BLOB value of a rowid table in pieces.
+
+    The value is opened with incremental blob I/O (`Connection.blobopen`),
+    so a range is read without loading the rest of the value; where that is
+    unavailable each range is cut with substr(). TEXT is read as bytes in
+    the database encoding, which decode() turns back into str. Use on one
+    thread and close() when done.
+    """
+
+    def __init__(self, conn, table_name, column, rowid):
+        self.conn = conn
+        self.table_name = table_name
+        self.column = column
+        self.rowid = rowid
+        self.blob = None
+        quoted, source = quote_ident(column), quote_ident(table_name)
+        row = conn.execute(f"SELECT typeof({quoted}) FROM {source} WHERE rowid = ?", (rowid,)).fetchone()
+        if row is None:
+            raise ValueError(f"no row {rowid} in {table_name}")
+        self.kind = row[0]
+        if self.kind not in ("text", "blob"):
+            raise ValueError(f"{column} of row {rowid} is {self.kind.upper()}, not TEXT or BLOB")
+        self.encoding = TEXT_CODECS.get(conn.execute("PRAGMA encoding").fetchone()[0], "utf-8")
+        if hasattr(conn, "blobopen"):
+            try:
+                self.blob = conn.blobopen(table_name, column, rowid, readonly=True)
+            except sqlite3.OperationalError:
+                # Generated and other unopenable columns are read with substr()
+                pass
+        if self.blob is not None:
+            self.size = len(self.blob)
+        else:
+            self.size = conn.execute(f"SELECT length(CAST({quoted} AS BLOB)) FROM {source} WHERE rowid = ?",
+                                     (rowid,)).fetchone()[0]
+
+    def read(self, offset=0, size=None):
+        """Up to `size` bytes from `offset`; the rest of the value without a size."""
+        size = self.size - offset if size is None else min(size, self.size - offset)
+        if size <= 0:
+            return b""
+        if self.blob is not None:
+            self.blob.seek(offset)
+            return self.blob.read(size)
+        row = self.conn.execute(f"SELECT substr(CAST({quote_ident(self.column)} AS BLOB), ?, ?) "
+                                f"FROM {quote_ident(self.table_name)} WHERE rowid = ?",
+                                (offset + 1, size, self.rowid)).fetchone()
+        return row[0] if row and row[0] is not None else b""
+
+    def chunks(self, chunk_size=VALUE_CHUNK_BYTES, should_stop=None):
+        for offset in range(0, self.size, chunk_size):
+            if should_stop and should_stop():
+                raise QueryCancelled()
+            yield self.read(offset, chunk_size)
+
+    def decode(self, data):
+        """TEXT bytes as str; a piece cut inside a character ends in a replacement mark."""
+        return data.decode(self.encoding, errors="replace")
+
+    def save(self, path, progress=None, should_stop=None):
+        """Write the value to `path` one chunk at a time; returns the bytes written.
+
+        TEXT is written in the database encoding. `progress(written, size)`
+        follows every chunk.
+        """
+        written = 0
+        with open(path, "wb") as f:
+            for chunk in self.chunks(should_stop=should_stop):
+                f.write(chunk)
+                written += len(chunk)
+                if progress:
+                    progress(written, self.size)
+        return written
+
+    def close(self):
+        if self.blob is not None:
+            self.blob.close()
+            self.blob = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Maintenance ---
+
+AUTO_VACUUM_MODES = ("none", "full", "incremental")
+# Pages per backup step; the source is only read-locked while a step runs
+BACKUP_STEP_PAGES = 1024
+# Free pages released per incremental_vacuum transaction
+VACUUM_STEP_PAGES = 1024
+PROGRESS_POLL_SECONDS = 0.2
+
+
+class ObjectHealth:
+    """Space use of one table or index B-tree, from dbstat."""
+
+    def __init__(self, name, kind, pages, size, payload, unused, gaps):
+        self.name = name
+        self.kind = kind
+        self.pages = pages
+        self.size = size
+        self.payload = payload
+        self.unused = unused
+        # Pages that do not directly follow the previous page of the tree on disk
+        self.gaps = gaps
+
+    @property
+    def unused_ratio(self):
+        return self.unused / self.size if self.size else 0.0
+
+    @property
+    def fragmentation(self):
+        """Share of out-of-sequence pages, as sqlite3_analyzer reports it."""
+        return self.gaps / (self.pages - 1) if self.pages > 1 else 0.0
+
+
+class DatabaseHealth:
+    """File-level page counts and, where dbstat exists, per-object space use."""
+
+    def __init__(self, page_size, page_count, freelist, auto_vacuum, journal_mode, objects):
+        self.page_size = page_size
+        self.page_count = page_count
+        self.freelist = freelist
+        self.auto_vacuum = auto_vacuum
+        self.journal_mode = journal_mode
+        # ObjectHealth, largest first; None without the dbstat virtual table
+        self.objects = objects
+
+    @property
+    def size(self):
+        return self.page_count * self.page_size
+
+    @property
+    def free_bytes(self):
+        return self.freelist * self.page_size
+
+    @property
+    def freelist_ratio(self):
+        return self.freelist / self.page_count if self.page_count else 0.0
+
+
+def database_health(conn):
+    """Page counts, freelist and per-table/index size and fragmentation.
+
+    dbstat reads every page of the file, so on a large database this is a
+    full scan; run it off the Tk thread.
+    """
+    def pragma(name):
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    kinds = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+    try:
+        rows = conn.execute(
+            "SELECT name, COUNT(*), SUM(pgsize), SUM(payload), SUM(unused), SUM(prev IS NOT NULL AND pageno != prev + 1) "
+            "FROM (SELECT name, pageno, pgsize, payload, unused, lag(pageno) OVER (PARTITION BY name ORDER BY path) AS prev "
+            "FROM dbstat) GROUP BY name ORDER BY SUM(pgsize) DESC").fetchall()
+        objects = [ObjectHealth(name, kinds.get(name, "table"), *values) for name, *values in rows]
+    except sqlite3.OperationalError:
+        objects = None
+    auto_vacuum = pragma("auto_vacuum")
+    return DatabaseHealth(pragma("page_size"), pragma("page_count"), pragma("freelist_count"),
+                          AUTO_VACUUM_MODES[auto_vacuum] if 0 <= auto_vacuum < len(AUTO_VACUUM_MODES) else str(auto_vacuum),
+                          pragma("journal_mode"), objects)
+
+
+def analyze(conn, optimize=False):
+    """Refresh the planner's statistics: ANALYZE, or only where needed with PRAGMA optimize."""
+    conn.execute("PRAGMA optimize" if optimize else "ANALYZE")
+    conn.commit()
+
+
+def incremental_vacuum(conn, step_pages=VACUUM_STEP_PAGES, progress=None, should_stop=None):
+    """Return free pages to the OS a step at a time; returns the pages released.
+
+    Each step is its own short transaction, so readers and writers get in
+    between. Needs `PRAGMA auto_vacuum = INCREMENTAL`.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        raise ValueError("incremental vacuum needs auto_vacuum = INCREMENTAL; run a full VACUUM after setting it")
+    total = remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    while remaining:
+        if should_stop and should_stop():
+            raise QueryCancelled()
+        conn.execute(f"PRAGMA incremental_vacuum({int(step_pages)})").fetchall()
+        conn.commit()
+        left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if left >= remaining:
+            # Another writer is freeing pages as fast as they are released
+            break
+        remaining = left
+        if progress:
+            progress(total - remaining, total)
+    return total - remaining
+
+
+def vacuum(conn, into=None, progress=None):
+    """Rebuild the database compactly, in place or into a new file; returns (bytes before, bytes after).
+
+    SQLite reports no progress for VACUUM. With `into`, the copy is written
+    to `<into>.part`, whose growth is reported as `progress(written, expected)`,
+    and renamed once complete.
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages, free = (conn.execute(f"PRAGMA {name}").fetchone()[0] for name in ("page_count", "freelist_count"))
+    if into is None:
+        conn.execute("VACUUM")
+        return pages * page_size, conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+
+    part = into + ".part"
+    if os.path.exists(part):
+        os.remove(part)
+    expected = (pages - free) * page_size
+    done = threading.Event()
+
+    def watch():
+        while not done.wait(PROGRESS_POLL_SECONDS):
+            try:
+                progress(os.path.getsize(part), expected)
+            except OSError:
+                pass
+
+    watcher = None
+    if progress:
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+    try:
+        conn.execute("VACUUM INTO ?", (part,))
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+    finally:
+        done.set()
+        if watcher:
+            watcher.join()
+    os.replace(part, into)
+    return pages * page_size, os.path.getsize(into)
+
+
+def backup_database(conn, path, step_pages=BACKUP_STEP_PAGES, progress=None, should_stop=None):
+    """Copy a live database to `path` with the online backup API; returns the bytes written.
+
+    Pages are copied `step_pages` at a time and the source is read-locked
+    only during a step, so other connections keep reading and writing; a
+    write from another connection restarts the copy. The copy goes to
+    `<path>.part` and is renamed once complete. `progress(copied, total)`
+    is in pages.
+    """
+    part = path + ".part"
+    if os.path.exists(part):
+        os.remove(part)
+
+    def on_step(status, remaining, total):
+        if should_stop and should_stop():
+            raise QueryCancelled()
+        if progress:
+            progress(total - remaining, total)
+
+    target = sqlite3.connect(part)
+    try:
+        conn.backup(target, pages=step_pages, progress=on_step)
+    except BaseException:
+        target.close()
+        os.remove(part)
+        raise
+    target.close()
+    os.replace(part, path)
+    return os.path.getsize(path)
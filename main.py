@@ -1,11 +1,38 @@
 
+import time
+STARTED_AT = time.perf_counter()
+
+import sys
+if __name__ == "__main__" and getattr(sys, "frozen", False):
+    # A frozen build starts its export worker processes by running this executable again
+    import multiprocessing
+    multiprocessing.freeze_support()
+if __name__ == "__main__" and len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+    # Command-line mode: export/query/tables run headless and never import tkinter
+    from cli import main as cli_main
+    sys.exit(cli_main())
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import sqlite3
-import pandas as pd
+import argparse
 import os
-import sys
-from PIL import Image, ImageTk
+import re
+import queue
+import threading
+import codecs
+import io
+from engine import (
+    CONNECTION_PRESETS, DATABASE_EXPORT_FORMATS, EXPORT_SPLIT_ROWS, FILTER_OPERATORS, MAX_CELL_CHARS, TRACE_LOG_PATH,
+    VALUE_PREVIEW_BYTES, ConnectionProfile, KeysetPager, PendingEdits, ProfileCache, QueryCancelled, QueryProfile,
+    ResultCache, SchemaCatalog, ScriptError, SqlTrace, TableStats, UndoBuffer, ValueReader, analyze, backup_database,
+    bulk_import, database_health, delete_rows, estimate_row_counts, explain_plan, export_database, format_bytes,
+    format_count, format_row, hex_dump, incremental_vacuum, load_profile, load_settings, object_sizes, open_connection,
+    plan_flags, profile_table, quote_ident, row_size, run_script, save_profile, save_settings, search_database,
+    sniff_image, split_statements, stream_csv, stream_excel, vacuum,
+)
+# Pillow and openpyxl are imported where they are first needed to keep startup fast
+IMPORTED_AT = time.perf_counter()
 
 # ... (Colors, PremiumButton, PremiumCard classes stay same) ...
 
@@ -112,10 +139,605 @@ class PremiumCard(tk.Frame):
         self.config(highlightbackground=Colors.BORDER, highlightthickness=1)
 
 
+class ProgressDialog(tk.Toplevel):
+    """Progress window for long-running background jobs."""
+    
+    def __init__(self, parent, title, on_cancel=None, unit="rows"):
+        super().__init__(parent, bg=Colors.BG_DARK)
+        self.title(title)
+        self.geometry("440x180")
+        self.resizable(False, False)
+        self.transient(parent)
+        
+        self.on_cancel = on_cancel
+        self.unit = unit
+        self.total = None
+        self.started = time.perf_counter()
+        
+        tk.Label(self, text=title, font=("Segoe UI Semibold", 11), bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY).pack(anchor="w", padx=20, pady=(20, 10))
+        
+        # Indeterminate until the total is known
+        self.bar = ttk.Progressbar(self, mode="indeterminate", length=400)
+        self.bar.pack(padx=20)
+        self.bar.start(15)
+        
+        self.detail = tk.Label(self, text="Starting…", font=("Segoe UI", 9), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY)
+        self.detail.pack(anchor="w", padx=20, pady=10)
+        
+        PremiumButton(self, text="⏹ Cancel", command=self.cancel, width=100, height=32, color=Colors.ERROR).pack(pady=(0, 15))
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        
+    def set_total(self, total):
+        self.total = total
+        if total:
+            self.bar.stop()
+            self.bar.config(mode="determinate", maximum=total, value=0)
+            
+    def set_progress(self, done, note="", fraction=None):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        text = f"{done:,} {self.unit}"
+        if fraction is not None:
+            # Progress measured by something other than the count, e.g. bytes read
+            if str(self.bar.cget("mode")) != "determinate":
+                self.bar.stop()
+                self.bar.config(mode="determinate", maximum=1.0)
+            self.bar.config(value=fraction)
+        elif self.total:
+            self.bar.config(value=min(done, self.total))
+            text = f"{done:,} / {self.total:,} {self.unit}"
+        text += f"  ·  {done / elapsed:,.0f} {self.unit}/s  ·  {elapsed:.1f}s"
+        if note:
+            text += f"  ·  {note}"
+        self.detail.config(text=text)
+        
+    def cancel(self):
+        if self.on_cancel:
+            self.on_cancel()
+        self.detail.config(text="Cancelling…")
+        
+    def close(self):
+        self.bar.stop()
+        self.destroy()
+
+
+# --- Virtual Data Grid ---
+
+class VirtualGrid:
+    """Shows a window of a KeysetPager in a fixed pool of Treeview rows.
+
+    Only the visible rows plus a prefetch margin on either side are held in
+    memory. Scrolling moves the window over that buffer and reuses the same
+    Treeview items, so scrolling cost does not depend on the table size.
+
+    `loader(job, callback, errback)` runs `job(conn)` and hands the result to
+    `callback`, which lets the owner decide where queries execute.
+    `decorate(key, values)` may return replacement values and item tags for
+    a row as it is drawn, e.g. to overlay unsaved edits.
+    """
+
+    PREFETCH_PAGES = 2
+
+    def __init__(self, tree, scrollbar, loader, on_change=None, on_error=None, on_heading=None, on_heading_menu=None,
+                 decorate=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.loader = loader
+        self.decorate = decorate
+        self.on_change = on_change
+        self.on_error = on_error
+        self.on_heading = on_heading
+        self.on_heading_menu = on_heading_menu
+
+        self.pager = None
+        self.buffer = []
+        self.top = 0
+        self.at_start = True
+        self.at_end = True
+        self.loading = False
+        self.pending = 0
+        self.generation = 0
+        self.selected = set()
+        self._jump_to = None
+
+        self.slots = []
+        self.slot_index = {}
+        self.attached = 0
+        self.visible = 0
+        self.set_visible_rows(20)
+
+        scrollbar.configure(command=self.on_scrollbar)
+        tree.bind("<Configure>", self.on_resize, add="+")
+        tree.bind("<MouseWheel>", self.on_wheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-3) or "break")
+        tree.bind("<Button-5>", lambda e: self.scroll(3) or "break")
+        tree.bind("<Prior>", lambda e: self.scroll(-self.visible) or "break")
+        tree.bind("<Next>", lambda e: self.scroll(self.visible) or "break")
+        tree.bind("<Control-Home>", lambda e: self.jump(0.0) or "break")
+        tree.bind("<Control-End>", lambda e: self.jump(1.0) or "break")
+        tree.bind("<Up>", lambda e: self.on_arrow(-1))
+        tree.bind("<Down>", lambda e: self.on_arrow(1))
+        tree.bind("<Button-1>", self.on_click, add="+")
+        tree.bind("<Button-3>", self.on_right_click, add="+")
+        tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+
+    @property
+    def margin(self):
+        return self.visible * self.PREFETCH_PAGES
+
+    @property
+    def columns(self):
+        return self.pager.columns if self.pager else []
+
+    def visible_rows(self):
+        return self.buffer[self.top:self.top + self.visible]
+
+    def set_visible_rows(self, count):
+        count = max(1, count)
+        while len(self.slots) < count:
+            iid = self.tree.insert("", "end", values=())
+            self.tree.detach(iid)
+            self.slot_index[iid] = len(self.slots)
+            self.slots.append(iid)
+        if len(self.slots) > count:
+            self.tree.delete(*self.slots[count:])
+            for iid in self.slots[count:]:
+                del self.slot_index[iid]
+            del self.slots[count:]
+            self.attached = min(self.attached, count)
+        self.visible = count
+
+    # --- Loading ---
+
+    def load(self, pager):
+        """Show `pager` from its first row."""
+        self.pager = pager
+        self.selected.clear()
+        count = self.visible + self.margin
+
+        def job(conn):
+            pager.open(conn)
+            return [], pager.fetch_first(conn, count)
+
+        self._seek(job, 0, count, columns_changed=True)
+
+    def reload(self):
+        """Re-read the table, keeping the current top row in view."""
+        if not self.pager:
+            return
+        pager = self.pager
+        rows = self.visible_rows()
+        key = rows[0][0] if rows else None
+        before = after = self.visible + self.margin
+
+        def job(conn):
+            pager.open(conn)
+            head = pager.fetch_first(conn, after) if key is None else pager.fetch_from(conn, key, after)
+            return self._fill_before(conn, pager, head, before), head
+
+        self._seek(job, before, after)
+
+    def jump(self, fraction):
+        """Show the rows at a relative position (0.0 - 1.0) of the table."""
+        if not self.pager or not self.pager.total:
+            return
+        pager = self.pager
+        fraction = min(max(fraction, 0.0), 1.0)
+        before = after = self.visible + self.margin
+
+        def job(conn):
+            key = pager.key_at(conn, fraction)
+            head = [] if key is None else pager.fetch_from(conn, key, after)
+            return self._fill_before(conn, pager, head, before), head
+
+        self._seek(job, before, after)
+
+    @staticmethod
+    def _fill_before(conn, pager, head, count):
+        # Rows above the seek position; the last rows when it is past the end
+        if head:
+            return pager.fetch_before(conn, head[0][0], count)
+        return pager.fetch_last(conn, count)
+
+    def _seek(self, job, before, after, columns_changed=False):
+        self.generation += 1
+        generation = self.generation
+        self.pending = 0
+        self.loading = True
+
+        def done(result):
+            if generation != self.generation:
+                return
+            self.loading = False
+            head, tail = result  # rows before and from the seek position
+            if columns_changed:
+                self.setup_columns()
+            self.buffer = head + tail
+            self.top = len(head)
+            if len(tail) < self.visible:
+                self.top = max(0, len(self.buffer) - self.visible)
+            self.at_start = len(head) < before or before == 0
+            self.at_end = len(tail) < after
+            self.render()
+            self.prefetch()
+
+        self.loader(job, done, lambda exc: self._failed(generation, exc))
+
+    def _failed(self, generation, exc):
+        if generation == self.generation:
+            self.loading = False
+        if self.on_error:
+            self.on_error(exc)
+
+    def prefetch(self):
+        """Top up the buffer so a margin of rows exists on both sides."""
+        if self.loading or not self.pager or not self.buffer:
+            return
+        pager = self.pager
+        generation = self.generation
+        below = len(self.buffer) - (self.top + self.visible)
+        if not self.at_end and (below < self.margin or self.pending > 0):
+            key, count = self.buffer[-1][0], max(self.margin, self.pending)
+            job = lambda conn: pager.fetch_after(conn, key, count)
+            done = lambda rows: self._extend(generation, rows, count, at_front=False)
+        elif not self.at_start and (self.top < self.margin or self.pending < 0):
+            key, count = self.buffer[0][0], max(self.margin, -self.pending)
+            job = lambda conn: pager.fetch_before(conn, key, count)
+            done = lambda rows: self._extend(generation, rows, count, at_front=True)
+        else:
+            self.pending = 0
+            return
+        self.loading = True
+        self.loader(job, done, lambda exc: self._failed(generation, exc))
+
+    def _extend(self, generation, rows, requested, at_front):
+        if generation != self.generation:
+            return
+        self.loading = False
+        keep = self.visible + 2 * self.margin
+        if at_front:
+            self.buffer[:0] = rows
+            self.top += len(rows)
+            self.at_start = len(rows) < requested
+            # Drop rows far below the viewport
+            excess = len(self.buffer) - max(keep, self.top + self.visible + self.margin)
+            if excess > 0:
+                del self.buffer[-excess:]
+                self.at_end = False
+        else:
+            self.buffer.extend(rows)
+            self.at_end = len(rows) < requested
+            # Drop rows far above the viewport
+            excess = min(len(self.buffer) - keep, self.top - self.margin)
+            if excess > 0:
+                del self.buffer[:excess]
+                self.top -= excess
+                self.at_start = False
+
+        pending, self.pending = self.pending, 0
+        if pending:
+            self.scroll(pending)
+        else:
+            self.render()
+            self.prefetch()
+
+    # --- Scrolling ---
+
+    def scroll(self, delta):
+        if not self.pager:
+            return
+        top = self.top + int(delta)
+        if top < 0 and not self.at_start:
+            self.pending += top
+        limit = max(0, len(self.buffer) - self.visible)
+        if top > limit and not self.at_end:
+            self.pending += top - limit
+        self.top = min(max(top, 0), limit)
+        self.render()
+        self.prefetch()
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            # Dragging the thumb fires many events; only seek to the last one
+            if self._jump_to is None:
+                self.tree.after_idle(self._flush_jump)
+            self._jump_to = float(args[1])
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def _flush_jump(self):
+        fraction, self._jump_to = self._jump_to, None
+        if fraction is not None:
+            self.jump(fraction)
+
+    def on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def on_arrow(self, delta):
+        index = self.slot_index.get(self.tree.focus())
+        if index is None or 0 <= index + delta < self.attached:
+            return None
+        rows = self.visible_rows()
+        self.scroll(delta)
+        new_rows = self.visible_rows()
+        if new_rows and new_rows != rows:
+            index = min(index, len(new_rows) - 1)
+            self.selected = {self.pager.identity(new_rows[index][0])}
+            self.tree.focus(self.slots[index])
+            self.tree.selection_set(self.slots[index])
+        return "break"
+
+    def on_resize(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        header = row_height
+        if self.attached:
+            bbox = self.tree.bbox(self.slots[0])
+            if bbox:
+                header = bbox[1]
+        count = max(1, (event.height - header) // row_height)
+        if count != self.visible:
+            self.set_visible_rows(count)
+            self.top = min(self.top, max(0, len(self.buffer) - self.visible))
+            self.render()
+            self.prefetch()
+
+    # --- Rendering ---
+
+    def setup_columns(self):
+        pager = self.pager
+        columns = pager.columns
+        filtered = {column for column, _, _ in pager.filters}
+        ids = [f"c{i}" for i in range(len(columns))]
+        self.tree["columns"] = ids
+        for i, (cid, name) in enumerate(zip(ids, columns)):
+            text = name
+            if name == pager.sort:
+                text += " ▼" if pager.descending else " ▲"
+            if name in filtered:
+                text += " ⧩"
+            command = (lambda index=i: self.on_heading(index)) if self.on_heading else ""
+            self.tree.heading(cid, text=text, command=command)
+            width = 50 if (i == 0 and pager.has_rowid) else 150
+            self.tree.column(cid, width=width, minwidth=50)
+
+    def render(self):
+        rows = self.visible_rows()
+        decorate = self.decorate
+        for i, (key, values) in enumerate(rows):
+            if decorate:
+                values, tags = decorate(key, values)
+                self.tree.item(self.slots[i], values=values, tags=tags)
+            else:
+                self.tree.item(self.slots[i], values=values)
+        if len(rows) > self.attached:
+            for i in range(self.attached, len(rows)):
+                self.tree.move(self.slots[i], "", i)
+        elif len(rows) < self.attached:
+            self.tree.detach(*self.slots[len(rows):self.attached])
+        self.attached = len(rows)
+
+        identity = self.pager.identity if self.pager else (lambda key: key)
+        chosen = [self.slots[i] for i, (key, _) in enumerate(rows) if identity(key) in self.selected]
+        self.tree.selection_set(chosen)
+
+        if rows and self.pager.total:
+            first = self.pager.fraction(rows[0][0])
+            last = 1.0 if self.at_end and self.top + self.visible >= len(self.buffer) else min(1.0, first + len(rows) / self.pager.total)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self.on_change:
+            self.on_change()
+
+    def cell_at(self, x, y):
+        """`(key, column index)` of the visible cell at widget coordinates, or None."""
+        index = self.slot_index.get(self.tree.identify_row(y))
+        column = self.tree.identify_column(x)
+        rows = self.visible_rows()
+        if index is None or index >= len(rows) or not column[1:].isdigit() or int(column[1:]) == 0:
+            return None
+        return rows[index][0], int(column[1:]) - 1
+
+    # --- Selection ---
+
+    def on_click(self, event):
+        # A plain click starts a new selection, including rows scrolled out of view
+        if not event.state & 0x0005:
+            self.selected.clear()
+
+    def on_select(self, event):
+        if not self.pager:
+            return
+        # Selection is kept by row identity (rowid) so it survives scrolling
+        identity = self.pager.identity
+        rows = self.visible_rows()
+        visible = {identity(key) for key, _ in rows}
+        chosen = set()
+        for iid in self.tree.selection():
+            index = self.slot_index.get(iid)
+            if index is not None and index < len(rows):
+                chosen.add(identity(rows[index][0]))
+        self.selected = (self.selected - visible) | chosen
+
+    def on_right_click(self, event):
+        if self.on_heading_menu and self.tree.identify_region(event.x, event.y) == "heading":
+            column = self.tree.identify_column(event.x)
+            if column.startswith("#") and column[1:].isdigit() and int(column[1:]) > 0:
+                self.on_heading_menu(int(column[1:]) - 1, event)
+
+
+# --- Background Queries ---
+
+class QueryJob:
+    """A unit of work for a QueryWorker and its live progress."""
+
+    def __init__(self, worker, fn, on_done=None, on_error=None, on_batch=None, label="Query"):
+        self.worker = worker
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_batch = on_batch
+        self.label = label
+        self.cancelled = False
+        self.rows = 0
+        # Virtual machine instructions run so far, counted by the progress handler
+        self.steps = 0
+        self.started = None
+        self.finished = None
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def post(self, callback, *args):
+        """Run `callback(*args)` on the Tk thread."""
+        self.worker.results.put((callback, args))
+
+    def emit(self, batch):
+        """Hand a batch of rows to `on_batch` on the Tk thread."""
+        self.rows += len(batch)
+        if self.worker.trace:
+            self.worker.trace.add_rows(self.worker.source, len(batch))
+        if self.on_batch:
+            self.post(self.on_batch, batch)
+
+    def cancel(self):
+        self.worker.cancel(self)
+
+
+class QueryWorker:
+    """Runs jobs one at a time on a background thread with its own connection.
+
+    `fn(conn, job)` executes on the worker thread; its result, errors and any
+    batches it emits are delivered on the Tk thread by polling with
+    `root.after`, so widgets are only ever touched from the main loop.
+    Cancelling interrupts the running statement through `Connection.interrupt()`
+    and a progress handler. With a SqlTrace, every statement is recorded
+    under `source`.
+    """
+
+    POLL_MS = 30
+    PROGRESS_STEPS = 1000
+
+    def __init__(self, root, path, profile=None, trace=None, source="worker"):
+        self.root = root
+        self.path = path
+        self.profile = profile
+        self.trace = trace
+        self.source = source
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.current = None
+        self.conn = None
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def submit(self, fn, on_done=None, on_error=None, on_batch=None, label="Query"):
+        job = QueryJob(self, fn, on_done, on_error, on_batch, label)
+        self.jobs.put(job)
+        return job
+
+    def cancel(self, job=None):
+        job = job or self.current
+        if job is None:
+            return
+        job.cancelled = True
+        if job is self.current and self.conn:
+            self.conn.interrupt()
+
+    def close(self):
+        self.closed = True
+        self.cancel()
+        self.jobs.put(None)
+
+    def _run(self):
+        self.conn = open_connection(self.path, check_same_thread=False, profile=self.profile)
+        self.conn.set_progress_handler(self._should_abort, self.PROGRESS_STEPS)
+        if self.trace:
+            self.trace.attach(self.conn, self.source)
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            self.current = job
+            job.started = time.perf_counter()
+            try:
+                if job.cancelled:
+                    raise QueryCancelled()
+                result = job.fn(self.conn, job)
+                callback, args = job.on_done, (result,)
+            except Exception as e:
+                if job.cancelled:
+                    e = QueryCancelled()
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                callback, args = job.on_error, (e,)
+            finally:
+                job.finished = time.perf_counter()
+                self.current = None
+                if self.trace:
+                    self.trace.finish(self.source)
+            job.post(callback, *args)
+        self.conn.close()
+
+    def _should_abort(self):
+        job = self.current
+        if job is None:
+            return 0
+        job.steps += self.PROGRESS_STEPS
+        return 1 if job.cancelled else 0
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if callback and not self.closed:
+                callback(*args)
+        if not self.closed:
+            self.root.after(self.POLL_MS, self._poll)
+
+
 # --- Application Logic ---
 
+# Editor labels for the transaction modes of run_script
+SCRIPT_MODES = {"Single transaction": "transaction", "Commit every N": "batches", "Autocommit": "autocommit"}
+
+
+class StartupProfiler:
+    """Per-phase startup timings, printed by --profile-startup."""
+    
+    def __init__(self, started):
+        self.last = started
+        self.phases = []
+        
+    def mark(self, phase, now=None):
+        now = now or time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+        
+    def report(self):
+        print("Startup profile")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<30}{seconds * 1000:9.1f} ms")
+        total = sum(seconds for _, seconds in self.phases)
+        print(f"  {'total':<30}{total * 1000:9.1f} ms")
+
+
 class SQLiteBrowserApp:
-    def __init__(self, root):
+    QUERY_BATCH_SIZE = 500
+    STATUS_INTERVAL_MS = 100
+    UNDO_MAX_BYTES = 64 * 1024 * 1024
+    RESULT_CACHE_BYTES = 64 * 1024 * 1024
+    SEARCH_WORKERS = 4
+
+    def __init__(self, root, profiler=None):
         self.root = root
         self.root.title("Elsakr SQLite Browser")
         self.root.geometry("1400x900")
@@ -124,12 +746,72 @@ class SQLiteBrowserApp:
         
         self.conn = None
         self.current_db_path = None
-        
-        self.set_window_icon()
-        self.load_logo()
+        # Separate workers so a long query never blocks browsing
+        self.browse_worker = None
+        self.query_worker = None
+        # Sidebar row counts and sizes are scanned on their own connection
+        self.stats_worker = None
+        # Global search runs its own pool of scans; a new search replaces the last
+        self.search_worker = None
+        self.search_hits = {}
+        # Structure tab column profiles, cached on their own connection until data_version changes
+        self.profile_worker = None
+        self.column_profiles = ProfileCache()
+        self.table_stats = TableStats()
+        self.profile = ConnectionProfile()
+        # Per-connection result caches for the browse grid and Execute SQL
+        self.browse_cache = None
+        self.query_cache = None
+        self.status_running_text = None
+        self.last_query = None
+        self.last_query_rows = None
+        self.undo_stack = []
+        # Unsaved cell edits in the Browse grid, written together on Save
+        self.pending_edits = None
+        self.cell_editor = None
+        # Plans and timings of every query run this session, oldest first
+        self.query_history = []
+        # Every statement the app runs, with timings; optionally written to a rotating log
+        self.trace = SqlTrace()
+        if load_settings().get("trace_log"):
+            try:
+                self.trace.enable_log()
+            except OSError:
+                pass
+        self.trace_window = None
+        # An idle callback to close the UI connection's last statement is queued
+        self.trace_finish_pending = False
+        # Browse Data sort and column filters, pushed down to SQLite
+        self.sort_column = None
+        self.sort_descending = False
+        self.column_filters = []
+        self.structure_table = None
+        self.structure_built = False
+        # Schema metadata, loaded once per connection and revalidated by schema_version
+        self.catalog = SchemaCatalog()
+        self.profiler = profiler
         
         self.setup_theme()
+        self.mark("theme")
         self.create_layout()
+        self.mark("layout")
+        self.update_status()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Icon and logo are loaded once the window has been drawn
+        self.root.after_idle(lambda: self.root.after(0, self.load_deferred_assets))
+
+    def mark(self, phase):
+        if self.profiler:
+            self.profiler.mark(phase)
+
+    def load_deferred_assets(self):
+        self.mark("first paint")
+        self.set_window_icon()
+        self.load_logo()
+        self.mark("icon + logo (deferred)")
+        if self.profiler:
+            self.profiler.report()
 
     def resource_path(self, relative_path):
         try:
@@ -151,9 +833,12 @@ class SQLiteBrowserApp:
         try:
             logo_path = self.resource_path(os.path.join("assets", "Sakr-logo.png"))
             if os.path.exists(logo_path):
+                from PIL import Image, ImageTk
                 logo = Image.open(logo_path)
                 logo.thumbnail((40, 40), Image.Resampling.LANCZOS)
                 self.logo_photo = ImageTk.PhotoImage(logo)
+                self.logo_label.config(image=self.logo_photo)
+                self.logo_label.pack(side="left", padx=(0, 10), before=self.title_label)
         except Exception as e:
             print(f"Logo Error: {e}") 
 
@@ -209,22 +894,26 @@ class SQLiteBrowserApp:
         style.configure("Header.TLabel", font=("Segoe UI Bold", 24))
         style.configure("SubHeader.TLabel", font=("Segoe UI", 11), foreground=Colors.TEXT_SECONDARY)
         
+        # Progress Bars
+        style.configure("Horizontal.TProgressbar", background=Colors.PRIMARY, troughcolor=Colors.BG_INPUT, borderwidth=0)
+        
     def create_layout(self):
         # Top Header
         header = tk.Frame(self.root, bg=Colors.BG_DARK, height=80)
         header.pack(fill="x", padx=20, pady=20)
         
-        # Show actual logo image if loaded, otherwise fallback to emoji
-        if self.logo_photo:
-            logo_img = tk.Label(header, image=self.logo_photo, bg=Colors.BG_DARK)
-            logo_img.pack(side="left", padx=(0, 10))
+        # Logo is packed by load_logo once it has been loaded after first paint
+        self.logo_label = tk.Label(header, bg=Colors.BG_DARK)
         
-        title_lbl = tk.Label(header, text="Elsakr", font=("Segoe UI Bold", 24), bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY)
-        title_lbl.pack(side="left")
+        self.title_label = tk.Label(header, text="Elsakr", font=("Segoe UI Bold", 24), bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY)
+        self.title_label.pack(side="left")
         
         subtitle = tk.Label(header, text="SQLite Browser", font=("Segoe UI", 14), bg=Colors.BG_DARK, fg=Colors.PRIMARY)
         subtitle.pack(side="left", padx=10, pady=(6, 0))
         
+        # Status Bar (packed before the main area so it keeps its place at the bottom)
+        self.setup_status_bar()
+        
         # Main Layout (Sidebar + Content)
         main_container = tk.Frame(self.root, bg=Colors.BG_DARK)
         main_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -248,15 +937,45 @@ class SQLiteBrowserApp:
         self.tab_data = tk.Frame(self.notebook, bg=Colors.BG_DARK)
         self.tab_query = tk.Frame(self.notebook, bg=Colors.BG_DARK)
         self.tab_structure = tk.Frame(self.notebook, bg=Colors.BG_DARK)
+        self.tab_search = tk.Frame(self.notebook, bg=Colors.BG_DARK)
         
         self.notebook.add(self.tab_data, text="  Browse Data  ")
         self.notebook.add(self.tab_query, text="  Execute SQL  ")
         self.notebook.add(self.tab_structure, text="  Structure  ")
+        self.notebook.add(self.tab_search, text="  Search  ")
         
         self.setup_data_tab()
         self.setup_query_tab()
-        self.setup_structure_tab()
+        self.setup_search_tab()
+        # Structure tab is built the first time it is opened
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
+    def on_tab_changed(self, event):
+        if self.notebook.select() == str(self.tab_structure) and not self.structure_built:
+            self.setup_structure_tab()
+            self.structure_built = True
+            if self.structure_table and self.conn:
+                self.load_table_structure(self.structure_table)
+
+    def setup_status_bar(self):
+        bar = PremiumCard(self.root, height=40)
+        bar.pack(side="bottom", fill="x", padx=20, pady=(0, 10))
+        
+        self.status_label = tk.Label(bar, text="Ready", font=("Segoe UI", 9), bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY)
+        self.status_label.pack(side="left", padx=15, pady=8)
+
+        self.perf_label = tk.Label(bar, text="", font=("Segoe UI", 9), bg=Colors.BG_CARD, fg=Colors.TEXT_MUTED)
+        self.perf_label.pack(side="left", padx=10)
         
+        self.cancel_button = PremiumButton(bar, text="⏹ Cancel", command=self.cancel_queries, width=90, height=30, color=Colors.ERROR)
+        self.cancel_button.pack(side="right", padx=10, pady=4)
+        self.cancel_button.set_enabled(False)
+        
+        PremiumButton(bar, text="📜 SQL Trace", command=self.show_trace, width=110, height=30).pack(side="right", padx=(0, 10), pady=4)
+
+        self.cache_label = tk.Label(bar, text="", font=("Segoe UI", 9), bg=Colors.BG_CARD, fg=Colors.TEXT_MUTED)
+        self.cache_label.pack(side="right", padx=10)
+
     def setup_sidebar(self):
         # Sidebar Header
         lbl = tk.Label(self.sidebar, text="Database", font=("Segoe UI Semibold", 12), bg=Colors.BG_CARD, fg=Colors.TEXT_PRIMARY)
@@ -268,9 +987,25 @@ class SQLiteBrowserApp:
         
         PremiumButton(btn_frame, text="📂 Open DB", command=self.open_database, width=250, height=40, primary=True).pack(pady=5)
         PremiumButton(btn_frame, text="✅ New DB", command=self.create_database, width=250, height=40, primary=False).pack(pady=5)
-        
-        # Tables List
-        tk.Label(self.sidebar, text="Tables", font=("Segoe UI Semibold", 12), bg=Colors.BG_CARD, fg=Colors.TEXT_PRIMARY).pack(pady=(20, 10), padx=20, anchor="w")
+        PremiumButton(btn_frame, text="📥 Import CSV / Excel", command=self.import_data, width=250, height=40, primary=False).pack(pady=5)
+        PremiumButton(btn_frame, text="📤 Export All Tables", command=self.export_all_dialog, width=250, height=40, primary=False).pack(pady=5)
+        PremiumButton(btn_frame, text="🧰 Maintenance", command=self.maintenance_dialog, width=250, height=40, primary=False).pack(pady=5)
+        PremiumButton(btn_frame, text="⚙ Connection Options", command=self.connection_dialog, width=250, height=40, primary=False).pack(pady=5)
+        
+        # Global search across the text columns of every table
+        search_frame = tk.Frame(self.sidebar, bg=Colors.BG_CARD)
+        search_frame.pack(fill="x", padx=20, pady=(15, 0))
+        self.search_entry = tk.Entry(search_frame, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
+        self.search_entry.pack(side="left", fill="x", expand=True, ipady=5)
+        self.search_entry.bind("<Return>", lambda e: self.global_search())
+        PremiumButton(search_frame, text="🔍", command=self.global_search, width=40, height=32).pack(side="left", padx=(5, 0))
+        self.search_index_var = tk.BooleanVar()
+        tk.Checkbutton(self.sidebar, text="Use full-text index", variable=self.search_index_var, font=("Segoe UI", 9),
+                       bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY, selectcolor=Colors.BG_INPUT,
+                       activebackground=Colors.BG_CARD, anchor="w").pack(fill="x", padx=20)
+        
+        # Schema objects: tables, views, indexes and triggers
+        tk.Label(self.sidebar, text="Schema", font=("Segoe UI Semibold", 12), bg=Colors.BG_CARD, fg=Colors.TEXT_PRIMARY).pack(pady=(20, 10), padx=20, anchor="w")
         
         table_frame = tk.Frame(self.sidebar, bg=Colors.BG_INPUT)
         table_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -279,9 +1014,14 @@ class SQLiteBrowserApp:
         sb = ttk.Scrollbar(table_frame)
         sb.pack(side="right", fill="y")
         
-        self.table_list = ttk.Treeview(table_frame, selectmode="browse", show="tree", yscrollcommand=sb.set)
+        self.table_list = ttk.Treeview(table_frame, selectmode="browse", show="tree", columns=("rows", "size"), yscrollcommand=sb.set)
+        self.table_list.column("#0", width=130)
+        self.table_list.column("rows", width=60, anchor="e")
+        self.table_list.column("size", width=60, anchor="e")
         self.table_list.pack(fill="both", expand=True)
         self.table_list.bind("<<TreeviewSelect>>", self.on_table_select)
+        # Right-click to take exact row counts; the list shows estimates until then
+        self.table_list.bind("<Button-3>", self.on_sidebar_menu)
         sb.config(command=self.table_list.yview)
 
     def setup_data_tab(self):
@@ -296,6 +1036,8 @@ class SQLiteBrowserApp:
         tk.Label(info_frame, text="Current Table:", font=("Segoe UI", 10), bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY).pack(anchor="w")
         self.current_table_label = tk.Label(info_frame, text="None", font=("Segoe UI Bold", 12), bg=Colors.BG_CARD, fg=Colors.PRIMARY)
         self.current_table_label.pack(anchor="w")
+        self.row_info_label = tk.Label(info_frame, text="", font=("Segoe UI", 9), bg=Colors.BG_CARD, fg=Colors.TEXT_MUTED)
+        self.row_info_label.pack(anchor="w")
         
         # Right side actions
         actions_frame = tk.Frame(toolbar, bg=Colors.BG_CARD)
@@ -304,23 +1046,58 @@ class SQLiteBrowserApp:
         PremiumButton(actions_frame, text="🔄 Refresh", command=self.refresh_data, width=100, height=35, primary=False).pack(side="left", padx=5)
         PremiumButton(actions_frame, text="➕ Add Row", command=self.add_row, width=100, height=35, color=Colors.SUCCESS).pack(side="left", padx=5)
         PremiumButton(actions_frame, text="❌ Delete", command=self.delete_row, width=100, height=35, color=Colors.ERROR).pack(side="left", padx=5)
+        PremiumButton(actions_frame, text="↩ Undo", command=self.undo_delete, width=90, height=35, primary=False).pack(side="left", padx=5)
+        PremiumButton(actions_frame, text="💾 Save", command=self.save_edits, width=80, height=35, color=Colors.SUCCESS).pack(side="left", padx=5)
+        PremiumButton(actions_frame, text="↺ Revert", command=self.revert_edits, width=80, height=35, primary=False).pack(side="left", padx=5)
         PremiumButton(actions_frame, text="⬇️ CSV", command=self.export_csv, width=90, height=35, primary=False).pack(side="left", padx=5)
         PremiumButton(actions_frame, text="⬇️ Excel", command=self.export_excel, width=90, height=35, primary=False).pack(side="left", padx=5)
 
+        # Filter Bar
+        filter_bar = PremiumCard(self.tab_data)
+        filter_bar.pack(fill="x", padx=10, pady=(0, 10))
+        
+        tk.Label(filter_bar, text="WHERE", font=("Consolas", 10), bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY).pack(side="left", padx=(15, 5), pady=10)
+        self.filter_entry = tk.Entry(filter_bar, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Consolas", 10))
+        self.filter_entry.pack(side="left", fill="x", expand=True, ipady=5, padx=5)
+        self.filter_entry.bind("<Return>", lambda e: self.apply_filter())
+        
+        PremiumButton(filter_bar, text="Apply", command=self.apply_filter, width=80, height=32).pack(side="left", padx=5)
+        PremiumButton(filter_bar, text="Clear", command=self.clear_filter, width=80, height=32, primary=False).pack(side="left", padx=5)
+        PremiumButton(filter_bar, text="🗑 Delete Matching", command=self.delete_matching, width=150, height=32, color=Colors.ERROR).pack(side="left", padx=(5, 10))
+        
+        # Column filters (from the header menu) and index warnings
+        hint_bar = tk.Frame(self.tab_data, bg=Colors.BG_DARK)
+        hint_bar.pack(fill="x", padx=10, pady=(0, 5))
+        self.filter_summary_label = tk.Label(hint_bar, text="", font=("Segoe UI", 9), bg=Colors.BG_DARK, fg=Colors.SECONDARY)
+        self.filter_summary_label.pack(side="left")
+        self.edits_label = tk.Label(hint_bar, text="", font=("Segoe UI", 9), bg=Colors.BG_DARK, fg=Colors.WARNING)
+        self.edits_label.pack(side="left", padx=(15, 0))
+        self.index_warning_label = tk.Label(hint_bar, text="", font=("Segoe UI", 9), bg=Colors.BG_DARK, fg=Colors.WARNING)
+        self.index_warning_label.pack(side="right")
+
         # Data Grid Area
         grid_frame = PremiumCard(self.tab_data)
         grid_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         
         self.data_tree = ttk.Treeview(grid_frame, show="headings", selectmode="extended")
         
-        vsb = ttk.Scrollbar(grid_frame, orient="vertical", command=self.data_tree.yview)
+        # The vertical scrollbar tracks the position in the table, not in the Treeview
+        vsb = ttk.Scrollbar(grid_frame, orient="vertical")
         hsb = ttk.Scrollbar(grid_frame, orient="horizontal", command=self.data_tree.xview)
-        self.data_tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.data_tree.configure(xscrollcommand=hsb.set)
         
         self.data_tree.pack(side="left", fill="both", expand=True, padx=2, pady=2)
         vsb.pack(side="right", fill="y", pady=2)
         hsb.pack(side="bottom", fill="x", padx=2)
 
+        self.data_grid = VirtualGrid(self.data_tree, vsb, self.run_grid_job,
+                                     on_change=self.on_grid_change, on_error=self.on_grid_error,
+                                     on_heading=self.on_heading_click, on_heading_menu=self.on_heading_menu,
+                                     decorate=self.decorate_row)
+        # Double-click a cell to edit it, or to view a BLOB or long text; rows with unsaved edits are tinted
+        self.data_tree.tag_configure("dirty", background="#2a2414")
+        self.data_tree.bind("<Double-1>", self.on_cell_double_click)
+
     def setup_query_tab(self):
         # Input Area
         input_card = PremiumCard(self.tab_query, height=200)
@@ -332,6 +1109,7 @@ class SQLiteBrowserApp:
                                 insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Consolas", 11),
                                 highlightbackground=Colors.BORDER, highlightthickness=1)
         self.query_text.pack(fill="x", padx=15, pady=(0, 15))
+        self.query_text.bind("<Control-space>", self.complete_query)
         
         # Toolbar
         toolbar = tk.Frame(input_card, bg=Colors.BG_CARD)
@@ -339,10 +1117,26 @@ class SQLiteBrowserApp:
         
         PremiumButton(toolbar, text="▶ Run Query", command=self.run_query, width=120, height=35, color=Colors.SUCCESS).pack(side="left")
         PremiumButton(toolbar, text="🧹 Clear", command=lambda: self.query_text.delete("1.0", tk.END), width=100, height=35, primary=False).pack(side="left", padx=10)
-        
-        # Results Area
-        results_card = PremiumCard(self.tab_query)
-        results_card.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        PremiumButton(toolbar, text="⬇️ CSV", command=self.export_query_csv, width=90, height=35, primary=False).pack(side="left")
+        PremiumButton(toolbar, text="⬇️ Excel", command=self.export_query_excel, width=90, height=35, primary=False).pack(side="left", padx=10)
+        PremiumButton(toolbar, text="🔍 Explain", command=self.explain_query, width=110, height=35, primary=False).pack(side="left")
+        
+        # How multi-statement scripts are committed
+        self.commit_every_entry = tk.Entry(toolbar, width=7, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
+        self.commit_every_entry.insert(0, "1000")
+        self.commit_every_entry.pack(side="right", ipady=4)
+        tk.Label(toolbar, text="N =", font=("Segoe UI", 10), bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY).pack(side="right", padx=5)
+        self.script_mode_box = ttk.Combobox(toolbar, values=list(SCRIPT_MODES), state="readonly", width=18)
+        self.script_mode_box.set("Single transaction")
+        self.script_mode_box.pack(side="right", padx=5)
+        tk.Label(toolbar, text="Scripts:", font=("Segoe UI", 10), bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY).pack(side="right")
+        
+        # Results, query plan and per-session timing history
+        self.query_notebook = ttk.Notebook(self.tab_query)
+        self.query_notebook.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        
+        results_card = PremiumCard(self.query_notebook)
+        self.query_notebook.add(results_card, text="  Results  ")
         
         self.query_results = ttk.Treeview(results_card, show="headings")
         sb = ttk.Scrollbar(results_card, orient="vertical", command=self.query_results.yview)
@@ -350,6 +1144,75 @@ class SQLiteBrowserApp:
         
         self.query_results.pack(side="left", fill="both", expand=True, padx=2, pady=2)
         sb.pack(side="right", fill="y", pady=2)
+        
+        statements_card = PremiumCard(self.query_notebook)
+        self.query_notebook.add(statements_card, text="  Statements  ")
+        
+        statement_columns = ("number", "line", "sql", "elapsed", "changes", "rows")
+        self.statements_tree = ttk.Treeview(statements_card, columns=statement_columns, show="headings")
+        for col, title, width in zip(statement_columns, ("#", "Line", "Statement", "ms", "Changes", "Rows"), (60, 60, 420, 80, 80, 80)):
+            self.statements_tree.heading(col, text=title)
+            self.statements_tree.column(col, width=width, anchor="w" if col == "sql" else "e")
+        self.statements_tree.tag_configure("failed", foreground=Colors.ERROR)
+        statements_sb = ttk.Scrollbar(statements_card, orient="vertical", command=self.statements_tree.yview)
+        self.statements_tree.configure(yscrollcommand=statements_sb.set)
+        self.statements_tree.pack(side="left", fill="both", expand=True, padx=2, pady=2)
+        statements_sb.pack(side="right", fill="y", pady=2)
+        
+        self.plan_card = PremiumCard(self.query_notebook)
+        self.query_notebook.add(self.plan_card, text="  Query Plan  ")
+        
+        self.timing_label = tk.Label(self.plan_card, text="Run or explain a query to see its plan", font=("Consolas", 10),
+                                     bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY, anchor="w")
+        self.timing_label.pack(fill="x", padx=10, pady=10)
+        
+        self.plan_tree = ttk.Treeview(self.plan_card, columns=("flags",), show="tree headings")
+        self.plan_tree.heading("#0", text="Step")
+        self.plan_tree.heading("flags", text="Warning")
+        self.plan_tree.column("#0", width=500)
+        self.plan_tree.column("flags", width=160)
+        self.plan_tree.tag_configure("flagged", foreground=Colors.WARNING)
+        self.plan_tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        
+        history_card = PremiumCard(self.query_notebook)
+        self.query_notebook.add(history_card, text="  History  ")
+        
+        history_columns = ("sql", "rows", "prepare", "first_row", "fetch", "render", "steps", "flags")
+        self.history_tree = ttk.Treeview(history_card, columns=history_columns, show="headings")
+        for col, title, width in zip(history_columns,
+                                     ("SQL", "Rows", "Prepare ms", "First row ms", "Fetch ms", "Render ms", "VM steps", "Plan"),
+                                     (320, 80, 80, 90, 80, 80, 100, 140)):
+            self.history_tree.heading(col, text=title)
+            self.history_tree.column(col, width=width, anchor="w" if col in ("sql", "flags") else "e")
+        history_sb = ttk.Scrollbar(history_card, orient="vertical", command=self.history_tree.yview)
+        self.history_tree.configure(yscrollcommand=history_sb.set)
+        self.history_tree.pack(side="left", fill="both", expand=True, padx=2, pady=2)
+        history_sb.pack(side="right", fill="y", pady=2)
+        # Double-click brings a past query back into the editor to try a rewrite
+        self.history_tree.bind("<Double-1>", self.on_history_open)
+
+    def setup_search_tab(self):
+        search_card = PremiumCard(self.tab_search)
+        search_card.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        self.search_status_label = tk.Label(search_card, text="Type in the sidebar search box and press Enter", font=("Segoe UI", 10),
+                                            bg=Colors.BG_CARD, fg=Colors.TEXT_SECONDARY, anchor="w")
+        self.search_status_label.pack(fill="x", padx=10, pady=10)
+        
+        search_columns = ("table", "column", "rowid", "value")
+        self.search_tree = ttk.Treeview(search_card, columns=search_columns, show="headings")
+        for col, title, width in zip(search_columns, ("Table", "Column", "rowid", "Value"), (160, 140, 80, 520)):
+            self.search_tree.heading(col, text=title)
+            self.search_tree.column(col, width=width, anchor="e" if col == "rowid" else "w")
+        search_sb = ttk.Scrollbar(search_card, orient="vertical", command=self.search_tree.yview)
+        self.search_tree.configure(yscrollcommand=search_sb.set)
+        self.search_tree.pack(side="left", fill="both", expand=True, padx=2, pady=2)
+        search_sb.pack(side="right", fill="y", pady=2)
+        # Double-click opens the matching row in Browse Data
+        self.search_tree.bind("<Double-1>", self.on_search_open)
+
+    PROFILE_COLUMNS = ("nulls", "distinct", "min", "max", "avg_length", "top", "histogram")
+    HISTOGRAM_BARS = "▁▂▃▄▅▆▇█"
 
     def setup_structure_tab(self):
         # Info Card
@@ -364,7 +1227,7 @@ class SQLiteBrowserApp:
         left_frame = tk.Frame(paned, bg=Colors.BG_CARD)
         tk.Label(left_frame, text="Columns", font=("Segoe UI Semibold", 11), bg=Colors.BG_CARD, fg=Colors.PRIMARY).pack(anchor="w", padx=10, pady=10)
         
-        self.structure_tree = ttk.Treeview(left_frame, columns=("cid", "name", "type", "pk"), show="headings")
+        self.structure_tree = ttk.Treeview(left_frame, columns=("cid", "name", "type", "pk") + self.PROFILE_COLUMNS, show="headings")
         self.structure_tree.heading("cid", text="#")
         self.structure_tree.heading("name", text="Name")
         self.structure_tree.heading("type", text="Type")
@@ -373,8 +1236,15 @@ class SQLiteBrowserApp:
         self.structure_tree.column("name", width=150)
         self.structure_tree.column("type", width=80)
         self.structure_tree.column("pk", width=40)
-        
-        self.structure_tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        # Column profile, filled in by a background scan
+        for col, title, width in zip(self.PROFILE_COLUMNS, ("Nulls", "Distinct", "Min", "Max", "Avg len", "Top values", "Histogram"),
+                                     (60, 70, 90, 90, 60, 200, 90)):
+            self.structure_tree.heading(col, text=title)
+            self.structure_tree.column(col, width=width, anchor="e" if col in ("nulls", "distinct", "avg_length") else "w")
+        
+        self.structure_tree.pack(fill="both", expand=True, padx=10, pady=(0, 4))
+        self.profile_label = tk.Label(left_frame, text="", font=("Segoe UI", 9), bg=Colors.BG_CARD, fg=Colors.TEXT_MUTED, anchor="w")
+        self.profile_label.pack(fill="x", padx=10, pady=(0, 10))
         paned.add(left_frame, minsize=300)
         
         # Right: Schema SQL
@@ -399,88 +1269,426 @@ class SQLiteBrowserApp:
             open(file_path, 'a').close()
             self.connect_db(file_path)
 
-    def connect_db(self, path):
+    def connect_db(self, path, profile=None):
+        if not self.resolve_pending_edits():
+            return
         try:
             if self.conn:
                 self.conn.close()
+                self.conn = None
+            self.stop_workers()
             
-            self.conn = sqlite3.connect(path)
+            # Each file reopens with the options it was last used with
+            profile = profile or load_profile(path)
+            self.conn = open_connection(path, profile=profile)
+            # Statements on the Tk thread's connection end once the event loop is idle again
+            self.trace.attach(self.conn, "ui", self.schedule_trace_finish)
+            profile.apply_journal_mode(self.conn)
+            self.profile = profile
             self.current_db_path = path
-            self.root.title(f"Elsakr SQLite Browser - {os.path.basename(path)}")
+            self.catalog = SchemaCatalog()
+            self.browse_worker = self.new_worker("browse")
+            self.query_worker = self.new_worker("query")
+            self.stats_worker = self.new_worker("stats")
+            self.profile_worker = self.new_worker("profile")
+            self.column_profiles = ProfileCache()
+            self.table_stats = TableStats()
+            self.browse_cache = ResultCache(self.RESULT_CACHE_BYTES)
+            self.query_cache = ResultCache(self.RESULT_CACHE_BYTES)
+            self.root.title(f"Elsakr SQLite Browser - {os.path.basename(path)} [{profile.describe()}]")
             self.load_tables()
             messagebox.showinfo("Success", f"Connected to {os.path.basename(path)}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to connect: {str(e)}")
 
+    def schedule_trace_finish(self):
+        # executemany() traces every row; one idle callback covers them all
+        if not self.trace_finish_pending:
+            self.trace_finish_pending = True
+            self.root.after_idle(self.finish_ui_trace)
+
+    def finish_ui_trace(self):
+        self.trace_finish_pending = False
+        self.trace.finish("ui")
+
+    def new_worker(self, source):
+        return QueryWorker(self.root, self.current_db_path, self.profile, self.trace, source)
+
+    def connection_dialog(self):
+        if not self.conn:
+            messagebox.showwarning("Warning", "Open a database first")
+            return
+        path = self.current_db_path
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Connection Options")
+        dialog.geometry("460x520")
+        dialog.configure(bg=Colors.BG_DARK)
+        dialog.transient(self.root)
+        
+        main_frame = tk.Frame(dialog, bg=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        tk.Label(main_frame, text=f"Open: {os.path.basename(path)}", font=("Segoe UI Bold", 14), bg=Colors.BG_DARK, fg=Colors.PRIMARY).pack(anchor="w", pady=(0, 15))
+        
+        def field(label, widget_factory):
+            row_frame = tk.Frame(main_frame, bg=Colors.BG_DARK)
+            row_frame.pack(fill="x", pady=4)
+            tk.Label(row_frame, text=label, font=("Segoe UI", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, width=20, anchor="w").pack(side="left")
+            widget = widget_factory(row_frame)
+            widget.pack(side="right", fill="x", expand=True, padx=(10, 0))
+            return widget
+        
+        def entry(parent):
+            return tk.Entry(parent, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
+        
+        def check(variable):
+            return lambda parent: tk.Checkbutton(parent, variable=variable, bg=Colors.BG_DARK, selectcolor=Colors.BG_INPUT,
+                                                 activebackground=Colors.BG_DARK, anchor="w")
+        
+        read_only, immutable = tk.BooleanVar(), tk.BooleanVar()
+        preset_box = field("Preset", lambda parent: ttk.Combobox(parent, values=list(CONNECTION_PRESETS), state="readonly"))
+        field("Read-only", check(read_only))
+        field("Immutable (no locking)", check(immutable))
+        mmap_entry = field("mmap size (MiB)", entry)
+        cache_entry = field("Page cache (MiB)", entry)
+        busy_entry = field("Busy timeout (ms)", entry)
+        temp_box = field("Temp store", lambda parent: ttk.Combobox(parent, values=ConnectionProfile.TEMP_STORES, state="readonly"))
+        journal_box = field("Journal mode", lambda parent: ttk.Combobox(parent, values=ConnectionProfile.JOURNAL_MODES, state="readonly"))
+        
+        def show(profile):
+            read_only.set(profile.read_only)
+            immutable.set(profile.immutable)
+            for widget, value in ((mmap_entry, profile.mmap_size // 1024 ** 2), (cache_entry, profile.cache_kib // 1024),
+                                  (busy_entry, profile.busy_timeout)):
+                widget.delete(0, tk.END)
+                widget.insert(0, str(value))
+            temp_box.set(profile.temp_store)
+            journal_box.set(profile.journal_mode)
+        
+        show(self.profile)
+        preset_box.bind("<<ComboboxSelected>>", lambda e: show(CONNECTION_PRESETS[preset_box.get()]))
+        
+        def apply():
+            try:
+                profile = ConnectionProfile(read_only=read_only.get(), immutable=immutable.get(),
+                                            mmap_size=int(mmap_entry.get() or 0) * 1024 ** 2,
+                                            cache_kib=int(cache_entry.get() or 0) * 1024,
+                                            temp_store=temp_box.get(), busy_timeout=int(busy_entry.get() or 0),
+                                            journal_mode=journal_box.get())
+            except ValueError:
+                messagebox.showerror("Error", "Sizes and timeout must be whole numbers", parent=dialog)
+                return
+            save_profile(path, profile)
+            dialog.destroy()
+            self.connect_db(path, profile)
+        
+        PremiumButton(main_frame, text="🔌 Apply and Reconnect", command=apply, width=220, height=40).pack(pady=20)
+
+    SIDEBAR_GROUPS = (("table", "Tables"), ("view", "Views"), ("index", "Indexes"), ("trigger", "Triggers"))
+
     def load_tables(self):
-        self.table_list.delete(*self.table_list.get_children())
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-            for table in tables:
-                self.table_list.insert("", "end", text=table[0], values=(table[0],))
+            self.catalog.refresh(self.conn)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load tables: {str(e)}")
+            return
+        self.show_catalog()
+
+    def show_catalog(self):
+        opened = {kind for kind, _ in self.SIDEBAR_GROUPS if self.table_list.exists(kind) and self.table_list.item(kind, "open")}
+        self.table_list.delete(*self.table_list.get_children())
+        for kind, title in self.SIDEBAR_GROUPS:
+            names = self.catalog.objects[kind]
+            if not names:
+                continue
+            self.table_list.insert("", "end", iid=kind, text=f"{title} ({len(names)})", open=kind == "table" or kind in opened)
+            for name in names:
+                # Item ids carry the object kind; the text is the bare name
+                self.table_list.insert(kind, "end", iid=f"{kind}:{name}", text=name, values=("", ""))
+        self.load_table_stats()
+
+    def load_table_stats(self, count=()):
+        """Fill in sidebar row counts and sizes.
+
+        Every table gets its sqlite_stat1 or max(rowid) estimate at once;
+        COUNT(*) scans the whole table, so exact counts are only taken for the
+        table being browsed and those in `count` (the sidebar's "Count rows").
+        """
+        if not self.stats_worker:
+            return
+        self.stats_worker.cancel()
+        catalog, stats = self.catalog, self.table_stats
+        pager = self.data_grid.pager
+        count = set(count) | ({pager.table_name} if pager else set())
+        tables = [name for name in catalog.objects["table"] if name in count]
+
+        def job(conn, task):
+            stats.validate(conn)
+            known = dict(stats.counts)
+            estimates = estimate_row_counts(conn, catalog)
+            task.post(show_counts, {name: n for name, n in estimates.items() if name not in known}, False)
+            task.post(show_counts, known, True)
+            # Smallest tables first so most of the list settles quickly
+            for name in sorted(tables, key=lambda name: estimates.get(name, 0)):
+                if name not in known:
+                    task.post(show_counts, {name: stats.count(conn, name)}, True)
+            if stats.sizes is None:
+                stats.sizes = object_sizes(conn) or {}
+            return stats.sizes
+
+        def show_counts(counts, exact):
+            for name, count in counts.items():
+                if self.table_list.exists(f"table:{name}"):
+                    self.table_list.set(f"table:{name}", "rows", format_count(count, exact))
+
+        def show_sizes(sizes):
+            for name, info in catalog.tables.items():
+                if info.kind == "table" and name in sizes and self.table_list.exists(f"table:{name}"):
+                    total = sizes[name] + sum(sizes.get(index[0], 0) for index in info.indexes)
+                    self.table_list.set(f"table:{name}", "size", format_bytes(total))
+            for name in catalog.objects["index"]:
+                if name in sizes and self.table_list.exists(f"index:{name}"):
+                    self.table_list.set(f"index:{name}", "size", format_bytes(sizes[name]))
+
+        # Counting is best effort; a cancelled or failed scan just leaves estimates
+        self.stats_worker.submit(job, show_sizes, lambda error: None, label="Counting rows")
+
+    def on_sidebar_menu(self, event):
+        item = self.table_list.identify_row(event.y)
+        if not self.conn or not item:
+            return
+        kind, _, name = item.partition(":")
+        menu = tk.Menu(self.root, tearoff=0, bg=Colors.BG_CARD, fg=Colors.TEXT_PRIMARY,
+                       activebackground=Colors.PRIMARY, activeforeground=Colors.TEXT_PRIMARY)
+        if kind == "table" and name:
+            menu.add_command(label=f"Count rows in {name}", command=lambda: self.load_table_stats(count=[name]))
+        menu.add_command(label="Count rows in all tables", command=lambda: self.load_table_stats(count=self.catalog.objects["table"]))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def pause_table_stats(self):
+        """Stop a running count or profile so its read lock does not hold up a write."""
+        for worker in (self.stats_worker, self.profile_worker):
+            if worker:
+                worker.cancel()
 
     def on_table_select(self, event):
         selected_item = self.table_list.selection()
-        if selected_item:
-            table_name = self.table_list.item(selected_item)['text']
-            self.load_table_data(table_name)
-            self.load_table_structure(table_name)
+        if not selected_item or ":" not in selected_item[0]:
+            return
+        kind, _, name = selected_item[0].partition(":")
+        if self.pending_edits and self.pending_edits.table_name != name and kind in ("table", "view"):
+            if not self.resolve_pending_edits():
+                return
+        # One header read when nothing changed; picks up DDL from other connections
+        if self.catalog.refresh(self.conn):
+            self.root.after_idle(self.show_catalog)
+        if kind in ("table", "view"):
+            self.filter_entry.delete(0, tk.END)
+            self.column_filters = []
+            self.sort_column, self.sort_descending = None, False
+            self.load_table_data(name)
+            if kind == "table":
+                self.load_table_stats(count=[name])
+        self.load_table_structure(name)
 
     def load_table_data(self, table_name):
         self.current_table_label.config(text=table_name)
-        try:
-            # Clear existing data
-            self.data_tree.delete(*self.data_tree.get_children())
-            self.data_tree["columns"] = []
-            
-            # Fetch Data with ROWID
-            try:
-                self.current_df = pd.read_sql_query(f"SELECT rowid, * FROM '{table_name}' LIMIT 1000", self.conn)
-                has_rowid = True
-            except:
-                self.current_df = pd.read_sql_query(f"SELECT * FROM '{table_name}' LIMIT 1000", self.conn)
-                has_rowid = False
-            
-            columns = list(self.current_df.columns)
-            self.data_tree["columns"] = columns
-            
-            for col in columns:
-                self.data_tree.heading(col, text=col)
-                width = 50 if (col == "rowid" and has_rowid) else 150
-                self.data_tree.column(col, width=width, minwidth=50)
-            
-            for _, row in self.current_df.iterrows():
-                self.data_tree.insert("", "end", values=list(row))
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load table data: {str(e)}")
+        # Rows are fetched window by window as the grid scrolls; sorting and filtering run in SQLite
+        self.data_grid.load(KeysetPager(table_name, where=self.filter_entry.get(), filters=self.column_filters,
+                                        sort=self.sort_column, descending=self.sort_descending, catalog=self.catalog,
+                                        cache=self.browse_cache, preview=True))
+        self.filter_summary_label.config(text="  ·  ".join(f"{c} {op} {v!r}" if op not in ("is null", "is not null") else f"{c} {op}"
+                                                          for c, op, v in self.column_filters))
+
+    def on_heading_click(self, index):
+        # Cycle: ascending -> descending -> unsorted
+        column = self.data_grid.pager.columns[index]
+        if self.sort_column != column:
+            self.sort_column, self.sort_descending = column, False
+        elif not self.sort_descending:
+            self.sort_descending = True
+        else:
+            self.sort_column, self.sort_descending = None, False
+        self.apply_filter()
+
+    def on_heading_menu(self, index, event):
+        column = self.data_grid.pager.columns[index]
+        menu = tk.Menu(self.root, tearoff=0, bg=Colors.BG_CARD, fg=Colors.TEXT_PRIMARY,
+                       activebackground=Colors.PRIMARY, activeforeground=Colors.TEXT_PRIMARY)
+        menu.add_command(label="Sort ascending", command=lambda: self.set_sort(column, False))
+        menu.add_command(label="Sort descending", command=lambda: self.set_sort(column, True))
+        menu.add_command(label="Clear sort", command=lambda: self.set_sort(None, False))
+        menu.add_separator()
+        menu.add_command(label=f"Filter {column}…", command=lambda: self.column_filter_dialog(column))
+        menu.add_command(label="Clear column filter", command=lambda: self.remove_column_filter(column))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def set_sort(self, column, descending):
+        self.sort_column, self.sort_descending = column, descending
+        self.apply_filter()
+
+    def remove_column_filter(self, column):
+        self.column_filters = [f for f in self.column_filters if f[0] != column]
+        self.apply_filter()
+
+    def column_filter_dialog(self, column):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Filter Column")
+        dialog.geometry("420x230")
+        dialog.configure(bg=Colors.BG_DARK)
+        dialog.transient(self.root)
+        
+        main_frame = tk.Frame(dialog, bg=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        tk.Label(main_frame, text=f"Filter: {column}", font=("Segoe UI Bold", 14), bg=Colors.BG_DARK, fg=Colors.PRIMARY).pack(anchor="w", pady=(0, 15))
+        
+        row_frame = tk.Frame(main_frame, bg=Colors.BG_DARK)
+        row_frame.pack(fill="x")
+        op_box = ttk.Combobox(row_frame, values=list(FILTER_OPERATORS), state="readonly", width=12)
+        op_box.set("=")
+        op_box.pack(side="left")
+        value_entry = tk.Entry(row_frame, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
+        value_entry.pack(side="left", fill="x", expand=True, ipady=5, padx=(10, 0))
+        value_entry.focus_set()
+        
+        def apply():
+            self.column_filters = [f for f in self.column_filters if f[0] != column]
+            self.column_filters.append((column, op_box.get(), value_entry.get()))
+            dialog.destroy()
+            self.apply_filter()
+        
+        value_entry.bind("<Return>", lambda e: apply())
+        PremiumButton(main_frame, text="Apply Filter", command=apply, width=200, height=40).pack(pady=20)
+
+    def run_grid_job(self, job, callback, errback):
+        since = time.time()
+
+        def done(result):
+            started = time.perf_counter()
+            callback(result)
+            # A seek returns the rows before and from its position, a prefetch one list
+            rows = sum(map(len, result)) if isinstance(result, tuple) else len(result)
+            self.record_operation("Load rows", {"query": task.elapsed(), "render": time.perf_counter() - started},
+                                  rows=rows, since=since)
 
-    def load_table_structure(self, table_name):
+        task = self.browse_worker.submit(lambda conn, task: job(conn), done, errback, label="Loading rows")
+
+    def on_grid_error(self, error):
+        if isinstance(error, QueryCancelled):
+            self.status_label.config(text="Loading cancelled")
+            return
+        messagebox.showerror("Error", f"Failed to load table data: {str(error)}")
+
+    def on_grid_change(self):
+        # An open cell editor belongs to a row; close it once that row scrolls away
+        editor = self.cell_editor
+        if editor:
+            rows = self.data_grid.visible_rows()
+            if editor["index"] >= len(rows) or rows[editor["index"]][0] != editor["key"]:
+                editor["commit"]()
+        self.update_row_info()
+
+    def update_row_info(self):
+        pager = self.data_grid.pager
+        rows = self.data_grid.visible_rows()
+        if not pager or not rows:
+            self.row_info_label.config(text="No rows")
+        elif pager.keyed_sort:
+            self.row_info_label.config(text=f"Rows {rows[0][0][2] + 1:,} - {rows[-1][0][2] + 1:,} of {pager.total:,}")
+        elif pager.has_rowid:
+            self.row_info_label.config(text=f"rowid {rows[0][0]:,} - {rows[-1][0]:,}  ·  ~{pager.total:,} rows")
+        else:
+            self.row_info_label.config(text=f"Rows {rows[0][0] + 1:,} - {rows[-1][0] + 1:,} of {pager.total:,}")
+        
+        if pager and pager.unindexed:
+            self.index_warning_label.config(text=f"⚠ No index on {', '.join(pager.unindexed)}: every page scans the whole table")
+        else:
+            self.index_warning_label.config(text="")
+
+    def load_table_structure(self, name):
+        self.structure_table = name
+        if not self.structure_built:
+            return
         self.structure_tree.delete(*self.structure_tree.get_children())
         self.schema_text.delete("1.0", tk.END)
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"PRAGMA table_info('{table_name}')")
-            columns = cursor.fetchall()
-            for col in columns:
-                # cid, name, type, notnull, dflt_value, pk
-                # We show: cid, name, type, pk
-                filtered = (col[0], col[1], col[2], col[5])
-                self.structure_tree.insert("", "end", values=filtered)
-                
-            cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-            create_sql = cursor.fetchone()
-            if create_sql:
-                self.schema_text.insert("1.0", create_sql[0])
-        except Exception as e:
-            self.schema_text.insert("1.0", f"Error: {str(e)}")
+        
+        info = self.catalog.table(name)
+        if info is None:
+            # Index or trigger: just its definition
+            self.schema_text.insert("1.0", self.catalog.sql.get(name) or f"-- {name}: automatic index")
+            return
+        for col in info.columns:
+            # cid, name, type, notnull, dflt_value, pk
+            # We show: cid, name, type, pk, then the column profile
+            filtered = (col[0], col[1], col[2], col[5])
+            self.structure_tree.insert("", "end", iid=str(col[0]), values=filtered)
+        self.load_column_profile(info)
+        
+        parts = [info.sql or ""]
+        for index_name, unique, origin, partial, columns in info.indexes:
+            parts.append(self.catalog.sql.get(index_name) or
+                         f"-- {index_name}: automatic {'unique ' if unique else ''}index on ({', '.join(c or '<expr>' for c in columns)})")
+        parts.extend(self.catalog.sql.get(trigger) or "" for trigger in info.triggers)
+        if info.foreign_keys:
+            parts.append("\n".join(f"-- FOREIGN KEY ({fk[3]}) REFERENCES {fk[2]}({fk[4] or 'rowid'}) ON UPDATE {fk[5]} ON DELETE {fk[6]}"
+                                   for fk in info.foreign_keys))
+        self.schema_text.insert("1.0", ";\n\n".join(part for part in parts if part))
+
+    def load_column_profile(self, info):
+        """Profile the columns of `info` in the background, showing results as they arrive."""
+        if not self.profile_worker:
+            return
+        self.profile_worker.cancel()
+        cache = self.column_profiles
+        self.profile_label.config(text="Profiling columns…")
+
+        def job(conn, task):
+            cached = cache.validate(conn).get(info.name)
+            if cached:
+                return cached
+            profile = profile_table(conn, info, on_update=lambda profile: task.post(show, profile))
+            cache.put(profile)
+            return profile
+
+        def show(profile):
+            if profile.table != self.structure_table:
+                return
+            for number, column in enumerate(profile.columns):
+                if self.structure_tree.exists(str(number)):
+                    values = self.structure_tree.item(str(number), "values")[:4]
+                    self.structure_tree.item(str(number), values=tuple(values) + self.format_column_profile(column))
+            sample = f"sample of {profile.rows:,} rows" if profile.sampled else f"{profile.rows:,} rows"
+            self.profile_label.config(text=f"Profile: {sample}" + ("" if profile.complete else "  ·  computing top values…"))
+
+        def failed(error):
+            if info.name != self.structure_table:
+                return
+            if isinstance(error, QueryCancelled):
+                self.profile_label.config(text="Profile interrupted; select the table again to resume")
+            else:
+                self.profile_label.config(text=f"Profile failed: {error}")
+
+        self.profile_worker.submit(job, show, failed, label="Profiling columns")
+
+    def format_column_profile(self, column):
+        def cell(value):
+            return "" if value is None else str(format_row((value,))[0])[:40]
+
+        total = column.values + column.nulls
+        nulls = f"{column.null_ratio:.1%}" if total else ""
+        distinct = f"{column.distinct:,}" if column.distinct is not None else ""
+        avg_length = f"{column.avg_length:.1f}" if column.avg_length is not None else ""
+        top = ", ".join(f"{cell(value)} ({count:,})" for value, count in column.top or [])
+        histogram = ""
+        if column.histogram:
+            peak = max(count for _, _, count in column.histogram) or 1
+            bars = self.HISTOGRAM_BARS
+            histogram = "".join(bars[min(count * len(bars) // peak, len(bars) - 1)] if count else " "
+                                for _, _, count in column.histogram)
+        return (nulls, distinct, cell(column.min), cell(column.max), avg_length, top, histogram)
 
     def add_row(self):
-        if not hasattr(self, 'current_df') or self.current_df is None:
+        if not self.data_grid.pager:
             messagebox.showwarning("Warning", "No table loaded")
             return
             
@@ -512,12 +1720,16 @@ class SQLiteBrowserApp:
         scrollbar.pack(side="right", fill="y")
         
         entries = {}
-        columns = [col for col in self.current_df.columns if col != 'rowid']
+        table_name = self.data_grid.pager.table_name
+        info = self.catalog.table(table_name)
+        # PRAGMA table_info leaves out generated columns, which cannot be inserted into
+        columns = info.column_names if info else []
+        types = {col[1]: col[2] for col in info.columns} if info else {}
         
         for col in columns:
             row_frame = tk.Frame(scrollable_frame, bg=Colors.BG_DARK)
             row_frame.pack(fill="x", pady=5)
-            tk.Label(row_frame, text=col, font=("Segoe UI", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, width=20, anchor="w").pack(side="left")
+            tk.Label(row_frame, text=f"{col} {types[col]}".strip(), font=("Segoe UI", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, width=20, anchor="w").pack(side="left")
             entry = tk.Entry(row_frame, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
             entry.pack(side="right", fill="x", expand=True, ipady=5, padx=(10, 0))
             entries[col] = entry
@@ -526,76 +1738,1283 @@ class SQLiteBrowserApp:
             try:
                 values = [entries[col].get() for col in columns]
                 placeholders = ", ".join(["?"] * len(values))
-                cols_str = ", ".join([f"'{c}'" for c in columns])
-                query = f"INSERT INTO '{self.current_table_label.cget('text')}' ({cols_str}) VALUES ({placeholders})"
+                cols_str = ", ".join(quote_ident(c) for c in columns)
+                query = f"INSERT INTO {quote_ident(table_name)} ({cols_str}) VALUES ({placeholders})"
                 
+                self.pause_table_stats()
                 cursor = self.conn.cursor()
                 cursor.execute(query, values)
                 self.conn.commit()
                 messagebox.showinfo("Success", "Row added!")
                 dialog.destroy()
                 self.refresh_data()
+                self.load_table_stats()
             except Exception as e:
                 messagebox.showerror("Error", str(e))
         
         PremiumButton(main_frame, text="💾 Save Row", command=save, width=200, height=40).pack(pady=20)
 
+    # --- Cell Editing ---
+
+    def decorate_row(self, key, values):
+        edits, pager = self.pending_edits, self.data_grid.pager
+        if not edits or not pager or pager.table_name != edits.table_name:
+            return values, ()
+        changed = edits.columns_of(pager.identity(key))
+        if not changed:
+            return values, ()
+        values = list(values)
+        for index, column in enumerate(pager.columns):
+            if column in changed and (index or not pager.has_rowid):
+                values[index] = f"✎ {format_row((changed[column],))[0]}"
+        return values, ("dirty",)
+
+    def on_cell_double_click(self, event):
+        pager = self.data_grid.pager
+        cell = self.data_grid.cell_at(event.x, event.y)
+        if not pager or not cell or not self.conn:
+            return
+        key, index = cell
+        info = self.catalog.table(pager.table_name)
+        column = pager.columns[index]
+        if not info or not pager.has_rowid:
+            self.status_label.config(text="Only tables with a rowid can be edited in place")
+            return
+        # Column 0 is the rowid itself; generated columns are not in PRAGMA table_info
+        if index == 0 or column not in info.column_names:
+            return
+        table_name, rowid = pager.table_name, pager.identity(key)
+        # The grid holds display values (trimmed text, BLOB previews), so edit the stored one; BLOBs
+        # and long text open in the value viewer, which streams them instead of loading them here
+        quoted, source = quote_ident(column), quote_ident(table_name)
+        row = self.conn.execute(f"SELECT typeof({quoted}), length({quoted}) FROM {source} WHERE rowid = ?", (rowid,)).fetchone()
+        if row is None:
+            return
+        kind, length = row
+        if kind == "blob" or kind == "text" and length > MAX_CELL_CHARS:
+            self.show_value(table_name, column, rowid)
+            return
+        original = self.conn.execute(f"SELECT {quoted} FROM {source} WHERE rowid = ?", (rowid,)).fetchone()[0]
+        edits = self.pending_edits if self.pending_edits and self.pending_edits.table_name == table_name else None
+        current = edits.get(rowid, column, original) if edits else original
+        
+        bbox = self.data_tree.bbox(self.data_tree.identify_row(event.y), f"#{index + 1}")
+        if not bbox:
+            return
+        if self.cell_editor:
+            self.cell_editor["commit"]()
+        x, y, width, height = bbox
+        entry = tk.Entry(self.data_tree, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat",
+                         font=("Segoe UI", 10), highlightthickness=1, highlightbackground=Colors.BORDER_FOCUS, highlightcolor=Colors.BORDER_FOCUS)
+        # NULL is typed as the grid shows it
+        entry.insert(0, "NULL" if current is None else str(current))
+        entry.select_range(0, tk.END)
+        entry.place(x=x, y=y, width=width, height=height)
+        entry.focus_set()
+        
+        def close(save):
+            if self.cell_editor is not editor:
+                return
+            self.cell_editor = None
+            text = entry.get()
+            entry.destroy()
+            if not save:
+                return
+            value = None if text == "NULL" else text
+            if text == ("NULL" if original is None else str(original)):
+                value = original
+            if self.pending_edits is None or self.pending_edits.table_name != table_name:
+                self.pending_edits = PendingEdits(table_name)
+            self.pending_edits.set(rowid, column, original, value)
+            self.show_pending_edits()
+        
+        editor = self.cell_editor = {"key": key, "index": self.data_grid.slot_index[self.data_tree.identify_row(event.y)],
+                                     "commit": lambda: close(True)}
+        entry.bind("<Return>", lambda e: close(True))
+        entry.bind("<FocusOut>", lambda e: close(True))
+        entry.bind("<Escape>", lambda e: close(False))
+
+    IMAGE_PREVIEW_BYTES = 32 * 1024 * 1024
+    IMAGE_PREVIEW_SIZE = (720, 420)
+
+    def show_value(self, table_name, column, rowid):
+        """Text, hex and image views of one stored value, read in pieces on a worker."""
+        window = tk.Toplevel(self.root)
+        window.title(f"{table_name}.{column}  ·  rowid {rowid}")
+        window.geometry("820x620")
+        window.configure(bg=Colors.BG_DARK)
+        worker = self.new_worker("value")
+        # Bytes read so far from the start of the value
+        state = {"kind": None, "size": 0, "encoding": "utf-8", "image": None, "loaded": bytearray(), "photo": None}
+
+        header = tk.Frame(window, bg=Colors.BG_DARK)
+        header.pack(fill="x", padx=15, pady=(15, 5))
+        info_label = tk.Label(header, text="Reading…", font=("Segoe UI Semibold", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_PRIMARY)
+        info_label.pack(side="left")
+        mode = tk.StringVar(value="text")
+        mode_buttons = {}
+        for name in ("image", "hex", "text"):
+            mode_buttons[name] = tk.Radiobutton(header, text=name.capitalize(), value=name, variable=mode, command=lambda: show(),
+                                                bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, selectcolor=Colors.BG_INPUT,
+                                                activebackground=Colors.BG_DARK, font=("Segoe UI", 9))
+            mode_buttons[name].pack(side="right")
+        mode_buttons["image"].config(state="disabled")
+
+        body = tk.Frame(window, bg=Colors.BG_INPUT)
+        body.pack(fill="both", expand=True, padx=15, pady=5)
+        text = tk.Text(body, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat",
+                       font=("Consolas", 10), wrap="none")
+        scrollbar = ttk.Scrollbar(body, orient="vertical", command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        image_label = tk.Label(body, bg=Colors.BG_INPUT, fg=Colors.TEXT_SECONDARY, font=("Segoe UI", 10))
+
+        footer = tk.Frame(window, bg=Colors.BG_DARK)
+        footer.pack(fill="x", padx=15, pady=(5, 15))
+        more_button = PremiumButton(footer, text="⬇ Load more", command=lambda: load_more(), width=130, height=34, primary=False)
+        more_button.pack(side="left")
+        PremiumButton(footer, text="💾 Save to file…", command=lambda: save(), width=150, height=34).pack(side="left", padx=10)
+        loaded_label = tk.Label(footer, text="", font=("Segoe UI", 9), bg=Colors.BG_DARK, fg=Colors.TEXT_MUTED)
+        loaded_label.pack(side="right")
+
+        def reader(conn):
+            return ValueReader(conn, table_name, column, rowid)
+
+        def show():
+            loaded = bytes(state["loaded"])
+            if mode.get() == "image":
+                text.pack_forget()
+                scrollbar.pack_forget()
+                image_label.pack(fill="both", expand=True)
+                image_label.config(image=state["photo"] or "", text="" if state["photo"] else state["image"] or "")
+                return
+            image_label.pack_forget()
+            scrollbar.pack(side="right", fill="y")
+            text.pack(side="left", fill="both", expand=True)
+            text.config(state="normal", wrap="none" if mode.get() == "hex" else "word")
+            text.delete("1.0", tk.END)
+            if mode.get() == "hex":
+                text.insert("1.0", hex_dump(loaded))
+            else:
+                # A character cut at the end of what is loaded waits for the next piece
+                decoder = codecs.getincrementaldecoder(state["encoding"])(errors="replace")
+                text.insert("1.0", decoder.decode(loaded, final=len(loaded) >= state["size"]))
+            text.config(state="disabled")
+            loaded_label.config(text=f"{format_bytes(len(loaded))} of {format_bytes(state['size'])} loaded")
+            more_button.set_enabled(len(loaded) < state["size"])
+
+        def opened(result):
+            kind, size, encoding, data, image = result
+            state.update(kind=kind, size=size, encoding=encoding)
+            state["loaded"].extend(data)
+            info_label.config(text=f"{kind.upper()}  ·  {size:,} bytes" + (f"  ·  {image[0].upper()} image" if image else ""))
+            if kind == "blob":
+                mode.set("hex")
+            if image:
+                fmt, picture = image
+                if isinstance(picture, str):
+                    state["image"] = picture
+                else:
+                    from PIL import ImageTk
+                    state["photo"] = ImageTk.PhotoImage(picture)
+                mode_buttons["image"].config(state="normal")
+                mode.set("image")
+            show()
+
+        def open_job(conn, task):
+            with reader(conn) as value:
+                data = value.read(0, VALUE_PREVIEW_BYTES)
+                fmt = sniff_image(data) if value.kind == "blob" else None
+                image = None
+                if fmt:
+                    image = (fmt, self.decode_image(value, fmt))
+                return value.kind, value.size, value.encoding, data, image
+
+        def load_more():
+            offset = len(state["loaded"])
+
+            def job(conn, task):
+                with reader(conn) as value:
+                    return value.read(offset, VALUE_PREVIEW_BYTES)
+
+            def done(data):
+                if len(state["loaded"]) == offset:
+                    state["loaded"].extend(data)
+                    show()
+
+            worker.submit(job, done, failed, label="Reading value")
+
+        def save():
+            fmt = sniff_image(bytes(state["loaded"][:16])) if state["kind"] == "blob" else None
+            ext = ".jpg" if fmt == "jpeg" else f".{fmt}" if fmt else ".txt" if state["kind"] == "text" else ".bin"
+            path = filedialog.asksaveasfilename(parent=window, defaultextension=ext, initialfile=f"{table_name}-{column}-{rowid}{ext}")
+            if path:
+                self.save_value(table_name, column, rowid, path)
+
+        def failed(error):
+            if window.winfo_exists() and not isinstance(error, QueryCancelled):
+                info_label.config(text=f"Error: {error}", fg=Colors.ERROR)
+
+        def close():
+            worker.close()
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        worker.submit(open_job, opened, failed, label="Reading value")
+
+    def decode_image(self, value, fmt):
+        """A thumbnail of the image stored in `value`, or a note why there is none; runs on a worker."""
+        if value.size > self.IMAGE_PREVIEW_BYTES:
+            return f"{fmt.upper()} image of {format_bytes(value.size)}: too large to preview, save it to a file instead"
+        try:
+            from PIL import Image
+        except ImportError:
+            return "Install Pillow to preview images"
+        try:
+            picture = Image.open(io.BytesIO(b"".join(value.chunks())))
+            picture.thumbnail(self.IMAGE_PREVIEW_SIZE)
+            picture.load()
+            return picture
+        except Exception as e:
+            return f"Cannot decode the image: {e}"
+
+    def save_value(self, table_name, column, rowid, path):
+        """Stream one stored value to a file, chunk by chunk, with progress."""
+        worker = self.new_worker("value")
+        dialog = ProgressDialog(self.root, f"Saving {os.path.basename(path)}", unit="bytes")
+
+        def job(conn, task):
+            with ValueReader(conn, table_name, column, rowid) as value:
+                task.post(dialog.set_total, value.size)
+
+                def progress(written, size):
+                    task.rows = written
+                    task.post(dialog.set_progress, written)
+
+                return value.save(path, progress=progress, should_stop=lambda: task.cancelled)
+
+        def done(written):
+            worker.close()
+            dialog.close()
+            self.status_label.config(text=f"Saved {format_bytes(written)} to {os.path.basename(path)} in {task.elapsed():.1f}s")
+
+        def failed(error):
+            worker.close()
+            dialog.close()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text="Save cancelled")
+                return
+            messagebox.showerror("Save Error", str(error))
+
+        task = worker.submit(job, done, failed, label="Saving value")
+        dialog.on_cancel = task.cancel
+
+    def show_pending_edits(self):
+        edits = self.pending_edits
+        count = len(edits) if edits else 0
+        self.edits_label.config(text=f"✎ {count:,} unsaved edit(s) in {edits.table_name}: Save or Revert" if count else "")
+        self.data_grid.render()
+
+    def save_edits(self):
+        if self.cell_editor:
+            self.cell_editor["commit"]()
+        edits = self.pending_edits
+        if not edits:
+            self.status_label.config(text="No edits to save")
+            return
+        # The worker owns the buffer while it writes; it comes back if the save fails
+        self.pending_edits = None
+
+        def done(updated):
+            self.status_label.config(text=f"Saved {updated:,} cell(s) to {edits.table_name} in one transaction")
+            self.show_pending_edits()
+            self.refresh_data()
+
+        def failed(error):
+            if self.pending_edits is None:
+                self.pending_edits = edits
+            self.show_pending_edits()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text="Save cancelled, no cells were changed")
+                return
+            messagebox.showerror("Save Error", str(error))
+
+        self.pause_table_stats()
+        self.browse_worker.submit(lambda conn, task: edits.apply(conn), done, failed, label="Saving edits")
+
+    def revert_edits(self):
+        if self.cell_editor:
+            self.cell_editor["commit"]()
+        if not self.pending_edits:
+            return
+        if messagebox.askyesno("Revert", f"Discard {len(self.pending_edits):,} unsaved edit(s)?"):
+            self.pending_edits = None
+            self.show_pending_edits()
+
+    def resolve_pending_edits(self):
+        """Ask about unsaved edits before leaving their table; False when the user cancels."""
+        if self.cell_editor:
+            self.cell_editor["commit"]()
+        edits = self.pending_edits
+        if not edits:
+            return True
+        answer = messagebox.askyesnocancel("Unsaved Edits", f"Save {len(edits):,} edited cell(s) in {edits.table_name}?")
+        if answer is None:
+            return False
+        if answer:
+            try:
+                self.pause_table_stats()
+                edits.apply(self.conn)
+            except Exception as e:
+                messagebox.showerror("Save Error", str(e))
+                return False
+        self.pending_edits = None
+        self.show_pending_edits()
+        return True
+
     def delete_row(self):
-        selected_item = self.data_tree.selection()
-        if not selected_item:
+        if not self.data_grid.selected:
             messagebox.showwarning("Warning", "Select a row first")
             return
             
-        if not hasattr(self, 'current_df') or "rowid" not in self.current_df.columns:
+        pager = self.data_grid.pager
+        if not pager or not pager.has_rowid:
             messagebox.showwarning("Warning", "Cannot safe delete: No rowid")
             return
 
-        if not messagebox.askyesno("Confirm", "Delete selected row(s)?"):
+        # Selection is tracked by rowid, including rows scrolled out of view
+        rowids = sorted(self.data_grid.selected)
+        if not messagebox.askyesno("Confirm", f"Delete {len(rowids):,} selected row(s)?"):
             return
+        self.run_delete(pager.table_name, rowids=rowids)
 
-        try:
-            cursor = self.conn.cursor()
-            table_name = self.current_table_label.cget("text")
-            for item in selected_item:
-                vals = self.data_tree.item(item)['values']
-                cursor.execute(f"DELETE FROM '{table_name}' WHERE rowid = ?", (vals[0],))
-            self.conn.commit()
-            messagebox.showinfo("Success", "Deleted successfully")
+    def delete_matching(self):
+        pager = self.data_grid.pager
+        if not pager or not pager.has_rowid:
+            messagebox.showwarning("Warning", "Cannot safe delete: No rowid")
+            return
+        where, params = pager.filter_sql()
+        if not where:
+            messagebox.showwarning("Warning", "Apply a filter first")
+            return
+
+        def confirm(count):
+            if messagebox.askyesno("Confirm", f"Delete all {count:,} row(s) matching the current filter?"):
+                self.run_delete(pager.table_name, where=where, params=params)
+
+        def failed(error):
+            if not isinstance(error, QueryCancelled):
+                messagebox.showerror("Error", str(error))
+
+        self.browse_worker.submit(lambda conn, task: conn.execute(*pager.count_sql()).fetchone()[0],
+                                  confirm, failed, label="Counting matches")
+
+    def run_delete(self, table_name, rowids=None, where=None, params=()):
+        undo = UndoBuffer(table_name, self.UNDO_MAX_BYTES)
+
+        def done(deleted):
+            self.data_grid.selected.clear()
+            if undo.overflowed:
+                note = "They are too large to keep for undo."
+            else:
+                self.push_undo(undo)
+                note = "Use Undo to restore them."
+            messagebox.showinfo("Success", f"Deleted {deleted:,} row(s). {note}")
             self.refresh_data()
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+            self.load_table_stats()
+
+        def failed(error):
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text="Delete cancelled, no rows were removed")
+                return
+            messagebox.showerror("Error", str(error))
+
+        self.pause_table_stats()
+        self.browse_worker.submit(lambda conn, task: delete_rows(conn, table_name, rowids, where, undo, params),
+                                  done, failed, label="Deleting")
+
+    def push_undo(self, undo):
+        self.undo_stack.append(undo)
+        # Oldest deletes are forgotten first once the buffers outgrow the cap
+        while len(self.undo_stack) > 1 and sum(u.size for u in self.undo_stack) > self.UNDO_MAX_BYTES:
+            self.undo_stack.pop(0)
+
+    def undo_delete(self):
+        if not self.undo_stack:
+            messagebox.showinfo("Undo", "Nothing to undo")
+            return
+        undo = self.undo_stack.pop()
+
+        def done(restored):
+            self.status_label.config(text=f"Restored {restored:,} row(s) to {undo.table_name}")
+            self.refresh_data()
+            self.load_table_stats()
+
+        def failed(error):
+            self.undo_stack.append(undo)
+            if not isinstance(error, QueryCancelled):
+                messagebox.showerror("Undo Error", str(error))
+
+        self.pause_table_stats()
+        self.browse_worker.submit(lambda conn, task: undo.restore(conn), done, failed, label="Restoring rows")
+
+    def apply_filter(self):
+        pager = self.data_grid.pager
+        if pager:
+            self.load_table_data(pager.table_name)
+
+    def clear_filter(self):
+        self.filter_entry.delete(0, tk.END)
+        self.column_filters = []
+        self.apply_filter()
 
     def refresh_data(self):
+        pager = self.data_grid.pager
+        if pager and pager.table_name == self.current_table_label.cget("text"):
+            self.data_grid.reload()
+            return
         selected_item = self.table_list.selection()
-        if selected_item:
+        if selected_item and selected_item[0].partition(":")[0] in ("table", "view"):
             self.load_table_data(self.table_list.item(selected_item)['text'])
 
     def export_csv(self):
-        if not hasattr(self, 'current_df') or self.current_df is None: return
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
-        if path: self.current_df.to_csv(path, index=False)
+        pager = self.data_grid.pager
+        if not pager or not self.conn: return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz")])
+        if path: self.start_export(stream_csv, *pager.view_sql(), path, count_sql=pager.count_sql())
 
     def export_excel(self):
-        if not hasattr(self, 'current_df') or self.current_df is None: return
+        pager = self.data_grid.pager
+        if not pager or not self.conn: return
+        path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel", "*.xlsx")])
+        if path: self.start_export(stream_excel, *pager.view_sql(), path, count_sql=pager.count_sql())
+
+    def export_query_csv(self):
+        if not self.last_query or not self.conn:
+            messagebox.showwarning("Warning", "Run a query first")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz")])
+        if path: self.start_export(stream_csv, self.last_query, (), path, total=self.last_query_rows)
+
+    def export_query_excel(self):
+        if not self.last_query or not self.conn:
+            messagebox.showwarning("Warning", "Run a query first")
+            return
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel", "*.xlsx")])
-        if path: self.current_df.to_excel(path, index=False)
+        if path: self.start_export(stream_excel, self.last_query, (), path, total=self.last_query_rows)
+
+    def start_export(self, writer, sql, params, path, count_sql=None, total=None):
+        # Each export gets its own worker so browsing and queries stay responsive
+        worker = self.new_worker("export")
+        dialog = ProgressDialog(self.root, f"Exporting {os.path.basename(path)}")
+
+        def job(conn, task):
+            rows = conn.execute(*count_sql).fetchone()[0] if count_sql else total
+            task.post(dialog.set_total, rows)
+
+            def progress(written, note=""):
+                task.rows = written
+                task.post(dialog.set_progress, written, note)
+
+            return writer(conn, sql, path, progress=progress, params=params)
+
+        def done(written):
+            worker.close()
+            dialog.close()
+            self.status_label.config(text=f"Exported {written:,} rows to {os.path.basename(path)} in {task.elapsed():.1f}s")
+
+        def failed(error):
+            worker.close()
+            dialog.close()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text="Export cancelled")
+                return
+            messagebox.showerror("Export Error", str(error))
+
+        task = worker.submit(job, done, failed, label="Exporting")
+        dialog.on_cancel = task.cancel
+
+    def export_all_dialog(self):
+        if not self.conn:
+            messagebox.showwarning("Warning", "Open a database first")
+            return
+        out_dir = filedialog.askdirectory(title="Export all tables to")
+        if not out_dir:
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Export All Tables")
+        dialog.geometry("460x300")
+        dialog.configure(bg=Colors.BG_DARK)
+        dialog.transient(self.root)
+        
+        main_frame = tk.Frame(dialog, bg=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        tk.Label(main_frame, text=f"Export to: {os.path.basename(out_dir) or out_dir}", font=("Segoe UI Bold", 14), bg=Colors.BG_DARK, fg=Colors.PRIMARY).pack(anchor="w", pady=(0, 15))
+        
+        def field(label, widget):
+            row_frame = tk.Frame(main_frame, bg=Colors.BG_DARK)
+            row_frame.pack(fill="x", pady=4)
+            tk.Label(row_frame, text=label, font=("Segoe UI", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, width=24, anchor="w").pack(side="left")
+            widget = widget(row_frame)
+            widget.pack(side="right", fill="x", expand=True, padx=(10, 0))
+            return widget
+        
+        def entry(value):
+            def factory(parent):
+                widget = tk.Entry(parent, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
+                widget.insert(0, value)
+                return widget
+            return factory
+        
+        format_box = field("Format (one file per table)", lambda parent: ttk.Combobox(parent, values=DATABASE_EXPORT_FORMATS, state="readonly"))
+        format_box.set(DATABASE_EXPORT_FORMATS[0])
+        workers_entry = field("Worker processes", entry(str(min(4, os.cpu_count() or 1))))
+        split_entry = field("Split tables above (rows, 0 = never)", entry(str(EXPORT_SPLIT_ROWS)))
+        
+        def start():
+            try:
+                workers = max(int(workers_entry.get()), 1)
+                split_rows = max(int(split_entry.get() or 0), 0) or None
+            except ValueError:
+                messagebox.showerror("Error", "Workers and split size must be whole numbers", parent=dialog)
+                return
+            fmt = format_box.get()
+            dialog.destroy()
+            self.start_database_export(out_dir, fmt, workers, split_rows)
+        
+        PremiumButton(main_frame, text="📤 Export", command=start, width=200, height=40).pack(pady=20)
+
+    def start_database_export(self, out_dir, fmt, workers, split_rows):
+        """Export every table on a process pool, watched from a dedicated worker thread."""
+        worker = self.new_worker("export")
+        progress_dialog = ProgressDialog(self.root, "Exporting all tables")
+
+        def job(conn, task):
+            def progress(written, total, parts_done, parts):
+                task.rows = written
+                task.post(progress_dialog.set_progress, written, f"{parts_done} / {parts} files",
+                          min(written / total, 1.0) if total else None)
+
+            return export_database(self.current_db_path, out_dir, fmt, workers=workers, split_rows=split_rows,
+                                   profile=self.profile, progress=progress, should_stop=lambda: task.cancelled)
+
+        def done(results):
+            worker.close()
+            progress_dialog.close()
+            written = sum(rows for _, _, rows in results)
+            tables = len({table for table, _, _ in results})
+            elapsed = task.elapsed()
+            self.status_label.config(text=f"Exported {tables:,} tables ({written:,} rows, {len(results):,} files) in "
+                                          f"{elapsed:.1f}s, {written / max(elapsed, 1e-6):,.0f} rows/s")
+
+        def failed(error):
+            worker.close()
+            progress_dialog.close()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text="Export cancelled")
+                return
+            messagebox.showerror("Export Error", str(error))
+
+        task = worker.submit(job, done, failed, label="Exporting all tables")
+        progress_dialog.on_cancel = task.cancel
+
+    def maintenance_dialog(self):
+        """Space use and fragmentation of the file, with ANALYZE, VACUUM and online backup."""
+        if not self.conn:
+            messagebox.showwarning("Warning", "Open a database first")
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Database Maintenance")
+        window.geometry("900x620")
+        window.configure(bg=Colors.BG_DARK)
+        path = self.current_db_path
+
+        main_frame = tk.Frame(window, bg=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        tk.Label(main_frame, text=os.path.basename(path), font=("Segoe UI Bold", 14), bg=Colors.BG_DARK, fg=Colors.PRIMARY).pack(anchor="w")
+        summary = tk.Label(main_frame, text="Scanning pages…", font=("Segoe UI", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY,
+                           justify="left", anchor="w")
+        summary.pack(fill="x", pady=(5, 10))
+
+        columns = ("name", "type", "pages", "size", "unused", "fragmented")
+        tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=14)
+        for column, width in zip(columns, (260, 70, 90, 90, 90, 100)):
+            tree.heading(column, text=column.capitalize())
+            tree.column(column, width=width, anchor="w" if column in ("name", "type") else "e")
+        tree.pack(fill="both", expand=True)
+
+        buttons = tk.Frame(main_frame, bg=Colors.BG_DARK)
+        buttons.pack(fill="x", pady=(15, 0))
+        more_buttons = tk.Frame(main_frame, bg=Colors.BG_DARK)
+        more_buttons.pack(fill="x", pady=(8, 0))
+        state = {"health": None}
+
+        def refresh():
+            worker = self.new_worker("maintenance")
+
+            def done(health):
+                worker.close()
+                if not window.winfo_exists():
+                    return
+                state["health"] = health
+                summary.config(text=f"{format_bytes(health.size)} in {health.page_count:,} pages of {health.page_size:,} B  ·  "
+                                    f"{health.freelist:,} free pages ({health.freelist_ratio:.1%}, {format_bytes(health.free_bytes)})  ·  "
+                                    f"auto_vacuum {health.auto_vacuum}  ·  journal {health.journal_mode}")
+                tree.delete(*tree.get_children())
+                for item in health.objects or ():
+                    tree.insert("", "end", values=(item.name, item.kind, f"{item.pages:,}", format_bytes(item.size),
+                                                   f"{item.unused_ratio:.1%}", f"{item.fragmentation:.1%}"))
+                if health.objects is None:
+                    tree.insert("", "end", values=("Per-object sizes need SQLite's dbstat virtual table", "", "", "", "", ""))
+                incremental_button.set_enabled(health.auto_vacuum == "incremental" and health.freelist > 0)
+
+            def failed(error):
+                worker.close()
+                if window.winfo_exists():
+                    summary.config(text=f"Error: {error}")
+
+            summary.config(text="Scanning pages…")
+            window.protocol("WM_DELETE_WINDOW", lambda: (worker.close(), window.destroy()))
+            # dbstat reads every page once, so it runs like any other scan: off the Tk thread, cancellable
+            worker.submit(lambda conn, task: database_health(conn), done, failed, label="Scanning pages")
+
+        def changed():
+            self.load_tables()
+            if window.winfo_exists():
+                refresh()
+
+        def run_analyze(optimize):
+            name = "PRAGMA optimize" if optimize else "ANALYZE"
+            self.run_maintenance(name, lambda conn, task, dialog: analyze(conn, optimize), lambda result: f"{name} done", changed)
+
+        def run_vacuum():
+            if not messagebox.askyesno("VACUUM", "VACUUM rewrites the whole file and blocks every other writer until it "
+                                                 "finishes; it also needs free disk space about the size of the database. "
+                                                 "Continue?", parent=window):
+                return
+
+            def summarize(result):
+                before, after = result
+                return f"VACUUM: {format_bytes(before)} → {format_bytes(after)}"
+
+            self.run_maintenance("VACUUM", lambda conn, task, dialog: vacuum(conn), summarize, changed)
+
+        def run_incremental():
+            def work(conn, task, dialog):
+                def progress(freed, total):
+                    task.rows = freed
+                    task.post(dialog.set_progress, freed, "", freed / total if total else None)
+
+                return incremental_vacuum(conn, progress=progress, should_stop=lambda: task.cancelled)
+
+            page_size = state["health"].page_size
+            self.run_maintenance("Incremental VACUUM", work, lambda freed: f"Released {format_bytes(freed * page_size)}",
+                                 changed, unit="pages")
+
+        def run_vacuum_into():
+            target = filedialog.asksaveasfilename(parent=window, defaultextension=".db", title="VACUUM INTO",
+                                                  initialfile=f"{os.path.splitext(os.path.basename(path))[0]}-compact.db")
+            if not target:
+                return
+
+            def work(conn, task, dialog):
+                def progress(written, expected):
+                    task.post(dialog.set_progress, written, "", min(written / expected, 1.0) if expected else None)
+
+                return vacuum(conn, into=target, progress=progress)
+
+            self.run_maintenance(f"VACUUM INTO {os.path.basename(target)}", work,
+                                 lambda result: f"Wrote a {format_bytes(result[1])} compacted copy to {os.path.basename(target)}",
+                                 unit="bytes")
+
+        def run_backup():
+            target = filedialog.asksaveasfilename(parent=window, defaultextension=".db", title="Back up to",
+                                                  initialfile=f"{os.path.splitext(os.path.basename(path))[0]}-backup.db")
+            if not target:
+                return
+
+            def work(conn, task, dialog):
+                def progress(copied, total):
+                    task.rows = copied
+                    task.post(dialog.set_progress, copied, "", copied / total if total else None)
+
+                return backup_database(conn, target, progress=progress, should_stop=lambda: task.cancelled)
+
+            self.run_maintenance(f"Backing up to {os.path.basename(target)}", work,
+                                 lambda written: f"Backed up {format_bytes(written)} to {os.path.basename(target)}", unit="pages")
+
+        PremiumButton(buttons, text="🔄 Refresh", command=refresh, width=120, height=36).pack(side="left")
+        PremiumButton(buttons, text="📊 ANALYZE", command=lambda: run_analyze(False), width=120, height=36, primary=False).pack(side="left", padx=(10, 0))
+        PremiumButton(buttons, text="⚡ PRAGMA optimize", command=lambda: run_analyze(True), width=160, height=36, primary=False).pack(side="left", padx=(10, 0))
+        PremiumButton(more_buttons, text="🧹 VACUUM", command=run_vacuum, width=120, height=36, primary=False).pack(side="left")
+        incremental_button = PremiumButton(more_buttons, text="🧹 Incremental VACUUM", command=run_incremental, width=180, height=36, primary=False)
+        incremental_button.pack(side="left", padx=(10, 0))
+        incremental_button.set_enabled(False)
+        PremiumButton(more_buttons, text="📦 VACUUM INTO…", command=run_vacuum_into, width=150, height=36, primary=False).pack(side="left", padx=(10, 0))
+        PremiumButton(more_buttons, text="💾 Online Backup…", command=run_backup, width=160, height=36).pack(side="left", padx=(10, 0))
+        refresh()
+
+    MAINTENANCE_TICK_MS = 250
+
+    def run_maintenance(self, title, work, summarize, on_finish=None, unit="steps"):
+        """Run `work(conn, task, dialog)` on its own worker behind a progress dialog.
+
+        VACUUM and ANALYZE report no progress of their own, so with the
+        default unit the dialog counts the VM steps the worker's progress
+        handler sees; they also make Cancel work.
+        """
+        # A sidebar count holds a read lock that would keep VACUUM waiting
+        self.pause_table_stats()
+        worker = self.new_worker("maintenance")
+        dialog = ProgressDialog(self.root, title, unit=unit)
+
+        def tick():
+            if task.finished is not None or not dialog.winfo_exists():
+                return
+            if unit == "steps" and task.started is not None:
+                dialog.set_progress(task.steps)
+            self.root.after(self.MAINTENANCE_TICK_MS, tick)
+
+        def done(result):
+            worker.close()
+            dialog.close()
+            self.status_label.config(text=f"{summarize(result)} in {task.elapsed():.1f}s")
+            if on_finish:
+                on_finish()
+
+        def failed(error):
+            worker.close()
+            dialog.close()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text=f"{title} cancelled")
+            else:
+                messagebox.showerror("Maintenance Error", str(error))
+            if on_finish:
+                on_finish()
+
+        task = worker.submit(lambda conn, task: work(conn, task, dialog), done, failed, label=title)
+        dialog.on_cancel = task.cancel
+        tick()
 
     def run_query(self):
         query = self.query_text.get("1.0", tk.END).strip()
         if not query or not self.conn: return
+        statements = list(split_statements(query))
+        if len(statements) > 1:
+            self.run_script(statements)
+            return
+        self.query_worker.cancel()
+        self.query_results.delete(*self.query_results.get_children())
+        self.query_results["columns"] = []
+        profile = QueryProfile(query)
+        cache = self.query_cache
+        since = time.time()
+
+        def job(conn, task):
+            try:
+                profile.plan, profile.prepare = explain_plan(conn, query)
+            except sqlite3.Error:
+                # Not every statement can be explained; run it anyway
+                pass
+            task.steps = 0
+            started = time.perf_counter()
+            cached = cache.get(conn, query)
+            if cached is not None:
+                profile.cached = True
+                columns, rows = cached
+                profile.first_row = time.perf_counter() - started
+                task.post(show_columns, columns)
+                for i in range(0, len(rows), self.QUERY_BATCH_SIZE):
+                    task.emit([format_row(row) for row in rows[i:i + self.QUERY_BATCH_SIZE]])
+                profile.fetch = time.perf_counter() - started
+                return None
+            stamp = cache.validate(conn)
+            cursor = conn.execute(query)
+            profile.first_row = time.perf_counter() - started
+            if cursor.description is None:
+                conn.commit()
+                profile.fetch = time.perf_counter() - started
+                profile.steps = task.steps
+                return cursor.rowcount
+            columns = [d[0] for d in cursor.description]
+            task.post(show_columns, columns)
+            # Raw rows are kept for the cache until they outgrow its per-entry limit
+            kept, size = ([], 0) if cache.cacheable(query) else (None, 0)
+            while True:
+                batch = cursor.fetchmany(self.QUERY_BATCH_SIZE)
+                if not batch:
+                    break
+                if kept is not None:
+                    kept.extend(batch)
+                    size += sum(row_size(row) for row in batch)
+                    if size > cache.max_bytes // 4:
+                        kept = None
+                # Formatting happens here, off the Tk thread
+                task.emit([format_row(row) for row in batch])
+            # INSERT/UPDATE/DELETE ... RETURNING also return rows; the worker rolls back if this raises
+            if task.cancelled:
+                raise QueryCancelled()
+            if conn.in_transaction:
+                conn.commit()
+            profile.fetch = time.perf_counter() - started
+            profile.steps = task.steps
+            if kept is not None:
+                cache.put(conn, query, (), columns, kept, stamp, size)
+            return None
+
+        def show_columns(columns):
+            ids = [f"c{i}" for i in range(len(columns))]
+            self.query_results["columns"] = ids
+            for cid, col in zip(ids, columns):
+                self.query_results.heading(cid, text=col)
+                self.query_results.column(cid, width=150)
+
+        def show_batch(batch):
+            started = time.perf_counter()
+            insert = self.query_results.insert
+            for row in batch:
+                insert("", "end", values=row)
+            profile.render += time.perf_counter() - started
+
+        def done(changed):
+            profile.rows = task.rows if changed is None else max(changed, 0)
+            self.show_plan(profile)
+            self.add_history(profile)
+            self.record_operation("Query", {"query": profile.first_row, "fetch": profile.fetch - profile.first_row,
+                                            "render": profile.render}, rows=profile.rows, since=since)
+            if changed is None:
+                self.last_query = query
+                self.last_query_rows = task.rows
+                note = " (cached)" if profile.cached else ""
+                self.status_label.config(text=f"{task.rows:,} rows in {task.elapsed():.2f}s{note}")
+                self.load_table_stats()
+            else:
+                self.status_label.config(text=f"Statement OK, {max(changed, 0):,} rows affected in {task.elapsed():.2f}s")
+                self.load_tables()
+
+        def failed(error):
+            self.load_table_stats()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text=f"Query cancelled after {task.rows:,} rows")
+                return
+            messagebox.showerror("SQL Error", str(error))
+
+        # The query may write; a sidebar count in progress would keep it waiting on the lock
+        self.pause_table_stats()
+        task = self.query_worker.submit(job, done, failed, on_batch=show_batch, label="Running query")
+
+    SCRIPT_LOG_LIMIT = 2000
+
+    def run_script(self, statements):
+        """Run several statements, logging each and showing the last result set."""
+        mode = SCRIPT_MODES[self.script_mode_box.get()]
         try:
-            df = pd.read_sql_query(query, self.conn)
+            commit_every = max(int(self.commit_every_entry.get()), 1)
+        except ValueError:
+            messagebox.showerror("Error", "N must be a whole number")
+            return
+        self.query_worker.cancel()
+        self.query_results.delete(*self.query_results.get_children())
+        self.query_results["columns"] = []
+        self.statements_tree.delete(*self.statements_tree.get_children())
+        log = []
+
+        def on_statement(number, line, sql, elapsed, changes, rows):
+            log.append((number, line, sql, elapsed, changes, rows))
+
+        def job(conn, task):
+            def on_columns(columns):
+                task.post(show_columns, columns)
+
+            def on_rows(batch):
+                # Formatting happens here, off the Tk thread
+                task.emit([format_row(row) for row in batch])
+
+            return run_script(conn, statements, mode, commit_every, on_statement, on_columns, on_rows, self.QUERY_BATCH_SIZE)
+
+        def show_columns(columns):
+            # A new result set replaces the previous one, so the last SELECT is what stays
             self.query_results.delete(*self.query_results.get_children())
-            self.query_results["columns"] = list(df.columns)
-            for col in df.columns:
-                self.query_results.heading(col, text=col)
-                self.query_results.column(col, width=150)
-            for _, row in df.iterrows():
-                self.query_results.insert("", "end", values=list(row))
-        except Exception as e:
-            messagebox.showerror("SQL Error", str(e))
+            ids = [f"c{i}" for i in range(len(columns))]
+            self.query_results["columns"] = ids
+            for cid, col in zip(ids, columns):
+                self.query_results.heading(cid, text=col)
+                self.query_results.column(cid, width=150)
 
-if __name__ == "__main__":
+        def show_batch(batch):
+            insert = self.query_results.insert
+            for row in batch:
+                insert("", "end", values=row)
+
+        def show_log(failed=None):
+            insert = self.statements_tree.insert
+            for number, line, sql, elapsed, changes, rows in log[:self.SCRIPT_LOG_LIMIT]:
+                insert("", "end", values=(number, line, " ".join(sql.split())[:200], f"{elapsed * 1000:,.2f}", f"{changes:,}", f"{rows:,}"))
+            if len(log) > self.SCRIPT_LOG_LIMIT:
+                slowest = max(log, key=lambda entry: entry[3])
+                insert("", "end", values=("…", "", f"{len(log) - self.SCRIPT_LOG_LIMIT:,} more statements; slowest was #{slowest[0]} "
+                                          f"({slowest[3] * 1000:,.2f} ms)", "", "", ""))
+            if failed:
+                insert("", "end", values=(failed.number, failed.line, str(failed.__cause__ or failed)), tags=("failed",))
+
+        def done(result):
+            count, changes = result
+            show_log()
+            for entry in reversed(log):
+                if entry[5]:
+                    self.last_query, self.last_query_rows = entry[2], entry[5]
+                    break
+            self.status_label.config(text=f"Script OK: {count:,} statements, {changes:,} rows changed in {task.elapsed():.2f}s")
+            self.load_tables()
+
+        def failed(error):
+            show_log(error if isinstance(error, ScriptError) else None)
+            self.load_tables()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text=f"Script cancelled after {len(log):,} statements")
+                return
+            committed = getattr(error, "committed", 0)
+            committed = f"The first {committed:,} statements were committed." if committed else "Nothing was committed."
+            messagebox.showerror("SQL Error", f"{error}\n\n{committed}")
+
+        self.pause_table_stats()
+        task = self.query_worker.submit(job, done, failed, on_batch=show_batch, label="Running script")
+
+    def complete_query(self, event=None):
+        """Complete table and column names at the cursor from the schema catalog."""
+        if not self.conn:
+            return "break"
+        self.catalog.refresh(self.conn)
+        prefix = re.search(r"[\w.]*$", self.query_text.get("insert linestart", "insert")).group(0)
+        word = prefix.rpartition(".")[2]
+        candidates = self.catalog.completions(prefix)
+        if len(candidates) == 1:
+            self.insert_completion(word, candidates[0])
+        elif candidates:
+            menu = tk.Menu(self.root, tearoff=0, bg=Colors.BG_CARD, fg=Colors.TEXT_PRIMARY,
+                           activebackground=Colors.PRIMARY, activeforeground=Colors.TEXT_PRIMARY)
+            for name in candidates[:40]:
+                menu.add_command(label=name, command=lambda name=name: self.insert_completion(word, name))
+            x, y, _, height = self.query_text.bbox("insert") or (0, 0, 0, 0)
+            menu.tk_popup(self.query_text.winfo_rootx() + x, self.query_text.winfo_rooty() + y + height)
+        return "break"
+
+    def insert_completion(self, word, name):
+        self.query_text.delete(f"insert -{len(word)}c", "insert")
+        self.query_text.insert("insert", name if re.fullmatch(r"[A-Za-z_]\w*", name) else quote_ident(name))
+        self.query_text.focus_set()
+
+    def explain_query(self):
+        """Show the plan for the editor's query without running it."""
+        query = self.query_text.get("1.0", tk.END).strip()
+        if not query or not self.conn: return
+        profile = QueryProfile(query)
+
+        def job(conn, task):
+            profile.plan, profile.prepare = explain_plan(conn, query)
+            return profile
+
+        def done(profile):
+            self.show_plan(profile, ran=False)
+            self.query_notebook.select(self.plan_card)
+
+        def failed(error):
+            if not isinstance(error, QueryCancelled):
+                messagebox.showerror("SQL Error", str(error))
+
+        self.query_worker.submit(job, done, failed, label="Explaining query")
+
+    def show_plan(self, profile, ran=True):
+        self.plan_tree.delete(*self.plan_tree.get_children())
+        items = {0: ""}
+        for node, parent, detail in profile.plan:
+            flags = plan_flags(detail)
+            items[node] = self.plan_tree.insert(items.get(parent, ""), "end", text=detail, values=(", ".join(flags),),
+                                                tags=("flagged",) if flags else (), open=True)
+        if ran:
+            self.timing_label.config(text=profile.summary())
+        else:
+            prepare = "n/a" if profile.prepare is None else f"{profile.prepare * 1000:.1f} ms"
+            self.timing_label.config(text=f"prepare {prepare}  ·  not executed")
+
+    def add_history(self, profile):
+        def ms(seconds):
+            return "" if seconds is None else f"{seconds * 1000:,.1f}"
+
+        sql = " ".join(profile.sql.split())
+        self.query_history.append(profile)
+        self.history_tree.insert("", 0, iid=str(len(self.query_history) - 1), values=(
+            sql[:200], f"{profile.rows:,}", ms(profile.prepare), ms(profile.first_row), ms(profile.fetch),
+            ms(profile.render), f"{profile.steps:,}", ", ".join(profile.flags())))
+
+    def on_history_open(self, event):
+        item = self.history_tree.focus()
+        if not item:
+            return
+        profile = self.query_history[int(item)]
+        self.query_text.delete("1.0", tk.END)
+        self.query_text.insert("1.0", profile.sql)
+        self.show_plan(profile)
+
+    def import_data(self):
+        if not self.conn:
+            messagebox.showwarning("Warning", "Open a database first")
+            return
+        path = filedialog.askopenfilename(filetypes=[("Data Files", "*.csv *.csv.gz *.tsv *.txt *.xlsx *.xlsm"), ("All Files", "*.*")])
+        if not path:
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Import Data")
+        dialog.geometry("460x300")
+        dialog.configure(bg=Colors.BG_DARK)
+        dialog.transient(self.root)
+        
+        main_frame = tk.Frame(dialog, bg=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        tk.Label(main_frame, text=f"Import: {os.path.basename(path)}", font=("Segoe UI Bold", 14), bg=Colors.BG_DARK, fg=Colors.PRIMARY).pack(anchor="w", pady=(0, 20))
+        tk.Label(main_frame, text="Target table (created if missing, appended to otherwise)", font=("Segoe UI", 10), bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY).pack(anchor="w")
+        
+        stem = os.path.basename(path).split(".")[0]
+        table_entry = tk.Entry(main_frame, bg=Colors.BG_INPUT, fg=Colors.TEXT_PRIMARY, insertbackground=Colors.TEXT_PRIMARY, relief="flat", font=("Segoe UI", 10))
+        table_entry.insert(0, re.sub(r"\W+", "_", stem) or "imported")
+        table_entry.pack(fill="x", ipady=5, pady=(5, 15))
+        
+        rebuild = tk.BooleanVar(value=True)
+        tk.Checkbutton(main_frame, text="Drop and rebuild indexes around the load", variable=rebuild,
+                       bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, selectcolor=Colors.BG_INPUT,
+                       activebackground=Colors.BG_DARK, activeforeground=Colors.TEXT_PRIMARY).pack(anchor="w")
+        
+        def start():
+            table_name = table_entry.get().strip()
+            if not table_name:
+                return
+            dialog.destroy()
+            self.start_import(path, table_name, rebuild.get())
+        
+        PremiumButton(main_frame, text="📥 Import", command=start, width=200, height=40).pack(pady=20)
+
+    def start_import(self, path, table_name, rebuild_indexes):
+        worker = self.new_worker("import")
+        dialog = ProgressDialog(self.root, f"Importing {os.path.basename(path)} into {table_name}")
+
+        def job(conn, task):
+            def progress(rows, fraction):
+                task.rows = rows
+                task.post(dialog.set_progress, rows, "", fraction)
+
+            return bulk_import(conn, path, table_name, rebuild_indexes, progress=progress)
+
+        def done(rows):
+            worker.close()
+            dialog.close()
+            rate = rows / max(task.elapsed(), 1e-6)
+            self.status_label.config(text=f"Imported {rows:,} rows into {table_name} in {task.elapsed():.1f}s ({rate:,.0f} rows/s)")
+            self.load_tables()
+            if self.data_grid.pager and self.data_grid.pager.table_name == table_name:
+                self.data_grid.reload()
+
+        def failed(error):
+            worker.close()
+            dialog.close()
+            self.load_table_stats()
+            if isinstance(error, QueryCancelled):
+                self.status_label.config(text="Import cancelled, nothing was written")
+                return
+            messagebox.showerror("Import Error", str(error))
+
+        self.pause_table_stats()
+        task = worker.submit(job, done, failed, label="Importing")
+        dialog.on_cancel = task.cancel
+
+    def global_search(self):
+        term = self.search_entry.get().strip()
+        if not term or not self.conn:
+            return
+        if self.search_worker:
+            self.search_worker.close()
+        worker = self.search_worker = self.new_worker("search")
+        use_index = self.search_index_var.get()
+        path, profile = self.current_db_path, self.profile
+        self.search_tree.delete(*self.search_tree.get_children())
+        self.search_hits = {}
+        self.notebook.select(self.tab_search)
+        self.search_status_label.config(text=f"Searching for {term!r}…")
+
+        def job(conn, task):
+            def on_hits(table, hits, done, total):
+                task.rows += len(hits)
+                task.post(show_hits, hits, done, total)
+
+            return search_database(path, term, workers=self.SEARCH_WORKERS, profile=profile, use_index=use_index,
+                                   on_hits=on_hits, should_stop=lambda: task.cancelled)
+
+        def show_hits(hits, done, total):
+            for hit in hits:
+                iid = self.search_tree.insert("", "end", values=(hit.table, hit.column, "" if hit.key is None else hit.key,
+                                                                 format_row((hit.value,))[0]))
+                self.search_hits[iid] = hit
+            self.search_status_label.config(text=f"Searching for {term!r}…  {done} / {total} tables, "
+                                                 f"{len(self.search_hits):,} matches")
+
+        def done(hits):
+            tables = len({hit.table for hit in hits})
+            source = "full-text index" if use_index else "scan"
+            self.search_status_label.config(text=f"{len(hits):,} matches for {term!r} in {tables:,} tables "
+                                                 f"({task.elapsed():.2f}s, {source})")
+
+        def failed(error):
+            if isinstance(error, QueryCancelled):
+                self.search_status_label.config(text="Search cancelled")
+                return
+            self.search_status_label.config(text="Search failed")
+            messagebox.showerror("Search Error", str(error))
+
+        task = worker.submit(job, done, failed, label="Searching")
+
+    def on_search_open(self, event):
+        hit = self.search_hits.get(self.search_tree.focus())
+        if not hit:
+            return
+        if self.pending_edits and self.pending_edits.table_name != hit.table and not self.resolve_pending_edits():
+            return
+        # Rowid tables are filtered to the row, WITHOUT ROWID ones to the matching value
+        self.filter_entry.delete(0, tk.END)
+        if hit.key is not None:
+            self.filter_entry.insert(0, f"rowid = {hit.key}")
+            self.column_filters = []
+        else:
+            self.column_filters = [(hit.column, "=", hit.value)]
+        self.sort_column, self.sort_descending = None, False
+        self.notebook.select(self.tab_data)
+        self.load_table_data(hit.table)
+        self.load_table_structure(hit.table)
+
+    def cancel_queries(self):
+        for worker in (self.browse_worker, self.query_worker, self.search_worker):
+            if worker:
+                worker.cancel()
+
+    def update_status(self):
+        # Live elapsed time and row count of whatever is running
+        running = [w.current for w in (self.query_worker, self.browse_worker, self.search_worker) if w and w.current]
+        if running:
+            job = running[0]
+            self.status_running_text = f"{job.label}…  {job.elapsed():.1f}s  ·  {job.rows:,} rows fetched"
+            self.status_label.config(text=self.status_running_text)
+        elif self.status_label.cget("text") == self.status_running_text:
+            self.status_label.config(text="Ready")
+        if self.cancel_button.enabled != bool(running):
+            self.cancel_button.set_enabled(bool(running))
+        if self.query_cache:
+            hits = self.browse_cache.hits + self.query_cache.hits
+            misses = self.browse_cache.misses + self.query_cache.misses
+            size = self.browse_cache.size + self.query_cache.size
+            self.cache_label.config(text=f"Cache: {hits:,} hits / {misses:,} misses  ·  {format_bytes(size)}")
+        self.root.after(self.STATUS_INTERVAL_MS, self.update_status)
+
+    def record_operation(self, name, phases, rows=None, since=None):
+        """Log an operation's phase timings and show them in the status bar."""
+        operation = self.trace.operation(name, phases, rows, since)
+        self.perf_label.config(text=operation.summary())
+
+    TRACE_VIEW_LIMIT = 500
+
+    def show_trace(self):
+        """The most recent traced statements, newest first."""
+        if self.trace_window and self.trace_window.winfo_exists():
+            self.trace_window.lift()
+            return
+        window = self.trace_window = tk.Toplevel(self.root)
+        window.title("SQL Trace")
+        window.geometry("1000x520")
+        window.configure(bg=Colors.BG_DARK)
+
+        toolbar = tk.Frame(window, bg=Colors.BG_DARK)
+        toolbar.pack(fill="x", padx=15, pady=(15, 5))
+        log_var = tk.BooleanVar(value=self.trace.logger is not None)
+
+        def toggle_log():
+            try:
+                if log_var.get():
+                    self.trace.enable_log()
+                else:
+                    self.trace.disable_log()
+            except OSError as e:
+                log_var.set(False)
+                messagebox.showerror("Error", f"Cannot write the trace log: {e}", parent=window)
+                return
+            settings = load_settings()
+            settings["trace_log"] = log_var.get()
+            try:
+                save_settings(settings)
+            except OSError:
+                pass
+
+        tk.Checkbutton(toolbar, text=f"Write to {TRACE_LOG_PATH}", variable=log_var, command=toggle_log,
+                       bg=Colors.BG_DARK, fg=Colors.TEXT_SECONDARY, selectcolor=Colors.BG_INPUT,
+                       activebackground=Colors.BG_DARK, font=("Segoe UI", 9)).pack(side="left")
+        summary = tk.Label(toolbar, text="", font=("Segoe UI", 9), bg=Colors.BG_DARK, fg=Colors.TEXT_MUTED)
+        summary.pack(side="right")
+
+        columns = ("time", "source", "elapsed", "rows", "changes", "memory", "sql")
+        tree = ttk.Treeview(window, columns=columns, show="headings")
+        for column, width in zip(columns, (80, 70, 80, 70, 70, 80, 600)):
+            tree.heading(column, text=column.capitalize())
+            tree.column(column, width=width, stretch=column == "sql", anchor="w" if column == "sql" else "e")
+        tree.pack(fill="both", expand=True, padx=15, pady=5)
+
+        def refresh():
+            entries = self.trace.snapshot()
+            tree.delete(*tree.get_children())
+            for entry in reversed(entries[-self.TRACE_VIEW_LIMIT:]):
+                tree.insert("", "end", values=(
+                    time.strftime("%H:%M:%S", time.localtime(entry.time)), entry.source,
+                    "running" if entry.elapsed is None else f"{entry.elapsed * 1000:,.2f} ms",
+                    f"{entry.rows:,}" if entry.rows else "", f"{entry.changes:,}" if entry.changes else "",
+                    format_bytes(entry.memory) if entry.memory else "", " ".join(entry.sql.split())[:500]))
+            timed = [entry.elapsed for entry in entries if entry.elapsed is not None]
+            summary.config(text=f"{len(entries):,} statements  ·  {sum(timed) * 1000:,.1f} ms total")
+
+        def clear():
+            self.trace.clear()
+            refresh()
+
+        buttons = tk.Frame(window, bg=Colors.BG_DARK)
+        buttons.pack(fill="x", padx=15, pady=(5, 15))
+        PremiumButton(buttons, text="🔄 Refresh", command=refresh, width=120, height=34).pack(side="left")
+        PremiumButton(buttons, text="🗑 Clear", command=clear, width=120, height=34, primary=False).pack(side="left", padx=10)
+        refresh()
+
+    def stop_workers(self):
+        for worker in (self.browse_worker, self.query_worker, self.stats_worker, self.search_worker, self.profile_worker):
+            if worker:
+                worker.close()
+        self.browse_worker = self.query_worker = self.stats_worker = self.search_worker = self.profile_worker = None
+
+    def on_close(self):
+        if not self.resolve_pending_edits():
+            return
+        self.stop_workers()
+        self.root.destroy()
+
+def main():
+    parser = argparse.ArgumentParser(description="Elsakr SQLite Browser",
+                                     epilog="Headless commands: main.py {export,export-all,query,search,tables,health,backup,vacuum,analyze} --help")
+    parser.add_argument("--profile-startup", action="store_true", help="print per-phase import and init timings")
+    args = parser.parse_args()
+    
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler(STARTED_AT)
+        profiler.mark("import modules", IMPORTED_AT)
+    
     root = tk.Tk()
-    app = SQLiteBrowserApp(root)
+    if profiler:
+        profiler.mark("create Tk root")
+    app = SQLiteBrowserApp(root, profiler=profiler)
     root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from engine import UndoBuffer, delete_rows
+
+
+@pytest.fixture
+def conn(conn):
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT, data BLOB)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)", [(i, f"n{i}", bytes([i])) for i in range(1, 11)])
+    conn.commit()
+    return conn
+
+
+def rows(conn):
+    return conn.execute("SELECT rowid, * FROM t ORDER BY rowid").fetchall()
+
+
+def test_delete_by_rowids_and_undo(conn):
+    before = rows(conn)
+    undo = UndoBuffer("t", 1 << 20)
+    assert delete_rows(conn, "t", rowids=[2, 5, 9], undo=undo) == 3
+    assert [row[0] for row in rows(conn)] == [1, 3, 4, 6, 7, 8, 10]
+    assert not conn.in_transaction
+    assert undo.restore(conn) == 3
+    assert rows(conn) == before
+
+
+def test_delete_by_where_and_undo(conn):
+    before = rows(conn)
+    undo = UndoBuffer("t", 1 << 20)
+    assert delete_rows(conn, "t", where="id > ?", params=(6,), undo=undo) == 4
+    assert len(rows(conn)) == 6
+    undo.restore(conn)
+    assert rows(conn) == before
+
+
+def test_undo_buffer_overflow_keeps_nothing(conn):
+    undo = UndoBuffer("t", 100)
+    assert delete_rows(conn, "t", where="1", undo=undo) == 10
+    assert undo.overflowed and undo.rows == []
+
+
+def test_delete_nests_in_an_open_transaction(conn):
+    conn.execute("UPDATE t SET name = 'changed' WHERE id = 1")
+    assert conn.in_transaction
+    delete_rows(conn, "t", rowids=[2])
+    # The caller's transaction is still theirs to commit or roll back
+    assert conn.in_transaction
+    conn.rollback()
+    assert len(rows(conn)) == 10
+    assert rows(conn)[0][2] == "n1"
+
+
+def test_failed_delete_leaves_rows(conn):
+    conn.execute("CREATE TABLE child (t_id REFERENCES t(id) ON DELETE RESTRICT)")
+    conn.execute("INSERT INTO child VALUES (3)")
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = ON")
+    with pytest.raises(sqlite3.IntegrityError):
+        delete_rows(conn, "t", rowids=[1, 2, 3])
+    assert len(rows(conn)) == 10
+
+
+def test_undo_with_generated_columns(conn):
+    conn.execute("CREATE TABLE g (a INTEGER, b AS (a * 2), c TEXT, d AS (c || '!') STORED)")
+    conn.executemany("INSERT INTO g (a, c) VALUES (?, ?)", [(i, f"c{i}") for i in range(1, 6)])
+    conn.commit()
+    before = conn.execute("SELECT rowid, * FROM g ORDER BY rowid").fetchall()
+    for kwargs in ({"rowids": [2, 4]}, {"where": "a > 3"}):
+        undo = UndoBuffer("g", 1 << 20)
+        delete_rows(conn, "g", undo=undo, **kwargs)
+        assert undo.columns == ["rowid", "a", "c"]
+        assert undo.restore(conn) == 2
+        assert conn.execute("SELECT rowid, * FROM g ORDER BY rowid").fetchall() == before
@@ -0,0 +1,92 @@
+import base64
+import csv
+import gzip
+import io
+import json
+import sqlite3
+
+import pytest
+
+from engine import _csv_lines, export_database, stream_csv, stream_jsonl
+
+
+@pytest.fixture
+def conn(conn):
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT, score REAL, data BLOB)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?)", [
+        (1, "plain", 1.5, b"\x00\xff"),
+        (2, 'quote " and, comma', None, None),
+        (3, "two\nlines", 2.25, b""),
+        (4, "", 1e300, bytes(range(256)) * 8),
+    ])
+    return conn
+
+
+def read_csv(path, opener=open):
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize("name, opener", [("out.csv", open), ("out.csv.gz", gzip.open)])
+def test_csv_writes_blobs_as_base64(conn, tmp_path, name, opener):
+    path = str(tmp_path / name)
+    assert stream_csv(conn, "SELECT * FROM t ORDER BY id", path, chunk_size=2) == 4
+    rows = read_csv(path, opener)
+    assert rows[0] == ["id", "name", "score", "data"]
+    assert rows[1] == ["1", "plain", "1.5", "AP8="]
+    assert rows[2] == ["2", 'quote " and, comma', "", ""]
+    assert rows[3] == ["3", "two\nlines", "2.25", ""]
+    assert base64.b64decode(rows[4][3]) == bytes(range(256)) * 8
+
+
+def test_csv_lines_match_csv_writer():
+    rows = [
+        [None], [""], ["x"], [1.5, None, ""], ["x,y", 'q"t', "l\nb", "c\rd", " s "],
+        [float("inf"), 10 ** 30, -0.0, -7], ["é", " "],
+    ]
+    f = io.StringIO()
+    csv.writer(f).writerows(rows)
+    assert _csv_lines(rows) == f.getvalue()
+
+
+def test_csv_progress_and_params(conn, tmp_path):
+    path = str(tmp_path / "out.csv")
+    seen = []
+    assert stream_csv(conn, "SELECT id FROM t WHERE id > ?", path, progress=seen.append, chunk_size=2, params=(1,)) == 3
+    assert seen == [2, 3]
+    assert read_csv(path) == [["id"], ["2"], ["3"], ["4"]]
+
+
+def test_failed_csv_export_removes_partial_file(conn, tmp_path):
+    path = tmp_path / "out.csv"
+
+    def fail(written):
+        raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError):
+        stream_csv(conn, "SELECT * FROM t", str(path), progress=fail, chunk_size=1)
+    assert not path.exists()
+
+
+def test_jsonl_matches_json_module(conn, tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    assert stream_jsonl(conn, "SELECT * FROM t ORDER BY id", path) == 4
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0] == {"id": 1, "name": "plain", "score": 1.5, "data": "AP8="}
+    assert lines[1]["name"] == 'quote " and, comma' and lines[1]["data"] is None
+    assert lines[3]["score"] == 1e300
+
+
+def test_export_database_on_worker_processes(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE a (x)")
+    conn.execute("CREATE TABLE b (y BLOB)")
+    conn.executemany("INSERT INTO a VALUES (?)", [(i,) for i in range(1000)])
+    conn.execute("INSERT INTO b VALUES (x'00ff')")
+    conn.commit()
+    conn.close()
+    results = export_database(path, str(tmp_path / "out"), workers=2)
+    assert sorted((table, rows) for table, _, rows in results) == [("a", 1000), ("b", 1)]
+    assert read_csv(str(tmp_path / "out" / "b.csv")) == [["rowid", "y"], ["1", "AP8="]]
@@ -0,0 +1,105 @@
+import pytest
+
+from engine import KeysetPager, column_affinity, compile_filter, infer_column_types, number_value, value_type
+
+
+def test_like_operands_are_escaped():
+    assert compile_filter("name", "contains", "50%_a\\b") == ("\"name\" LIKE ? ESCAPE '\\'", ["%50\\%\\_a\\\\b%"])
+    assert compile_filter("name", "starts with", "12") == ("\"name\" LIKE ? ESCAPE '\\'", ["12%"])
+
+
+def test_null_operators_take_no_operand():
+    assert compile_filter("a", "is null", "") == ('"a" IS NULL', [])
+    assert compile_filter("a", "is not null", "x") == ('"a" IS NOT NULL', [])
+
+
+def test_column_names_are_quoted():
+    assert compile_filter('odd "name"', "=", "x") == ('"odd ""name""" = ?', ["x"])
+
+
+@pytest.mark.parametrize("value, kind", [
+    (7, "INTEGER"), (1.5, "REAL"), (b"x", "BLOB"),
+    ("42", "INTEGER"), (" -3 ", "INTEGER"), ("2.5", "REAL"), ("1e3", "REAL"),
+    ("007", "TEXT"), ("0", "INTEGER"), ("abc", "TEXT"), ("", "TEXT"),
+    ("NaN", "TEXT"), ("inf", "TEXT"), ("1_000", "TEXT"), ("١٢٣", "TEXT"), ("0x10", "TEXT"),
+    ("1.", "REAL"), (".5", "REAL"), ("9" * 20, "REAL"),
+])
+def test_value_type(value, kind):
+    assert value_type(value) == kind
+
+
+def test_infer_column_types_widens_and_skips_blanks():
+    rows = [("1", "1", "a", ""), ("2", "2.5", "3", None)]
+    assert infer_column_types(rows, 4) == ["INTEGER", "REAL", "TEXT", "TEXT"]
+
+
+def test_filter_on_integer_column(conn):
+    conn.execute("CREATE TABLE t (n INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1, 21)])
+    sql, params = compile_filter("n", ">", "10")
+    assert conn.execute(f"SELECT COUNT(*) FROM t WHERE {sql}", params).fetchone()[0] == 10
+
+
+@pytest.mark.parametrize("text, number", [
+    ("10", 10), (" -7 ", -7), ("+2.5", 2.5), ("1e3", 1000.0), ("1.50", 1.5),
+    ("nan", None), ("-inf", None), ("1_000", None), ("١٢٣", None), ("1e", None), ("", None),
+])
+def test_number_value(text, number):
+    assert number_value(text) == number
+    assert type(number_value(text)) is type(number)
+
+
+@pytest.mark.parametrize("declared, affinity", [
+    ("INTEGER", "INTEGER"), ("BIGINT", "INTEGER"), ("VARCHAR(20)", "TEXT"), ("text", "TEXT"), ("BLOB", "BLOB"),
+    ("", "BLOB"), (None, "BLOB"), ("DOUBLE PRECISION", "REAL"), ("DECIMAL(10,2)", "NUMERIC"), ("DATE", "NUMERIC"),
+])
+def test_column_affinity(declared, affinity):
+    assert column_affinity(declared) == affinity
+
+
+@pytest.fixture
+def mixed(conn):
+    conn.execute("CREATE TABLE m (id INTEGER PRIMARY KEY, name TEXT, n INTEGER, v)")
+    rows = [("Nan", None, None), ("1_000", None, None), ("١٢٣", None, None), ("1.50", None, "1.50"), ("10", 10, 10),
+            ("12345", 12345, "12345"), ("007", 7, "007")]
+    rows += [(f"row {i}", i, i) for i in range(1, 10)]
+    conn.executemany("INSERT INTO m (name, n, v) VALUES (?, ?, ?)", rows)
+    conn.execute("CREATE VIEW mv AS SELECT id, name, n, v, v + 0 AS v_num, name || '' AS name_expr FROM m")
+    return conn
+
+
+def count(conn, table, column, op, value):
+    pager = KeysetPager(table, filters=[(column, op, value)]).open(conn)
+    sql, params = pager.count_sql()
+    return conn.execute(sql, params).fetchone()[0]
+
+
+@pytest.mark.parametrize("table", ["m", "mv"])
+@pytest.mark.parametrize("column, op, value, expected", [
+    # TEXT columns compare the text as typed
+    ("name", "=", "Nan", 1), ("name", "=", "1_000", 1), ("name", "=", "١٢٣", 1), ("name", "=", "1.50", 1),
+    ("name", "=", "10", 1), ("name", "=", "007", 1), ("name", "!=", "10", 15),
+    # INTEGER columns convert the operand themselves
+    ("n", ">", "10", 1), ("n", "=", "7", 2), ("n", "=", "007", 2), ("n", "<=", " 3 ", 3), ("n", "=", "1_000", 0),
+    # Untyped columns hold numbers and numeric-looking text side by side
+    ("v", "=", "12345", 1), ("v", "=", "10", 1), ("v", "=", "1.50", 1), ("v", "=", "007", 2),
+    ("v", ">", "5", 5), ("v", "<", "2", 4), ("v", "!=", "10", 12),
+])
+def test_filters_by_affinity(mixed, table, column, op, value, expected):
+    assert count(mixed, table, column, op, value) == expected
+
+
+def test_filters_on_view_expressions(mixed):
+    # No affinity: the operand is compared as a number and as text
+    assert count(mixed, "mv", "v_num", ">", "10") == 1
+    assert count(mixed, "mv", "v_num", "=", "1.5") == 1
+    assert count(mixed, "mv", "name_expr", "=", "10") == 1
+    assert count(mixed, "mv", "name_expr", "=", "Nan") == 1
+
+
+def test_filter_without_affinity_binds_both_forms():
+    assert compile_filter("v", "=", "10") == ('("v" = ? OR "v" = ?)', [10, "10"])
+    assert compile_filter("v", ">", "2.5", "BLOB") == (
+        """CASE WHEN typeof("v") = 'text' THEN "v" > ? ELSE "v" > ? END""", ["2.5", 2.5])
+    assert compile_filter("v", "=", "10", "TEXT") == ('"v" = ?', ["10"])
+    assert compile_filter("v", "=", "nan") == ('"v" = ?', ["nan"])
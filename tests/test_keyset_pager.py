@@ -0,0 +1,78 @@
+import pytest
+
+from engine import KeysetPager
+
+
+@pytest.fixture
+def conn(conn):
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v, s TEXT)")
+    # Repeated and NULL sort values, so pages have to break ties on rowid
+    conn.executemany("INSERT INTO t (v, s) VALUES (?, ?)",
+                     [(None if i % 9 == 0 else i % 7, f"row {i}") for i in range(1, 101)])
+    conn.execute("CREATE TABLE w (k TEXT PRIMARY KEY, v INTEGER) WITHOUT ROWID")
+    conn.executemany("INSERT INTO w VALUES (?, ?)", [(f"k{i:03}", i % 5) for i in range(40)])
+    conn.commit()
+    return conn
+
+
+def page_forward(conn, pager, limit):
+    keyed = pager.fetch_first(conn, limit)
+    rows = [row for _, row in keyed]
+    while keyed:
+        keyed = pager.fetch_after(conn, keyed[-1][0], limit)
+        rows.extend(row for _, row in keyed)
+    return rows
+
+
+def page_backward(conn, pager, limit):
+    keyed = pager.fetch_last(conn, limit)
+    rows = [row for _, row in keyed]
+    while keyed:
+        keyed = pager.fetch_before(conn, keyed[0][0], limit)
+        rows[:0] = [row for _, row in keyed]
+    return rows
+
+
+@pytest.mark.parametrize("sort, descending", [(None, False), ("rowid", True), ("v", False), ("v", True), ("s", True)])
+def test_pages_match_order_by(conn, sort, descending):
+    direction = " DESC" if descending else ""
+    order = f"{sort}{direction}, rowid{direction}" if sort else "rowid"
+    expected = [row[0] for row in conn.execute(f"SELECT rowid FROM t ORDER BY {order}")]
+    pager = KeysetPager("t", sort=sort, descending=descending).open(conn)
+    assert pager.has_rowid
+    assert [row[0] for row in page_forward(conn, pager, 7)] == expected
+    assert [row[0] for row in page_backward(conn, pager, 7)] == expected
+
+
+def test_fetch_from_includes_the_key(conn):
+    pager = KeysetPager("t", sort="v").open(conn)
+    keyed = pager.fetch_first(conn, 10)
+    assert pager.fetch_from(conn, keyed[4][0], 3) == keyed[4:7]
+
+
+def test_filters_and_where_are_pushed_down(conn):
+    pager = KeysetPager("t", where="id <= 50", filters=[("v", "=", "3")], sort="s").open(conn)
+    expected = [row[0] for row in conn.execute("SELECT rowid FROM t WHERE id <= 50 AND v = 3 ORDER BY s, rowid")]
+    assert expected
+    assert pager.total == len(expected)
+    assert [row[0] for row in page_forward(conn, pager, 4)] == expected
+
+
+def test_without_rowid_pages_by_position(conn):
+    pager = KeysetPager("w", sort="v", descending=True).open(conn)
+    assert not pager.has_rowid
+    expected = [row[0] for row in conn.execute("SELECT k FROM w ORDER BY v DESC")]
+    assert pager.total == 40
+    assert [row[0] for row in page_forward(conn, pager, 6)] == expected
+    assert [row[0] for row in page_backward(conn, pager, 6)] == expected
+
+
+def test_key_at_and_fraction(conn):
+    pager = KeysetPager("t").open(conn)
+    assert pager.key_at(conn, 0.0) == 1
+    assert pager.key_at(conn, 0.5) == 51
+    assert pager.fraction(51) == 0.5
+    sorted_pager = KeysetPager("t", sort="v").open(conn)
+    key = sorted_pager.key_at(conn, 0.25)
+    assert key[2] == 25
+    assert sorted_pager.fetch_from(conn, key, 1)[0][0] == key
@@ -0,0 +1,27 @@
+from engine import SchemaCatalog, profile_table
+
+
+def test_profile_table(conn):
+    conn.execute("CREATE TABLE t (a INTEGER, b REAL, c TEXT, d)")
+    rows = [(min(i % 10, 4), i / 10, "xyz"[i % 3] if i % 5 else None, [1, 2.5, "z", None, b"q"][i % 5]) for i in range(200)]
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?)", rows)
+    catalog = SchemaCatalog()
+    catalog.refresh(conn)
+    updates = []
+    profile = profile_table(conn, catalog.table("t"), top_k=1, bins=4, on_update=updates.append)
+    assert profile.complete and not profile.sampled and profile.rows == 200
+    a, b, c, d = profile.columns
+
+    assert (a.values, a.nulls, a.distinct, a.min, a.max) == (200, 0, 5, 0, 4)
+    assert a.top == [(4, 120)]
+    # The last bin includes the maximum
+    assert a.histogram == [(0.0, 1.0, 20), (1.0, 2.0, 20), (2.0, 3.0, 20), (3.0, 4.0, 140)]
+    assert sum(count for _, _, count in b.histogram) == 200
+    assert b.top == []
+
+    assert (c.values, c.nulls, c.distinct) == (160, 40, 3)
+    assert c.histogram is None
+    # Only the numeric values of a mixed column are binned
+    assert (d.min, d.max) == (1, b"q")
+    assert d.histogram == [(1.0, 1.375, 40), (1.375, 1.75, 0), (1.75, 2.125, 0), (2.125, 2.5, 40)]
+    assert len(updates) == 2 + 4
@@ -0,0 +1,108 @@
+import pytest
+
+from engine import ScriptError, run_script, split_statements
+
+
+def run(conn, script, **kwargs):
+    return run_script(conn, list(split_statements(script)), **kwargs)
+
+
+def test_split_statements_keeps_semicolons_in_strings_and_triggers():
+    script = """
+CREATE TABLE t (a);
+INSERT INTO t VALUES ('x;y');  -- a comment; with a semicolon
+CREATE TRIGGER tr AFTER INSERT ON t BEGIN
+    UPDATE t SET a = a || ';';
+END;
+SELECT 1"""
+    statements = list(split_statements(script))
+    # The comment after a statement starts the next one
+    assert [line for line, _ in statements] == [2, 3, 3, 7]
+    assert statements[1][1] == "INSERT INTO t VALUES ('x;y');"
+    assert "CREATE TRIGGER" in statements[2][1] and statements[2][1].endswith("END;")
+    assert statements[3][1] == "SELECT 1"
+
+
+def test_reports_statements_rows_and_changes(conn):
+    seen, batches = [], []
+    count, changes = run(conn, "CREATE TABLE t (a); INSERT INTO t VALUES (1), (2); UPDATE t SET a = a + 1; SELECT a FROM t;",
+                         on_statement=lambda *args: seen.append(args), on_rows=batches.append)
+    assert (count, changes) == (4, 4)
+    assert [(number, changes, rows) for number, _, _, _, changes, rows in seen] == [(1, 0, 0), (2, 2, 0), (3, 2, 0), (4, 0, 2)]
+    assert batches == [[(2,), (3,)]]
+    assert not conn.in_transaction
+
+
+def test_transaction_mode_is_all_or_nothing(conn):
+    conn.execute("CREATE TABLE t (a UNIQUE)")
+    with pytest.raises(ScriptError) as error:
+        run(conn, "INSERT INTO t VALUES (1);\nINSERT INTO t VALUES (1);")
+    assert (error.value.number, error.value.line) == (2, 2)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    assert not conn.in_transaction
+
+
+def test_batches_mode_keeps_committed_batches(conn):
+    conn.execute("CREATE TABLE t (a UNIQUE)")
+    with pytest.raises(ScriptError):
+        run(conn, "INSERT INTO t VALUES (1); INSERT INTO t VALUES (2); INSERT INTO t VALUES (1);",
+            mode="batches", commit_every=2)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+
+
+def test_isolation_level_is_restored(conn):
+    conn.isolation_level = "DEFERRED"
+    run(conn, "CREATE TABLE t (a);", mode="autocommit")
+    assert conn.isolation_level == "DEFERRED"
+
+
+@pytest.mark.parametrize("mode", ["transaction", "batches", "autocommit"])
+def test_script_with_its_own_transaction(conn, mode):
+    script = """
+CREATE TABLE t (a);
+-- migration step
+BEGIN;
+INSERT INTO t VALUES (1);
+INSERT INTO t VALUES (2);
+COMMIT;
+INSERT INTO t VALUES (3);"""
+    assert run(conn, script, mode=mode, commit_every=2) == (6, 3)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
+    assert not conn.in_transaction
+
+
+def test_vacuum_in_a_script(conn):
+    assert run(conn, "CREATE TABLE t (a); INSERT INTO t VALUES (1); VACUUM; INSERT INTO t VALUES (2);") == (4, 2)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+
+
+def test_script_rollback_discards_its_transaction(conn):
+    run(conn, "CREATE TABLE t (a); BEGIN; INSERT INTO t VALUES (1); ROLLBACK; INSERT INTO t VALUES (2);")
+    assert conn.execute("SELECT a FROM t").fetchall() == [(2,)]
+
+
+def test_savepoints_stay_inside_the_transaction(conn):
+    conn.execute("CREATE TABLE t (a UNIQUE)")
+    with pytest.raises(ScriptError) as error:
+        run(conn, "SAVEPOINT s; INSERT INTO t VALUES (1); ROLLBACK TO s; INSERT INTO t VALUES (2); INSERT INTO t VALUES (2);")
+    assert error.value.committed == 0
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_batches_continue_after_a_script_commit(conn):
+    conn.execute("CREATE TABLE t (a UNIQUE)")
+    script = "BEGIN; INSERT INTO t VALUES (1); COMMIT; INSERT INTO t VALUES (2); INSERT INTO t VALUES (3); INSERT INTO t VALUES (2);"
+    with pytest.raises(ScriptError) as error:
+        run(conn, script, mode="batches", commit_every=100)
+    # The statements after COMMIT were back in a batch, so the failure undid them
+    assert error.value.committed == 3
+    assert conn.execute("SELECT a FROM t").fetchall() == [(1,)]
+
+
+def test_committed_count_in_batches(conn):
+    conn.execute("CREATE TABLE t (a UNIQUE)")
+    with pytest.raises(ScriptError) as error:
+        run(conn, "INSERT INTO t VALUES (1); INSERT INTO t VALUES (2); INSERT INTO t VALUES (3); INSERT INTO t VALUES (1);",
+            mode="batches", commit_every=2)
+    assert error.value.committed == 2
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2